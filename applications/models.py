@@ -54,6 +54,12 @@ class Application(models.Model):
 
     notes = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Used by the expired wishlist badge job
+            models.Index(fields=['status', 'due'], name='application_status_due_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} at {self.company}"
 
@@ -67,6 +73,9 @@ class Application(models.Model):
         else:
             old_status = 'wishlist'  # For new instances, old status is wishlist
 
+        # Remember the previous status for post_save receivers (None for new applications)
+        self._old_status = None if is_new else old_status
+
         # Save the application
         super().save(*args, **kwargs)
 
@@ -92,10 +101,13 @@ class Application(models.Model):
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
 
-        total = cls.objects.filter(user=user).count()  # Count ALL applications
+        # Totals come from the maintained per-user counters
+        from social.services.counters.counter_service import CounterService
+        counter = CounterService.get(user)
+        total = counter.total_applications  # Count ALL applications
         week = cls.objects.filter(user=user, created_at__gte=week_ago).count()
         month = cls.objects.filter(user=user, created_at__gte=month_ago).count()
-        offers = cls.objects.filter(user=user, status='offered').count()
+        offers = counter.offered_applications
 
         return {
             'total': total,
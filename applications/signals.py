@@ -1,10 +1,45 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from social.services.badges.badge_rules import APPLICATION_STATUS_CHANGED, CONTACT_CREATED
 from social.services.badges.badge_service import BadgeService
-from .models import Application
+from social.services.counters.counter_service import CounterService
+from momentum.signals import deleted_directly
+from .models import Application, Contact
+
+# Counters are connected before the badge receivers below, which read them
 
 @receiver(post_save, sender=Application)
-def check_application_badges(instance, **kwargs):
-    """Check badges when an application is created or updated"""
-    badge_service = BadgeService(instance.user)
-    badge_service.check_application_badges()
+def count_application(instance, created, **kwargs):
+    """Move the application between status counts when it is created or its status changes"""
+    if not hasattr(instance, '_old_status'):
+        # Saved without Application.save (e.g. loaddata), so the previous status is unknown
+        CounterService.rebuild(instance.user_id)
+    elif created or instance._old_status != instance.status:
+        CounterService.change_application_status(instance.user_id, instance._old_status, instance.status)
+
+@receiver(post_delete, sender=Application)
+def uncount_application(instance, origin=None, **kwargs):
+    if deleted_directly(origin, Application):
+        CounterService.change_application_status(instance.user_id, old_status=instance.status)
+
+@receiver(post_save, sender=Contact)
+def count_contact(instance, created, **kwargs):
+    if created:
+        CounterService.add_contact(instance.user_id)
+
+@receiver(post_delete, sender=Contact)
+def uncount_contact(instance, origin=None, **kwargs):
+    if deleted_directly(origin, Contact):
+        CounterService.add_contact(instance.user_id, -1)
+
+@receiver(post_save, sender=Application)
+def check_application_badges(instance, created, **kwargs):
+    """Evaluate application badges when an application is created or changes status"""
+    if created or getattr(instance, '_old_status', None) != instance.status:
+        BadgeService(instance.user).handle_event(APPLICATION_STATUS_CHANGED, application=instance)
+
+@receiver(post_save, sender=Contact)
+def check_contact_badges(instance, created, **kwargs):
+    """Evaluate contact badges when a contact is added"""
+    if created:
+        BadgeService(instance.user).handle_event(CONTACT_CREATED, contact=instance)
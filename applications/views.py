@@ -4,10 +4,11 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models, IntegrityError
 from django.utils import timezone
 from django.contrib import messages
-from social.services.badges.badge_service import BadgeService
+from social.services.monitoring.query_budget import query_budget
 from .models import Application, Contact
 from .forms import ApplicationForm, ContactForm
 
+@query_budget(8)
 class ApplicationListView(LoginRequiredMixin, ListView):
     model = Application
     template_name = 'applications/application_list.html'
@@ -50,11 +51,7 @@ class ApplicationCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.user = self.request.user
-        response = super().form_valid(form)
-        # Check application badges after creation
-        badge_service = BadgeService(self.request.user)
-        badge_service.check_application_badges()
-        return response
+        return super().form_valid(form)
 
     def get_success_url(self):
         return reverse('applications:application_detail', kwargs={'pk': self.object.pk})
@@ -68,11 +65,7 @@ class ApplicationUpdateView(LoginRequiredMixin, UpdateView):
         return Application.objects.filter(user=self.request.user)
 
     def form_valid(self, form):
-        response = super().form_valid(form)
-        # Check application badges after status update
-        badge_service = BadgeService(self.request.user)
-        badge_service.check_application_badges()
-        return response
+        return super().form_valid(form)
 
     def get_success_url(self):
         return reverse('applications:application_detail', kwargs={'pk': self.object.pk})
@@ -94,11 +87,7 @@ class ContactCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.user = self.request.user
         try:
-            response = super().form_valid(form)
-            # Check contact badge after creation
-            badge_service = BadgeService(self.request.user)
-            badge_service.check_contact_badges()
-            return response
+            return super().form_valid(form)
         except IntegrityError:
             messages.error(
                 self.request,
@@ -1,9 +1,11 @@
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from social.services.monitoring.query_budget import query_budget
 from django.urls import reverse_lazy
 from .models import Book
 from .forms import BookForm
 
+@query_budget(6)
 class BookListView(LoginRequiredMixin, ListView):
     model = Book
     template_name = 'books/book_list.html'
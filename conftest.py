@@ -0,0 +1,11 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail any test whose request runs more queries than its view's @query_budget"""
+    settings.QUERY_BUDGET_STRICT = True
+
+@pytest.fixture(autouse=True)
+def openai_api_key(monkeypatch):
+    """Clients that are mocked or pointed at a local stub still look up a key"""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
@@ -40,3 +40,12 @@ class HabitForm(forms.ModelForm):
             'frequency': 'How often do you want to do this habit?',
             'description': 'Add any additional details about your habit (optional)'
         }
+
+class CompletionImportForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV with habit and date (YYYY-MM-DD) columns, or JSON Lines of {"habit": ..., "date": ...}'
+    )
+    format = forms.ChoiceField(
+        choices=[('', 'Detect from file name'), ('csv', 'CSV'), ('json', 'JSON Lines')],
+        required=False
+    )
@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from habits.services.ai.summary_queue_service import SummaryQueueService
+
+def _process_in_thread(job):
+    try:
+        return SummaryQueueService.process(job)
+    finally:
+        # Each worker thread has its own database connection
+        connection.close()
+
+class Command(BaseCommand):
+    help = "Process queued AI summary jobs, several at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Jobs processed at once (default 4)")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty (default 1)")
+        parser.add_argument('--once', action='store_true',
+                            help="Process the jobs already queued, then exit")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        processed = 0
+        try:
+            if concurrency == 1:
+                processed = self._run_inline(options)
+            else:
+                processed = self._run_pool(concurrency, options)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping")
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)"))
+
+    def _report(self, job):
+        self.stdout.write(f"Job {job.pk} for {job.user}: {job.status}")
+
+    def _run_inline(self, options):
+        processed = 0
+        while True:
+            jobs = SummaryQueueService.claim()
+            if not jobs:
+                if options['once']:
+                    return processed
+                time.sleep(options['poll_interval'])
+                continue
+            self._report(SummaryQueueService.process(jobs[0]))
+            processed += 1
+
+    def _run_pool(self, concurrency, options):
+        processed = 0
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                jobs = SummaryQueueService.claim(concurrency - len(in_flight))
+                in_flight.update(pool.submit(_process_in_thread, job) for job in jobs)
+                if not in_flight:
+                    if options['once']:
+                        return processed
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                # Wait for a free slot, but keep checking the queue while jobs run
+                done, in_flight = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._report(future.result())
+                    processed += 1
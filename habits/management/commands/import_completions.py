@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from habits.services.habits.import_service import CompletionImportService
+
+class Command(BaseCommand):
+    help = "Import historical habit completions for a user from a CSV (habit,date) or JSON Lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=CompletionImportService.FORMATS,
+            help="File format (default: from the file extension)"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=CompletionImportService.batch_size,
+            help="Completions per insert"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        file_format = options['format'] or CompletionImportService.detect_format(options['path'])
+        service = CompletionImportService(user, batch_size=options['batch_size'])
+        try:
+            with open(options['path'], 'rb') as file:
+                result = service.import_file(file, file_format)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['imported']} completion(s) from {result['rows']} row(s) "
+            f"({result['duplicates']} duplicate(s), {result['rejected']} rejected) "
+            f"in {result['seconds']:.2f}s ({result['rows_per_second']:.0f} rows/s)"
+        ))
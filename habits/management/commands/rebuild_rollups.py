@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from habits.services.analytics.rollup_service import RollupService
+
+class Command(BaseCommand):
+    help = "Rebuild daily completion rollups from habit completions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild rollups for this username")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        count = RollupService.rebuild(users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollup row(s)"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from habits.models import Habit
+from habits.services.habits.streak_service import StreakService
+
+class Command(BaseCommand):
+    help = "Rebuild persisted streak state from habit completions to repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild habits belonging to this username")
+        parser.add_argument('--habit', type=int, help="Only rebuild the habit with this id")
+
+    def handle(self, *args, **options):
+        habits = Habit.objects.all()
+        if options['user']:
+            habits = habits.filter(user__username=options['user'])
+        if options['habit']:
+            habits = habits.filter(pk=options['habit'])
+
+        count = StreakService.rebuild_all(habits)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt streak state for {count} habit(s)"))
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HabitStreak',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('last_completed_period', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('habit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='streak_state', to='habits.habit')),
+            ],
+        ),
+    ]
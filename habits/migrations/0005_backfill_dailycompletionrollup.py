@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_rollups(apps, schema_editor):
+    # Rollups are only maintained as completions change, so existing history needs a full build
+    HabitCompletion = apps.get_model('habits', 'HabitCompletion')
+    DailyCompletionRollup = apps.get_model('habits', 'DailyCompletionRollup')
+    rows = (HabitCompletion.objects
+        .values('habit__user', 'completed_at', 'habit__category', 'habit__frequency')
+        .annotate(total=Count('id'))
+        .order_by())
+
+    DailyCompletionRollup.objects.all().delete()
+    DailyCompletionRollup.objects.bulk_create(
+        (
+            DailyCompletionRollup(
+                user_id=row['habit__user'],
+                date=row['completed_at'],
+                category=row['habit__category'],
+                frequency=row['habit__frequency'],
+                completions=row['total'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0004_aisummaryjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
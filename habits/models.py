@@ -1,5 +1,5 @@
 from datetime import timedelta
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinLengthValidator
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -69,6 +69,46 @@ class Habit(models.Model):
     def get_absolute_url(self):
         return reverse('habits:habit_detail', kwargs={'pk': self.pk})
 
+    # Fields that streaks, rollups, counters and the leaderboard are grouped or dated by
+    TRACKED_FIELDS = ('category', 'frequency', 'created_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so post_save receivers can tell what changed
+        instance._stored_values = {
+            name: value for name, value in zip(field_names, values)
+            if name in cls.TRACKED_FIELDS and value is not models.DEFERRED
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._remember_stored(kwargs.get('update_fields') or self.TRACKED_FIELDS)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._remember_stored(kwargs.get('fields') or self.TRACKED_FIELDS)
+
+    def _remember_stored(self, names):
+        stored = getattr(self, '_stored_values', {})
+        # Deferred fields that weren't loaded stay unknown
+        stored.update({
+            name: self.__dict__[name] for name in self.TRACKED_FIELDS
+            if name in names and name in self.__dict__
+        })
+        self._stored_values = stored
+
+    def changed_fields(self, update_fields=None):
+        """Tracked fields that differ from the stored row, limited to update_fields;
+        a field whose stored value wasn't loaded counts as changed"""
+        stored = getattr(self, '_stored_values', {})
+        return {
+            name for name in self.TRACKED_FIELDS
+            if (update_fields is None or name in update_fields)
+            and (name not in stored or stored[name] != getattr(self, name))
+        }
+
     # Instance methods - similar to Ruby instance methods
     def is_completed_for_date(self, date=None):
         if date is None:
@@ -85,7 +125,9 @@ class Habit(models.Model):
             # For daily habits, check just this date
             return self.completions.filter(completed_at=date).exists()
 
+    @transaction.atomic
     def toggle_completion(self, date=None):
+        # Streak state is updated by signal handlers inside this transaction
         if date is None:
             date = timezone.localtime(timezone.now()).date()
 
@@ -112,77 +154,58 @@ class Habit(models.Model):
                 completion.delete()
             return created
 
+    def get_streak_state(self):
+        """Return the persisted streak state, building it if it's missing.
+
+        Querysets that render streaks should select_related('streak_state')
+        so this never hits the database.
+        """
+        try:
+            return self.streak_state
+        except HabitStreak.DoesNotExist:
+            # Avoid a circular import - the service imports these models
+            from habits.services.habits.streak_service import StreakService
+            return StreakService.rebuild(self)
+
     def current_streak(self):
-        # Complex business logic method
-        # Similar to how you'd write it in Ruby, but with Python syntax
+        """Number of consecutive periods (days or weeks) completed up to today"""
         today = timezone.localtime(timezone.now()).date()
-        streak = 0
-        date = today
-
-        if self.frequency == 'daily':
-            # While loop is similar to Ruby's while
-            while self.is_completed_for_date(date):
-                streak += 1
-                date -= timedelta(days=1)
-        else:  # weekly
-            current_week_start = today - timedelta(days=today.weekday())
-            week_start = current_week_start
-
-            while True:  # Ruby's loop do
-                week_end = week_start + timedelta(days=6)
-                if self.completions.filter(
-                    completed_at__gte=week_start,
-                    completed_at__lte=week_end
-                ).exists():
-                    streak += 1
-                    week_start -= timedelta(days=7)
-                else:
-                    break
-
-        return streak
+        today_period = HabitStreak.period_start(today, self.frequency)
+        state = self.get_streak_state()
 
-    def longest_streak(self):
-        """Calculate the longest streak of habit completions"""
-        completions = self.completions.order_by('completed_at').values_list('completed_at', flat=True)
-        if not completions:
+        if state.last_completed_period is None or state.last_completed_period < today_period:
             return 0
+        if state.last_completed_period == today_period:
+            return state.current_streak
+
+        # Completions were logged for future periods, so the stored run doesn't
+        # end today - count the run that ends at today instead
+        period_end = today_period + HabitStreak.period_step(self.frequency) - timedelta(days=1)
+        dates = self.completions.filter(
+            completed_at__lte=period_end
+        ).values_list('completed_at', flat=True)
+        streak = HabitStreak.calculate(dates, self.frequency)
+        if streak['last_completed_period'] != today_period:
+            return 0
+        return streak['current_streak']
 
-        longest = current = 1
-        if self.frequency == 'daily':
-            # No need to convert to dates since completed_at is already a date
-            dates = list(completions)  # Convert queryset to list
-            for i in range(1, len(dates)):
-                if (dates[i] - dates[i-1]).days == 1:
-                    current += 1
-                    longest = max(longest, current)
-                else:
-                    current = 1
-        else:  # weekly
-            # Group completions by week
-            week_completions = {}
-            for completion in completions:
-                # completion is already a date, so no need for .date()
-                week_start = completion - timedelta(days=completion.weekday())
-                week_completions[week_start] = True
-
-            # Sort weeks and count consecutive ones
-            weeks = sorted(week_completions.keys())
-            for i in range(1, len(weeks)):
-                if (weeks[i] - weeks[i-1]).days == 7:
-                    current += 1
-                    longest = max(longest, current)
-                else:
-                    current = 1
-
-        return longest
+    def longest_streak(self):
+        """Longest run of consecutive completed periods"""
+        return self.get_streak_state().longest_streak
 
     def get_total_possible_completions(self):
         """Calculate total possible completions since habit creation"""
-        today = timezone.localtime(timezone.now()).date()
-        created_at_date = self.created_at.date() if hasattr(self.created_at, 'date') else self.created_at
+        return self.total_possible_completions(self.created_at, self.frequency)
+
+    @staticmethod
+    def total_possible_completions(created_at, frequency, today=None):
+        """Possible completions for a habit created at created_at, for use on plain values() rows"""
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        created_at_date = created_at.date() if hasattr(created_at, 'date') else created_at
         days_since_creation = (today - created_at_date).days + 1
 
-        if self.frequency == 'daily':
+        if frequency == 'daily':
             return max(1, days_since_creation)
         else:  # weekly
             return max(1, (days_since_creation + 6) // 7)
@@ -216,6 +239,85 @@ class HabitCompletion(models.Model):
     def __str__(self):
         return f"{self.habit.name} completed on {self.completed_at}"
 
+class HabitStreak(models.Model):
+    """Denormalized streak state, kept up to date as completions change.
+
+    ``current_streak`` is the length of the run ending at
+    ``last_completed_period`` (a date for daily habits, the Monday of the
+    week for weekly ones), so reading a habit's streak needs no
+    completion queries.
+    """
+    habit = models.OneToOneField(
+        Habit,
+        on_delete=models.CASCADE,
+        related_name='streak_state'
+    )
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_completed_period = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.habit.name}: {self.current_streak} (best {self.longest_streak})"
+
+    @staticmethod
+    def period_start(date, frequency):
+        """Start of the streak period containing date"""
+        if frequency == 'weekly':
+            return date - timedelta(days=date.weekday())
+        return date
+
+    @staticmethod
+    def period_step(frequency):
+        return timedelta(days=7 if frequency == 'weekly' else 1)
+
+    @classmethod
+    def calculate(cls, dates, frequency):
+        """Calculate streak state from an iterable of completion dates"""
+        periods = sorted({cls.period_start(date, frequency) for date in dates})
+        step = cls.period_step(frequency)
+
+        current = longest = 0
+        previous = None
+        for period in periods:
+            if previous is not None and period - previous == step:
+                current += 1
+            else:
+                current = 1
+            longest = max(longest, current)
+            previous = period
+
+        return {
+            'current_streak': current,
+            'longest_streak': longest,
+            'last_completed_period': previous,
+        }
+
+class DailyCompletionRollup(models.Model):
+    """Number of completions per user, day, habit category and frequency.
+
+    Maintained by signal handlers as completions are toggled, so period
+    totals and trends sum a few small rows instead of scanning completions.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='completion_rollups'
+    )
+    date = models.DateField()
+    category = models.CharField(max_length=20, choices=Habit.CATEGORY_CHOICES)
+    frequency = models.CharField(max_length=10, choices=[("daily", "Daily"), ("weekly", "Weekly")])
+    completions = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'date', 'category', 'frequency')
+        indexes = [
+            models.Index(fields=['user', 'date'], name='rollup_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date} {self.category}/{self.frequency}: {self.completions}"
+
 class AIHabitSummary(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField()
@@ -223,3 +325,42 @@ class AIHabitSummary(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+class AISummaryJob(models.Model):
+    """A queued request for an AI summary, processed by `manage.py ai_summary_worker`"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('pending', 'running')
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='ai_summary_jobs'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    summary = models.ForeignKey(AIHabitSummary, null=True, blank=True, on_delete=models.SET_NULL)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='ai_job_status_created_idx'),
+        ]
+        constraints = [
+            # Repeated clicks reuse the queued job instead of piling up more
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='one_active_ai_summary_job_per_user',
+            ),
+        ]
+
+    def __str__(self):
+        return f"AI summary job {self.pk} for {self.user} ({self.status})"
@@ -1,54 +1,100 @@
 import os
 import logging
+import time
+from contextlib import contextmanager
 from datetime import timedelta
 from openai import OpenAI
 from django.utils import timezone
 from habits.models import AIHabitSummary
 from applications.models import Application
+from social.services.monitoring.metrics import AI_SUMMARY_DURATION
 
 logger = logging.getLogger(__name__)
 
+MODEL = "gpt-3.5-turbo"
+NO_HABITS = "No habits found to analyze."
+
+# Seconds per attempt. With its retries a call gives up well before
+# SummaryQueueService.STALE_AFTER, so a slow job is never handed to a second worker
+REQUEST_TIMEOUT = 60
+MAX_RETRIES = 2
+
+def api_key():
+    key = os.getenv('OPENAI_API_KEY')
+    if not key:
+        raise ValueError("OpenAI API key not found in environment variables")
+    return key
+
+def summary_messages(prompt):
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an encouraging AI assistant that helps users track their habits and job search progress. "
+                "Provide insights, encouragement, and suggestions in a friendly tone. "
+                "Format your response in markdown."
+            )
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+@contextmanager
+def record_latency():
+    """Observe an LLM call's duration, labelled by whether it raised"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'success'
+    finally:
+        AI_SUMMARY_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+
 class AIHabitService:
-    def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OpenAI API key not found in environment variables")
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        # Created on first use, so building prompts doesn't need an API key
+        if self._client is None:
+            self._client = OpenAI(api_key=api_key(), timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
 
     def generate_habit_summary(self, user):
         """Generate an AI summary of user's habits and progress"""
         try:
-            habits = user.habits.all()
-            if not habits.exists():
-                return "No habits found to analyze."
-
-            habit_context = self._gather_habit_stats(habits)
-            application_context = self._gather_application_stats(user)
-            prompt = self._build_prompt(user.username, habit_context, application_context)
-
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an encouraging AI assistant that helps users track their habits and job search progress. "
-                            "Provide insights, encouragement, and suggestions in a friendly tone. "
-                            "Format your response in markdown."
-                        )
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            prompt = self.build_user_prompt(user)
+            if prompt is None:
+                return NO_HABITS
+
+            response = self._create_completion(prompt)
             return response.choices[0].message.content
 
         except Exception as e:
             logger.error(f"Error generating summary: {str(e)}")
             return f"Error: {str(e)}"
 
+    def build_user_prompt(self, user):
+        """The prompt for user's summary, or None if they have no habits"""
+        habits = user.habits.select_related('streak_state')
+        if not habits.exists():
+            return None
+
+        habit_context = self._gather_habit_stats(habits)
+        application_context = self._gather_application_stats(user)
+        return self._build_prompt(user.username, habit_context, application_context)
+
+    def _create_completion(self, prompt):
+        with record_latency():
+            return self.client.chat.completions.create(model=MODEL, messages=summary_messages(prompt))
+
     def _gather_habit_stats(self, habits):
         today = timezone.localtime(timezone.now()).date()
         month_ago = today - timedelta(days=30)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from weakref import WeakKeyDictionary
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from habits.models import AIHabitSummary
+from .ai_service import MODEL, NO_HABITS, AIHabitService, api_key, record_latency, summary_messages
+
+logger = logging.getLogger(__name__)
+
+# One client and one semaphore per event loop: under ASGI that is one per process,
+# while each async test gets its own loop (clients and semaphores are bound to one)
+_loop_state = WeakKeyDictionary()
+
+async def _close_at_shutdown(client):
+    # Event loops close the async generators they started before they stop
+    # (asyncio.run, uvicorn), which runs this finally on the client's own loop
+    try:
+        yield
+    finally:
+        await client.close()
+
+async def _state():
+    loop = asyncio.get_running_loop()
+    if loop not in _loop_state:
+        client_class = import_string(settings.AI_ASYNC_CLIENT)
+        options = {'base_url': settings.AI_BASE_URL} if settings.AI_BASE_URL else {}
+        # The offline fake needs no key
+        key = api_key() if getattr(client_class, 'needs_api_key', True) else None
+        client = client_class(api_key=key, **options)
+        closer = _close_at_shutdown(client)
+        await closer.__anext__()
+        _loop_state[loop] = (client, asyncio.Semaphore(settings.AI_MAX_CONCURRENT_REQUESTS), closer)
+    return _loop_state[loop][:2]
+
+async def get_async_client():
+    """The shared async OpenAI client (AI_ASYNC_CLIENT), created on first use and closed with its loop"""
+    return (await _state())[0]
+
+class AsyncAIHabitService:
+    """AI summaries from async views: one pooled keep-alive client per process, and at most
+    AI_MAX_CONCURRENT_REQUESTS LLM calls in flight, the rest waiting their turn.
+    """
+
+    async def generate_habit_summary(self, user):
+        try:
+            # The prompt's stats are plain ORM queries, so they run on a worker thread
+            prompt = await sync_to_async(AIHabitService().build_user_prompt)(user)
+            if prompt is None:
+                return NO_HABITS
+
+            client, semaphore = await _state()
+            async with semaphore:
+                with record_latency():
+                    response = await client.chat.completions.create(
+                        model=MODEL, messages=summary_messages(prompt)
+                    )
+            return response.choices[0].message.content
+
+        except Exception as e:
+            logger.error(f"Error generating summary: {str(e)}")
+            return f"Error: {str(e)}"
+
+    async def create_summary(self, user):
+        """Create and save a new AI summary; returns (summary, error) like AIHabitService"""
+        summary_content = await self.generate_habit_summary(user)
+        if summary_content.startswith('Error:'):
+            return None, summary_content
+        return await AIHabitSummary.objects.acreate(user=user, content=summary_content), None
+
+    async def stream_summary(self, user):
+        """Yield ('token', text) as the completion streams in, then ('done', the saved
+        AIHabitSummary) or ('error', message). Nothing is saved if the stream fails or
+        the consumer goes away.
+        """
+        parts = []
+        try:
+            prompt = await sync_to_async(AIHabitService().build_user_prompt)(user)
+            if prompt is None:
+                parts.append(NO_HABITS)
+                yield 'token', NO_HABITS
+            else:
+                client, semaphore = await _state()
+                async with semaphore:
+                    with record_latency():
+                        stream = await client.chat.completions.create(
+                            model=MODEL, messages=summary_messages(prompt), stream=True
+                        )
+                        try:
+                            async for chunk in stream:
+                                text = chunk.choices[0].delta.content if chunk.choices else None
+                                if text:
+                                    parts.append(text)
+                                    yield 'token', text
+                        finally:
+                            await stream.close()
+
+        except Exception as e:
+            logger.error(f"Error streaming summary: {str(e)}")
+            yield 'error', f"Error: {str(e)}"
+            return
+
+        yield 'done', await AIHabitSummary.objects.acreate(user=user, content=''.join(parts))
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+class FakeAsyncOpenAI:
+    """An offline stand-in for openai.AsyncOpenAI's chat completions.
+
+    Set AI_ASYNC_CLIENT to "habits.services.ai.fake_client.FakeAsyncOpenAI"
+    to run the async summary path without network access. Each call waits
+    `delay` seconds and answers with `content` (word by word when streamed);
+    calls, the most calls in flight at once and whether the client was
+    closed are recorded for tests.
+    """
+
+    content = "You're building great momentum. Keep it up!"
+    delay = 0
+    needs_api_key = False
+
+    def __init__(self, api_key=None, **kwargs):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, messages, stream=False, **kwargs):
+        self.calls.append({'model': model, 'messages': messages, 'stream': stream, **kwargs})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if stream:
+            return FakeStream(self.content.split(' '))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))])
+
+    async def close(self):
+        self.closed = True
+
+class FakeStream:
+    """Chat completion chunks, one per word, like openai's AsyncStream"""
+
+    def __init__(self, words):
+        self.pieces = [word if index == 0 else f' {word}' for index, word in enumerate(words)]
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    async def close(self):
+        pass
@@ -0,0 +1,72 @@
+import logging
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from habits.models import AISummaryJob
+from .ai_service import AIHabitService
+
+logger = logging.getLogger(__name__)
+
+class SummaryQueueService:
+    """AI summaries as jobs in the database: requests enqueue, `ai_summary_worker` processes.
+
+    A user has at most one pending or running job (a partial unique
+    constraint), so repeated clicks share it. Workers claim jobs with
+    SELECT ... FOR UPDATE SKIP LOCKED, so several can run side by side.
+    """
+
+    # A running job this old is assumed lost with its worker and is retried; the OpenAI
+    # client's timeout and retries keep a live job's call well short of it
+    STALE_AFTER = timedelta(minutes=10)
+
+    @staticmethod
+    def enqueue(user):
+        """The user's queued job, creating one if they have none in progress"""
+        while True:
+            try:
+                with transaction.atomic():
+                    return AISummaryJob.objects.create(user=user)
+            except IntegrityError:
+                job = AISummaryJob.objects.filter(user=user, status__in=AISummaryJob.ACTIVE_STATUSES).first()
+                if job is not None:
+                    return job
+                # The active job finished in between; create a new one
+
+    @classmethod
+    def claim(cls, limit=1):
+        """Mark up to `limit` of the oldest pending jobs running and return them,
+        first requeueing jobs left running by a worker that died"""
+        with transaction.atomic():
+            cls.requeue_stale()
+            job_ids = list(
+                AISummaryJob.objects.filter(status='pending')
+                .order_by('created_at')
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:limit]
+            )
+            AISummaryJob.objects.filter(pk__in=job_ids).update(status='running', started_at=timezone.now())
+        return list(AISummaryJob.objects.filter(pk__in=job_ids).select_related('user').order_by('created_at'))
+
+    @staticmethod
+    def process(job):
+        """Generate the job's summary and record the outcome on the job"""
+        try:
+            summary, error = AIHabitService().create_summary(job.user)
+        except Exception as e:
+            logger.error(f"Error processing AI summary job {job.pk}: {str(e)}")
+            summary, error = None, 'An unexpected error occurred'
+
+        job.summary = summary
+        job.error = error or ''
+        job.status = 'failed' if error else 'done'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['summary', 'error', 'status', 'finished_at'])
+        return job
+
+    @classmethod
+    def requeue_stale(cls, now=None):
+        """Put running jobs whose worker died back in the queue; returns how many"""
+        now = now or timezone.now()
+        return AISummaryJob.objects.filter(
+            status='running', started_at__lt=now - cls.STALE_AFTER
+        ).update(status='pending', started_at=None)
@@ -0,0 +1,196 @@
+from datetime import timedelta
+from django.db.models import Count, Q
+from django.utils import timezone
+from habits.models import Habit
+from .completion_calculator import CompletionCalculator
+from .rollup_service import RollupService
+from .streak_engine import StreakEngine
+
+# Where each per-habit metric comes from
+HABIT = 'habit'        # the habit's own fields, no query
+COUNTS = 'counts'      # completion counts annotated onto the habit query (summaries use rollups)
+STREAKS = 'streaks'    # StreakEngine, one extra query
+
+HABIT_METRICS = {
+    'possible_completions': HABIT,
+    'total_completions': COUNTS,
+    'week_count': COUNTS,
+    'month_count': COUNTS,
+    'completed_current_period': COUNTS,
+    'current_streak': STREAKS,
+    'longest_streak': STREAKS,
+}
+
+def _rate(completed, possible):
+    return round(completed * 100 / possible if possible > 0 else 0.0, 1)
+
+# Completion totals summed per category for the summaries: per-habit count metric -> rollup period
+TOTALS = {'total_completions': 'total', 'week_count': 'week', 'month_count': 'month'}
+
+def _total(totals, name):
+    return sum(category_totals[name] for category_totals in totals.values())
+
+def _category_stats(rows, totals):
+    by_category = {}
+    for row in rows:
+        stats = by_category.setdefault(row['category'], {'possible': 0, 'count': 0})
+        stats['possible'] += row['possible_completions']
+        stats['count'] += 1
+    return [
+        {
+            'category': category,
+            'completed': totals.get(category, {}).get('total_completions', 0),
+            'total': stats['possible'],
+            'habit_count': stats['count'],
+            'percentage': _rate(totals.get(category, {}).get('total_completions', 0), stats['possible']),
+        }
+        for category, stats in by_category.items()
+    ]
+
+# Summary metric: (per-habit metrics it needs, whether it needs completion totals,
+# how it's computed from the habit rows and the totals)
+SUMMARY_METRICS = {
+    'total_habits': ((), False, lambda rows, totals: len(rows)),
+    'total_completions': ((), True, lambda rows, totals: _total(totals, 'total_completions')),
+    'total_possible': (
+        ('possible_completions',), False, lambda rows, totals: sum(r['possible_completions'] for r in rows)
+    ),
+    'completion_rate': (
+        ('possible_completions',), True,
+        lambda rows, totals: _rate(
+            _total(totals, 'total_completions'), sum(r['possible_completions'] for r in rows)
+        ),
+    ),
+    'this_week_completions': ((), True, lambda rows, totals: _total(totals, 'week_count')),
+    'this_month_completions': ((), True, lambda rows, totals: _total(totals, 'month_count')),
+    'category_stats': (('possible_completions',), True, _category_stats),
+    'best_streak': (
+        ('current_streak',), False, lambda rows, totals: max((r['current_streak'] for r in rows), default=0)
+    ),
+}
+
+class AnalyticsEngine:
+    """The one place habit analytics are computed.
+
+    Callers name the summary metrics they render (SUMMARY_METRICS) and the
+    engine works out which per-habit metrics (HABIT_METRICS) those need. For
+    habits with prefetched completions everything is computed in memory.
+    For a queryset, the habits are one query, completion totals are summed
+    from the owners' daily rollups in one more, and streaks, only if asked
+    for, add one StreakEngine query. Rollups are per category, so a queryset
+    should hold whole categories of a user's habits (e.g. all of them, or
+    one category).
+    """
+
+    def __init__(self, today=None):
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        self.today = today
+
+    @staticmethod
+    def required_habit_metrics(summary_metrics):
+        return {name for summary in summary_metrics for name in SUMMARY_METRICS[summary][0]}
+
+    def summarize(self, habits, summary_metrics, metrics=None):
+        """{summary metric: value} for habits.
+
+        metrics may be CompletionCalculator output for the same habits, to
+        reuse per-habit numbers the caller already has.
+        """
+        names = self.required_habit_metrics(summary_metrics)
+        needs_totals = any(SUMMARY_METRICS[name][1] for name in summary_metrics)
+        in_memory = metrics is not None or self._has_prefetched_completions(habits)
+        if in_memory and needs_totals:
+            names |= set(TOTALS)
+
+        rows = self.habit_rows(habits, names, metrics)
+        totals = {}
+        if needs_totals:
+            totals = self._totals_from_rows(rows) if in_memory else self._totals_from_rollups(rows)
+        return {name: SUMMARY_METRICS[name][2](rows, totals) for name in summary_metrics}
+
+    @staticmethod
+    def _totals_from_rows(rows):
+        """{category: {count metric: completions}} summed from per-habit rows"""
+        totals = {}
+        for row in rows:
+            category_totals = totals.setdefault(row['category'], dict.fromkeys(TOTALS, 0))
+            for name in TOTALS:
+                category_totals[name] += row[name]
+        return totals
+
+    def _totals_from_rollups(self, rows):
+        """{category: {count metric: completions}} summed from the rollups of the habits' owners"""
+        keys = {(row['user_id'], row['category'], row['frequency']) for row in rows}
+        grouped = RollupService.grouped_period_totals(
+            {user_id for user_id, _, _ in keys}, self.today, {category for _, category, _ in keys}
+        )
+        totals = {}
+        for key, periods in grouped.items():
+            if key in keys:
+                category_totals = totals.setdefault(key[1], dict.fromkeys(TOTALS, 0))
+                for name, period in TOTALS.items():
+                    category_totals[name] += periods[period]
+        return totals
+
+    def habit_rows(self, habits, names, metrics=None):
+        """One dict per habit with its pk, owner, category, frequency and the named metrics"""
+        if metrics is None and not self._has_prefetched_completions(habits):
+            return self._rows_from_queries(habits, names)
+
+        if metrics is None:
+            metrics = CompletionCalculator(self.today).calculate_many(habits)
+        return [
+            {
+                'pk': habit.pk,
+                'user_id': habit.user_id,
+                'category': habit.category,
+                'frequency': habit.frequency,
+                **{name: metrics[habit.pk][name] for name in names},
+            }
+            for habit in habits
+        ]
+
+    @staticmethod
+    def _has_prefetched_completions(habits):
+        if not isinstance(habits, list):
+            return False
+        return all('completions' in getattr(habit, '_prefetched_objects_cache', {}) for habit in habits)
+
+    def _count_annotations(self, names):
+        today = self.today
+        start_of_week = today - timedelta(days=today.weekday())
+        in_range = lambda start: Q(completions__completed_at__gte=start, completions__completed_at__lte=today)
+
+        annotations = {}
+        if 'total_completions' in names:
+            annotations['total_completions'] = Count('completions', filter=Q(completions__completed_at__lte=today))
+        if 'week_count' in names or 'completed_current_period' in names:
+            annotations['week_count'] = Count('completions', filter=in_range(start_of_week))
+        if 'month_count' in names:
+            annotations['month_count'] = Count('completions', filter=in_range(today.replace(day=1)))
+        if 'completed_current_period' in names:
+            annotations['today_count'] = Count('completions', filter=Q(completions__completed_at=today))
+        return annotations
+
+    def _rows_from_queries(self, habits, names):
+        if isinstance(habits, list):
+            habits = Habit.objects.filter(pk__in=[habit.pk for habit in habits])
+
+        sources = {HABIT_METRICS[name] for name in names}
+        streaks = StreakEngine.compute(habits, self.today) if STREAKS in sources else {}
+        rows = list(
+            habits.values('pk', 'user_id', 'category', 'frequency', 'created_at', **self._count_annotations(names))
+        )
+
+        for row in rows:
+            if 'possible_completions' in names:
+                row['possible_completions'] = Habit.total_possible_completions(
+                    row['created_at'], row['frequency'], self.today
+                )
+            if 'completed_current_period' in names:
+                period_count = row['week_count'] if row['frequency'] == 'weekly' else row['today_count']
+                row['completed_current_period'] = period_count > 0
+            if STREAKS in sources:
+                row.update(streaks.get(row['pk'], {'current_streak': 0, 'longest_streak': 0}))
+        return rows
@@ -1,124 +1,69 @@
 from datetime import timedelta
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
-from django.db.models import (
-    Count, Q, Value, Case, When, DateField, IntegerField
-)
-from django.db.models.functions import Cast
 from habits.models import Habit, AIHabitSummary
+from .analytics_engine import AnalyticsEngine
+from .completion_calculator import CompletionCalculator
+from .snapshot_cache import AnalyticsSnapshotCache
+
+HABIT_LIST_METRICS = [
+    'total_habits', 'completion_rate', 'this_week_completions', 'this_month_completions',
+    'category_stats', 'best_streak', 'total_completions', 'total_possible',
+]
+# What the habit cards show, kept per habit in the habit list snapshot
+HABIT_CARD_METRICS = ('current_streak', 'completed_current_period')
 
 class HabitAnalyticsService:
     def __init__(self, user):
         self.user = user
 
-    def get_habits_with_analytics(self):
-        """Get habits with all necessary annotations for analytics"""
-        today = timezone.localtime(timezone.now()).date()
-        start_of_week = today - timedelta(days=today.weekday())
-        start_of_month = today.replace(day=1)
+    def get_habits(self, selected_category=None):
+        """The user's habits, optionally in one category, without their completions"""
+        habits = self.user.habits.all().select_related('user')
+        if selected_category:
+            habits = habits.filter(category=selected_category)
+        return habits
 
-        return (self.user.habits.all()
-            .select_related('user')
-            .annotate(
-                completed_today=Count('completions',
-                    filter=Q(completions__completed_at=today)),
-                completed_this_week=Count('completions',
-                    filter=Q(
-                        completions__completed_at__gte=start_of_week,
-                        completions__completed_at__lte=today
-                    )),
-                month_count=Count('completions',
-                    filter=Q(completions__completed_at__gte=Cast(Value(start_of_month),
-                                                             output_field=DateField()))),
-                total_completions=Count('completions'),
-                needs_completion_daily=Case(
-                    When(frequency='daily', completed_today=0, then=Value(1)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                ),
-                needs_completion_weekly=Case(
-                    When(frequency='weekly', completed_this_week=0, then=Value(1)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-            ).prefetch_related('completions'))
-
-    def get_habits_data(self, habits):
-        """Convert habits queryset to analytics-ready data structure"""
-        return [
-            {
-                "name": habit.name,
-                "category": habit.category,
-                "frequency": habit.frequency,
-                "completions_count": habit.total_completions,
-                "possible_completions": habit.get_total_possible_completions(),
-                "week_count": habit.completed_this_week,
-                "month_count": habit.month_count,
-                "streak_days": habit.current_streak(),
-            }
-            for habit in habits
-        ]
-
-    def get_category_stats(self, habits_data):
-        """Calculate statistics per category"""
-        by_category = {}
-        for habit in habits_data:
-            cat = habit.get('category')
-            if cat not in by_category:
-                by_category[cat] = {'completed': 0, 'possible': 0, 'count': 0, 'streak': 0}
-            by_category[cat]['completed'] += habit['completions_count']
-            by_category[cat]['possible'] += habit['possible_completions']
-            by_category[cat]['count'] += 1
-            by_category[cat]['streak'] = max(by_category[cat]['streak'], habit['streak_days'])
-
-        return [
-            {
-                'category': category,
-                'completed': data['completed'],
-                'total': data['possible'],
-                'habit_count': data['count'],
-                'percentage': round(
-                    data['completed'] * 100 / data['possible'] if data['possible'] > 0 else 0.0, 1
-                )
-            }
-            for category, data in by_category.items()
-        ]
+    def get_habits_with_analytics(self, selected_category=None):
+        """Get habits with everything the analytics need loaded up front.
 
-    def get_analytics(self, habits=None):
-        """Get complete analytics for habits"""
-        if habits is None:
-            habits = self.get_habits_with_analytics()
+        Completions are prefetched so CompletionCalculator can derive counts,
+        rates and streaks without further queries.
+        """
+        habits = (self.user.habits.all()
+            .select_related('user', 'streak_state')
+            .prefetch_related('completions'))
 
-        habits_data = self.get_habits_data(habits)
-        category_stats = self.get_category_stats(habits_data)
-
-        total_completions = sum(h['completions_count'] for h in habits_data)
-        total_possible = sum(h['possible_completions'] for h in habits_data)
+        if selected_category:
+            habits = habits.filter(category=selected_category)
+        return habits
 
-        return {
-            'total_habits': len(habits_data),
-            'completion_rate': round(
-                total_completions * 100 / total_possible if total_possible > 0 else 0.0, 1
-            ),
-            'this_week_completions': sum(h['week_count'] for h in habits_data),
-            'this_month_completions': sum(h['month_count'] for h in habits_data),
-            'category_stats': category_stats,
-            'best_streak': max((h['streak_days'] for h in habits_data), default=0),
-            'total_completions': total_completions,
-            'total_possible': total_possible,
-        }
+    def get_analytics(self, habits=None, metrics=None):
+        """Get complete analytics for habits"""
+        if habits is None:
+            habits = list(self.get_habits_with_analytics())
+        return AnalyticsEngine().summarize(habits, HABIT_LIST_METRICS, metrics)
 
-    def get_notifications(self, habits):
+    def get_notifications(self, habits, metrics=None):
         """Get notification counts for incomplete habits"""
+        if metrics is None:
+            metrics = CompletionCalculator().calculate_many(habits)
+
+        incomplete = [habit for habit in habits if not metrics[habit.pk]['completed_current_period']]
         return {
-            'incomplete_daily': habits.filter(frequency='daily', completed_today=0).count(),
-            'incomplete_weekly': habits.filter(frequency='weekly', completed_this_week=0).count(),
+            'incomplete_daily': sum(1 for habit in incomplete if habit.frequency == 'daily'),
+            'incomplete_weekly': sum(1 for habit in incomplete if habit.frequency == 'weekly'),
         }
 
-    def get_habits_by_view_mode(self, habits, view_mode='frequency'):
+    def get_habits_by_view_mode(self, habits, view_mode='frequency', metrics=None):
         """Organize habits based on view mode (category or frequency)"""
-        # Add streak to each habit
+        if metrics is None:
+            metrics = CompletionCalculator().calculate_many(habits)
+
+        # Add streak and completion status to each habit for the habit cards
         for habit in habits:
-            habit.streak = habit.current_streak()
+            habit.streak = metrics[habit.pk]['current_streak']
+            habit.completed_current_period = metrics[habit.pk]['completed_current_period']
 
         if view_mode == 'category':
             categorized_habits = {}
@@ -195,6 +140,10 @@ class HabitAnalyticsService:
         else:  # weekly
             total_possible = (days_since_creation + 6) // 7
 
+        streaks = CompletionCalculator(today).calculate(
+            habit, [c.completed_at for c in completions]
+        )
+
         # Count actual completions
         total_completions = len([c for c in completions 
                                if c.completed_at >= habit.created_at.date()])
@@ -211,25 +160,31 @@ class HabitAnalyticsService:
             ),
             'this_week_completions': week_completions,
             'this_month_completions': month_completions,
-            'current_streak': habit.current_streak(),
-            'longest_streak': habit.longest_streak(),
+            'current_streak': streaks['current_streak'],
+            'longest_streak': streaks['longest_streak'],
         }
 
-    def get_list_view_data(self, view_mode='frequency', selected_category=None):
-        """Get all data needed for the habit list view"""
-        # Get habits with annotations
-        habits = self.get_habits_with_analytics()
-        
-        # Apply category filter if needed
-        if selected_category:
-            habits = habits.filter(category=selected_category)
-        
-        # Get analytics and notifications
-        analytics = self.get_analytics(habits)
-        notifications = self.get_notifications(habits)
-        
+    def get_list_view_data(self, habits=None, view_mode='frequency', selected_category=None):
+        """Get all data needed for the habit list view.
+
+        The analytics, notifications and each habit's card metrics come from
+        the user's habit list snapshot. Only when that isn't cached are the
+        habits' completions loaded (one prefetch) and the metrics computed.
+        """
+        if habits is None:
+            habits = self.get_habits(selected_category)
+        habits = list(habits)
+
+        snapshot = AnalyticsSnapshotCache.get_or_build(
+            self.user,
+            AnalyticsSnapshotCache.habit_list(selected_category),
+            lambda: self._build_list_snapshot(habits)
+        )
+        no_metrics = {'current_streak': 0, 'completed_current_period': False}
+        cards = {habit.pk: snapshot['habits'].get(habit.pk, no_metrics) for habit in habits}
+
         # Get habits organized by view mode
-        view_data = self.get_habits_by_view_mode(habits, view_mode)
+        view_data = self.get_habits_by_view_mode(habits, view_mode, cards)
         
         # Get latest AI summary
         latest_summary = AIHabitSummary.objects.filter(
@@ -238,11 +193,24 @@ class HabitAnalyticsService:
         
         return {
             'object_list': habits,
-            'notifications': notifications,
-            'habit_analytics': analytics,
-            'analytics': analytics,
+            'notifications': snapshot['notifications'],
+            'habit_analytics': snapshot['analytics'],
+            'analytics': snapshot['analytics'],
             'view_mode': view_mode,
             'habit_categories': Habit.CATEGORY_CHOICES,
             'latest_summary': latest_summary,
             **view_data  # Include categorized_habits or daily/weekly habits
         }
+
+    def _build_list_snapshot(self, habits):
+        """Analytics, notifications and card metrics for habits, computed from their completions"""
+        prefetch_related_objects(habits, 'completions')
+        metrics = CompletionCalculator().calculate_many(habits)
+        return {
+            'analytics': self.get_analytics(habits, metrics),
+            'notifications': self.get_notifications(habits, metrics),
+            'habits': {
+                habit_id: {name: habit_metrics[name] for name in HABIT_CARD_METRICS}
+                for habit_id, habit_metrics in metrics.items()
+            },
+        }
@@ -0,0 +1,105 @@
+import base64
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from habits.models import DailyCompletionRollup
+
+class CalendarService:
+    """Completion calendars as bitsets: bit i is set when day start + i has a completion.
+
+    A habit's or user's whole history is built from one indexed read (the
+    completion dates, or the user's daily rollups), held in the 'analytics'
+    cache (shared by every process unless it is locmem) as a Python int with
+    its base date, and sliced per request. On the wire the
+    bits are base64 encoded little-endian: bit i lives in byte i // 8 at
+    position i % 8, so five years of days is 229 bytes, about 308 base64
+    characters.
+    """
+
+    DEFAULT_DAYS = 365
+    MAX_DAYS = 366 * 10
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def habit_cache_key(habit_id):
+        return f'habit_calendar:{habit_id}'
+
+    @staticmethod
+    def user_cache_key(user_id):
+        return f'user_calendar:{user_id}'
+
+    @classmethod
+    def invalidate(cls, habit):
+        """Drop the habit's and owner's bitsets now and again once the change commits,
+        in case a read in between cached them from the old completions"""
+        keys = [cls.habit_cache_key(habit.pk), cls.user_cache_key(habit.user_id)]
+        caches['analytics'].delete_many(keys)
+        transaction.on_commit(lambda: caches['analytics'].delete_many(keys))
+
+    @classmethod
+    def default_range(cls, today=None):
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        return today - timedelta(days=cls.DEFAULT_DAYS - 1), today
+
+    @classmethod
+    def habit_calendar(cls, habit, start, end):
+        bitset = caches['analytics'].get(cls.habit_cache_key(habit.pk))
+        if bitset is None:
+            bitset = cls.build_bitset(habit.completions.values_list('completed_at', flat=True))
+            caches['analytics'].set(cls.habit_cache_key(habit.pk), bitset, cls.CACHE_TIMEOUT)
+        return cls.to_payload(bitset, start, end)
+
+    @classmethod
+    def user_calendar(cls, user, start, end):
+        bitset = caches['analytics'].get(cls.user_cache_key(user.pk))
+        if bitset is None:
+            bitset = cls.build_bitset(
+                DailyCompletionRollup.objects
+                .filter(user=user, completions__gt=0)
+                .values_list('date', flat=True)
+                .distinct()
+            )
+            caches['analytics'].set(cls.user_cache_key(user.pk), bitset, cls.CACHE_TIMEOUT)
+        return cls.to_payload(bitset, start, end)
+
+    @staticmethod
+    def build_bitset(dates):
+        """(base ordinal, int bitset) for a collection of dates"""
+        ordinals = {day.toordinal() for day in dates}
+        if not ordinals:
+            return 0, 0
+        base = min(ordinals)
+        bits = 0
+        for ordinal in ordinals:
+            bits |= 1 << (ordinal - base)
+        return base, bits
+
+    @staticmethod
+    def slice_bits(bitset, start, end):
+        """The bits for start..end (inclusive) as an int with bit 0 = start"""
+        base, bits = bitset
+        days = (end - start).days + 1
+        offset = start.toordinal() - base
+        shifted = bits >> offset if offset >= 0 else bits << -offset
+        return shifted & ((1 << days) - 1)
+
+    @classmethod
+    def to_payload(cls, bitset, start, end):
+        days = (end - start).days + 1
+        bits = cls.slice_bits(bitset, start, end)
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': days,
+            'completed_days': bin(bits).count('1'),
+            'bitmap': base64.b64encode(bits.to_bytes((days + 7) // 8, 'little')).decode('ascii'),
+        }
+
+    @staticmethod
+    def decode(payload):
+        """Completed dates from a payload produced by to_payload"""
+        start = date.fromisoformat(payload['start'])
+        bits = int.from_bytes(base64.b64decode(payload['bitmap']), 'little')
+        return [start + timedelta(days=i) for i in range(payload['days']) if bits >> i & 1]
@@ -0,0 +1,173 @@
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from habits.models import DailyCompletionRollup, HabitCompletion
+
+# Both vendors support INSERT ... ON CONFLICT, which makes an increment a single statement
+UPSERT_SQL = """
+INSERT INTO {table} (user_id, date, category, frequency, completions)
+VALUES {values}
+ON CONFLICT (user_id, date, category, frequency)
+DO UPDATE SET completions = {table}.completions + EXCLUDED.completions
+"""
+UPSERT_VENDORS = {'postgresql', 'sqlite'}
+
+class RollupService:
+    """Maintains DailyCompletionRollup rows and answers totals from them"""
+
+    @classmethod
+    def record(cls, habit, date, delta=1):
+        """Add delta completions for the habit's owner/category/frequency on date"""
+        cls.record_changes([(habit, date, delta)])
+
+    @classmethod
+    def record_changes(cls, changes):
+        """Apply many (habit, date, delta) changes in a handful of statements"""
+        deltas = {}
+        for habit, date, delta in changes:
+            key = (habit.user_id, date, habit.category, habit.frequency)
+            deltas[key] = deltas.get(key, 0) + delta
+
+        # Removed completions were counted, so their rows exist and only need an UPDATE,
+        # which (unlike an upsert) can never insert a negative row
+        removed = {}
+        for (user_id, date, category, frequency), delta in deltas.items():
+            if delta < 0:
+                removed.setdefault((user_id, category, frequency, delta), []).append(date)
+        for (user_id, category, frequency, delta), dates in removed.items():
+            DailyCompletionRollup.objects.filter(
+                user_id=user_id, category=category, frequency=frequency, date__in=dates
+            ).update(completions=F('completions') + delta)
+
+        added = [(*key, delta) for key, delta in deltas.items() if delta > 0]
+        if not added:
+            return
+        if connection.vendor in UPSERT_VENDORS:
+            cls._upsert(added)
+            return
+        for user_id, date, category, frequency, delta in added:
+            rollup, _ = DailyCompletionRollup.objects.get_or_create(
+                user_id=user_id, date=date, category=category, frequency=frequency
+            )
+            DailyCompletionRollup.objects.filter(pk=rollup.pk).update(completions=F('completions') + delta)
+
+    @staticmethod
+    def _upsert(rows):
+        """Insert or increment (user_id, date, category, frequency, delta) rows"""
+        table = connection.ops.quote_name(DailyCompletionRollup._meta.db_table)
+        params = []
+        for user_id, date, category, frequency, delta in rows:
+            params += [user_id, connection.ops.adapt_datefield_value(date), category, frequency, delta]
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(UPSERT_SQL.format(table=table, values=values), params)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(users):
+        """Recompute rollups for a queryset of users from their completions; returns the row count"""
+        user_ids = users.values('pk')
+        rows = (HabitCompletion.objects
+            .filter(habit__user__in=user_ids)
+            .values('habit__user', 'completed_at', 'habit__category', 'habit__frequency')
+            .annotate(total=Count('id'))
+            .order_by())
+
+        DailyCompletionRollup.objects.filter(user__in=user_ids).delete()
+        rollups = DailyCompletionRollup.objects.bulk_create(
+            (
+                DailyCompletionRollup(
+                    user_id=row['habit__user'],
+                    date=row['completed_at'],
+                    category=row['habit__category'],
+                    frequency=row['habit__frequency'],
+                    completions=row['total'],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+        return len(rollups)
+
+    @staticmethod
+    def rollups(user, start=None, end=None, category=None):
+        """Rollup rows for a user, optionally limited to a date range (inclusive) and category"""
+        rollups = DailyCompletionRollup.objects.filter(user=user)
+        if start is not None:
+            rollups = rollups.filter(date__gte=start)
+        if end is not None:
+            rollups = rollups.filter(date__lte=end)
+        if category:
+            rollups = rollups.filter(category=category)
+        return rollups
+
+    @classmethod
+    def total(cls, user, start=None, end=None, category=None):
+        return cls.rollups(user, start, end, category).aggregate(
+            total=Coalesce(Sum('completions'), 0)
+        )['total']
+
+    @staticmethod
+    def _period_sums(today):
+        starts = {
+            'today': today,
+            'week': today - timedelta(days=today.weekday()),
+            'month': today.replace(day=1),
+            'year': today.replace(month=1, day=1),
+        }
+        sums = {
+            name: Coalesce(Sum('completions', filter=Q(date__gte=start, date__lte=today)), 0)
+            for name, start in starts.items()
+        }
+        # Future-dated completions aren't counted yet
+        sums['total'] = Coalesce(Sum('completions', filter=Q(date__lte=today)), 0)
+        return sums
+
+    @classmethod
+    def period_totals(cls, user, today=None, category=None):
+        """Completions today, this week, this month, this year and overall in one query"""
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        return cls.rollups(user, category=category).aggregate(**cls._period_sums(today))
+
+    @classmethod
+    def grouped_period_totals(cls, user_ids, today=None, categories=None):
+        """{(user_id, category, frequency): period totals} for many users in one query"""
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        rollups = DailyCompletionRollup.objects.filter(user_id__in=user_ids)
+        if categories is not None:
+            rollups = rollups.filter(category__in=categories)
+        rows = (rollups
+            .values('user_id', 'category', 'frequency')
+            .annotate(**cls._period_sums(today))
+            .order_by())
+        return {(row.pop('user_id'), row.pop('category'), row.pop('frequency')): row for row in rows}
+
+    @classmethod
+    def category_totals(cls, user, start=None, end=None):
+        """{category: completions} for a user"""
+        return dict(
+            cls.rollups(user, start, end)
+            .values('category')
+            .annotate(total=Sum('completions'))
+            .order_by()
+            .values_list('category', 'total')
+        )
+
+    @classmethod
+    def daily_totals(cls, user, start, end, category=None):
+        """{date: completions} for every day in start..end (inclusive), zero-filled"""
+        totals = dict(
+            cls.rollups(user, start, end, category)
+            .values('date')
+            .annotate(total=Sum('completions'))
+            .order_by()
+            .values_list('date', 'total')
+        )
+        return {
+            start + timedelta(days=offset): totals.get(start + timedelta(days=offset), 0)
+            for offset in range((end - start).days + 1)
+        }
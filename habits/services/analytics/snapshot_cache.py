@@ -0,0 +1,50 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from habits.models import Habit
+
+class AnalyticsSnapshotCache:
+    """Per-user analytics snapshots for the current local date.
+
+    Snapshots live in the 'analytics' cache and are keyed by user, date and
+    view, so they roll over at midnight on their own. Signal handlers call
+    invalidate() whenever a user's habits or completions change.
+    """
+
+    DASHBOARD = 'dashboard'
+    TRENDS = 'trends'
+
+    @staticmethod
+    def habit_list(category=None):
+        return f'habit_list:{category or "all"}'
+
+    @classmethod
+    def names(cls):
+        return [cls.DASHBOARD, cls.TRENDS, cls.habit_list()] + [
+            cls.habit_list(category) for category, _ in Habit.CATEGORY_CHOICES
+        ]
+
+    @staticmethod
+    def cache_key(user_id, name, today=None):
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        return f'habit_analytics:{user_id}:{today.isoformat()}:{name}'
+
+    @classmethod
+    def get_or_build(cls, user, name, build):
+        """The cached snapshot, or build() stored for the rest of the day"""
+        key = cls.cache_key(user.pk, name)
+        snapshot = caches['analytics'].get(key)
+        if snapshot is None:
+            snapshot = build()
+            caches['analytics'].set(key, snapshot)
+        return snapshot
+
+    @classmethod
+    def invalidate(cls, user_id):
+        """Drop the user's snapshots now and again once the change commits, so a read
+        that rebuilt them from the old data in between isn't served for the rest of the day"""
+        today = timezone.localtime(timezone.now()).date()
+        keys = [cls.cache_key(user_id, name, today) for name in cls.names()]
+        caches['analytics'].delete_many(keys)
+        transaction.on_commit(lambda: caches['analytics'].delete_many(keys))
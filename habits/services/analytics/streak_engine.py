@@ -0,0 +1,145 @@
+from datetime import date
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion, HabitStreak
+
+EPOCH = date(1970, 1, 1)
+
+# Days since 1970-01-01 for a DATE column, per database vendor
+DAY_NUMBER_SQL = {
+    'postgresql': "({column} - DATE '1970-01-01')",
+    'sqlite': "CAST(julianday({column}) - 2440587.5 AS INTEGER)",
+}
+
+# 1970-01-01 was a Thursday, so shifting by 3 days puts week boundaries on Mondays
+STREAKS_SQL = """
+WITH periods AS (
+    SELECT DISTINCT c.habit_id,
+        CASE WHEN h.frequency = 'weekly' THEN ({day_number} + 3) / 7 ELSE {day_number} END AS period
+    FROM {completion_table} c
+    INNER JOIN {habit_table} h ON h.id = c.habit_id
+    WHERE c.habit_id IN ({habit_ids})
+),
+islands AS (
+    SELECT habit_id, period,
+        period - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY period) AS island
+    FROM periods
+),
+runs AS (
+    SELECT habit_id, MIN(period) AS run_start, MAX(period) AS run_end, COUNT(*) AS run_length
+    FROM islands
+    GROUP BY habit_id, island
+),
+today AS (
+    SELECT h.id AS habit_id,
+        CASE WHEN h.frequency = 'weekly' THEN %s ELSE %s END AS period
+    FROM {habit_table} h
+    WHERE h.id IN ({habit_ids})
+)
+SELECT r.habit_id,
+    MAX(CASE WHEN r.run_start <= t.period AND r.run_end >= t.period
+        THEN t.period - r.run_start + 1 ELSE 0 END) AS current_streak,
+    MAX(r.run_length) AS longest_streak
+FROM runs r
+INNER JOIN today t ON t.habit_id = r.habit_id
+GROUP BY r.habit_id
+"""
+
+class StreakEngine:
+    """Set-based streak calculation for many habits in a single query.
+
+    Consecutive completed periods are grouped into islands by subtracting
+    each period's row number from its day/week number, so the current and
+    longest streaks fall out of one aggregate over those islands.
+    """
+
+    @classmethod
+    def compute(cls, habits, today=None):
+        """Return {habit_id: {'current_streak': int, 'longest_streak': int}}.
+
+        habits may be a queryset (used as a subquery) or a list of habits/ids.
+        Habits without completions are left out; use get() for lookups.
+        """
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+
+        if connection.vendor not in DAY_NUMBER_SQL:
+            return cls._compute_in_python(habits, today)
+
+        habit_ids_sql, habit_ids_params = cls._habit_ids_sql(habits)
+        if habit_ids_sql is None:
+            return {}
+
+        day_number = DAY_NUMBER_SQL[connection.vendor].format(column='c.completed_at')
+        sql = STREAKS_SQL.format(
+            day_number=day_number,
+            completion_table=connection.ops.quote_name(HabitCompletion._meta.db_table),
+            habit_table=connection.ops.quote_name(Habit._meta.db_table),
+            habit_ids=habit_ids_sql,
+        )
+        today_day = (today - EPOCH).days
+        params = [*habit_ids_params, (today_day + 3) // 7, today_day, *habit_ids_params]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return {
+                habit_id: {'current_streak': int(current), 'longest_streak': int(longest)}
+                for habit_id, current, longest in cursor.fetchall()
+            }
+
+    @staticmethod
+    def get(streaks, habit):
+        """Look up a habit's streaks, defaulting to zero for habits without completions"""
+        return streaks.get(habit.pk, {'current_streak': 0, 'longest_streak': 0})
+
+    @staticmethod
+    def _habit_ids(habits):
+        return [habit.pk if isinstance(habit, Habit) else habit for habit in habits]
+
+    @classmethod
+    def _habit_ids_sql(cls, habits):
+        if isinstance(habits, QuerySet):
+            try:
+                return habits.order_by().values('pk').query.sql_with_params()
+            except EmptyResultSet:
+                # none() or a filter Django knows matches nothing (e.g. pk__in=[])
+                return None, ()
+
+        habit_ids = cls._habit_ids(habits)
+        if not habit_ids:
+            return None, ()
+        return ', '.join(['%s'] * len(habit_ids)), tuple(habit_ids)
+
+    @classmethod
+    def _compute_in_python(cls, habits, today):
+        """Fallback for databases without a day-number expression above"""
+        frequencies = dict(
+            Habit.objects.filter(pk__in=cls._habit_ids_subquery(habits)).values_list('pk', 'frequency')
+        )
+        dates = {}
+        for habit_id, completed_at in (HabitCompletion.objects
+                .filter(habit_id__in=frequencies)
+                .values_list('habit_id', 'completed_at')):
+            dates.setdefault(habit_id, []).append(completed_at)
+
+        streaks = {}
+        for habit_id, frequency in frequencies.items():
+            today_period = HabitStreak.period_start(today, frequency)
+            habit_dates = dates.get(habit_id, [])
+            upto_today = [d for d in habit_dates if HabitStreak.period_start(d, frequency) <= today_period]
+            current = HabitStreak.calculate(upto_today, frequency)
+            streaks[habit_id] = {
+                'current_streak': (
+                    current['current_streak'] if current['last_completed_period'] == today_period else 0
+                ),
+                'longest_streak': HabitStreak.calculate(habit_dates, frequency)['longest_streak'],
+            }
+        return streaks
+
+    @classmethod
+    def _habit_ids_subquery(cls, habits):
+        if isinstance(habits, QuerySet):
+            return habits.order_by().values('pk')
+        return cls._habit_ids(habits)
@@ -0,0 +1,189 @@
+from itertools import accumulate
+from datetime import timedelta
+from django.db import connection
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion
+from .snapshot_cache import AnalyticsSnapshotCache
+from .streak_engine import DAY_NUMBER_SQL, EPOCH
+
+# Day n of the series (0 = first_day) for every habit of the user, its completions on
+# that day, and the completions in each window ending on it; only reported days are returned
+WINDOW_SUMS_SQL = """
+WITH RECURSIVE days(n) AS (
+    SELECT 0
+    UNION ALL
+    SELECT n + 1 FROM days WHERE n < %s
+),
+daily AS (
+    SELECT c.habit_id, {day_number} - %s AS n, COUNT(*) AS completions
+    FROM {completion_table} c
+    INNER JOIN {habit_table} h ON h.id = c.habit_id
+    WHERE h.user_id = %s AND c.completed_at >= %s AND c.completed_at <= %s
+    GROUP BY c.habit_id, c.completed_at
+),
+series AS (
+    SELECT h.id AS habit_id, d.n, COALESCE(daily.completions, 0) AS completions
+    FROM {habit_table} h
+    CROSS JOIN days d
+    LEFT JOIN daily ON daily.habit_id = h.id AND daily.n = d.n
+    WHERE h.user_id = %s
+),
+windows AS (
+    SELECT habit_id, n, {window_sums}
+    FROM series
+)
+SELECT * FROM windows
+WHERE n >= %s
+ORDER BY habit_id, n
+"""
+
+WINDOW_SUM_SQL = "SUM(completions) OVER (PARTITION BY habit_id ORDER BY n ROWS BETWEEN {preceding} PRECEDING AND CURRENT ROW)"
+
+class TrendService:
+    """Rolling completion rates per habit and per category for the past year.
+
+    The database builds each habit's zero-filled daily series over a
+    calendar CTE and sums the 7/30/90-day windows with window functions, so
+    only the per-day window totals come back, never the raw completions.
+    Expected completions (1 a day for daily habits, 1/7 for weekly ones,
+    from the day the habit was created) follow from the habit itself, and
+    category rates add up their habits' totals. Results are cached per user
+    and day in the analytics snapshot cache.
+    """
+
+    WINDOWS = (7, 30, 90)
+    DAYS = 365
+
+    def __init__(self, user, today=None):
+        self.user = user
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        self.today = today
+
+    def get_trends(self, days=None):
+        """Trends for the last `days` days (at most DAYS), cached until the user's habits change"""
+        days = self.DAYS if days is None else max(1, min(days, self.DAYS))
+        trends = AnalyticsSnapshotCache.get_or_build(self.user, AnalyticsSnapshotCache.TRENDS, self.build)
+        if days == self.DAYS:
+            return trends
+        return {
+            **trends,
+            'start': (self.today - timedelta(days=days - 1)).isoformat(),
+            'habits': [self._slice(habit, days) for habit in trends['habits']],
+            'categories': [self._slice(category, days) for category in trends['categories']],
+        }
+
+    @staticmethod
+    def _slice(series, days):
+        return {**series, 'rates': {window: rates[-days:] for window, rates in series['rates'].items()}}
+
+    def build(self):
+        # Extra leading days so the first reported day has full windows behind it
+        length = self.DAYS + max(self.WINDOWS) - 1
+        first_day = self.today - timedelta(days=length - 1)
+
+        habits = list(
+            Habit.objects.filter(user=self.user)
+            .order_by('pk')
+            .values('pk', 'name', 'category', 'frequency', 'created_at')
+        )
+        if connection.vendor in DAY_NUMBER_SQL:
+            window_sums = self.window_sums(first_day, length)
+        else:
+            window_sums = self._window_sums_in_python(habits, first_day, length)
+
+        categories = {}
+        habit_trends = []
+        for habit in habits:
+            created = timezone.localtime(habit['created_at']).date()
+            start = min(max((created - first_day).days, 0), length)
+            per_day = 1 / 7 if habit['frequency'] == 'weekly' else 1
+            done = window_sums.get(habit['pk']) or {window: [0] * self.DAYS for window in self.WINDOWS}
+            possible = {window: self.expected(start, per_day, window, length) for window in self.WINDOWS}
+
+            habit_trends.append({
+                'id': habit['pk'],
+                'name': habit['name'],
+                'category': habit['category'],
+                'frequency': habit['frequency'],
+                'rates': self.rates(done, possible),
+            })
+            category_done, category_possible = categories.setdefault(habit['category'], (
+                {window: [0] * self.DAYS for window in self.WINDOWS},
+                {window: [0] * self.DAYS for window in self.WINDOWS},
+            ))
+            for window in self.WINDOWS:
+                category_done[window] = [a + b for a, b in zip(category_done[window], done[window])]
+                category_possible[window] = [a + b for a, b in zip(category_possible[window], possible[window])]
+
+        return {
+            'start': (self.today - timedelta(days=self.DAYS - 1)).isoformat(),
+            'end': self.today.isoformat(),
+            'windows': list(self.WINDOWS),
+            'habits': habit_trends,
+            'categories': [
+                {'category': category, 'rates': self.rates(done, possible)}
+                for category, (done, possible) in categories.items()
+            ],
+        }
+
+    def window_sums(self, first_day, length):
+        """{habit_id: {window: [completions in the window ending on each reported day]}} in one query"""
+        sql = WINDOW_SUMS_SQL.format(
+            day_number=DAY_NUMBER_SQL[connection.vendor].format(column='c.completed_at'),
+            completion_table=connection.ops.quote_name(HabitCompletion._meta.db_table),
+            habit_table=connection.ops.quote_name(Habit._meta.db_table),
+            window_sums=', '.join(
+                f"{WINDOW_SUM_SQL.format(preceding=window - 1)} AS w{window}" for window in self.WINDOWS
+            ),
+        )
+        params = [
+            length - 1, (first_day - EPOCH).days, self.user.pk, first_day, self.today,
+            self.user.pk, length - self.DAYS,
+        ]
+
+        sums = {}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            for habit_id, _, *window_totals in cursor.fetchall():
+                habit_sums = sums.setdefault(habit_id, {window: [] for window in self.WINDOWS})
+                for window, total in zip(self.WINDOWS, window_totals):
+                    habit_sums[window].append(int(total))
+        return sums
+
+    def _window_sums_in_python(self, habits, first_day, length):
+        """Fallback for databases without a day-number expression: prefix sums over the completions"""
+        completed = {habit['pk']: [0] * length for habit in habits}
+        for habit_id, completed_at in (HabitCompletion.objects
+                .filter(habit__user=self.user, completed_at__gte=first_day, completed_at__lte=self.today)
+                .values_list('habit_id', 'completed_at')):
+            completed[habit_id][(completed_at - first_day).days] += 1
+
+        sums = {}
+        for habit_id, completions in completed.items():
+            prefix = [0, *accumulate(completions)]
+            sums[habit_id] = {
+                window: [prefix[end] - prefix[end - window] for end in range(length - self.DAYS + 1, length + 1)]
+                for window in self.WINDOWS
+            }
+        return sums
+
+    def expected(self, start, per_day, window, length):
+        """Expected completions in the window ending on each reported day, for a habit
+        created on series day `start`"""
+        return [
+            per_day * max(0, min(window, end - start + 1))
+            for end in range(length - self.DAYS, length)
+        ]
+
+    @staticmethod
+    def rates(done, possible):
+        """{window: [rate or None, ...]} from completed and expected window totals"""
+        return {
+            # Float sums of 1/7 can leave dust where nothing was expected
+            str(window): [
+                min(round(completed * 100 / due, 1), 100.0) if due > 1e-9 else None
+                for completed, due in zip(done[window], possible[window])
+            ]
+            for window in done
+        }
@@ -1,12 +1,26 @@
 from datetime import timedelta
-from habits.models import HabitCompletion
+from django.db import connection, transaction
+from django.dispatch import Signal
+from habits.models import Habit, HabitCompletion
+
+# Sent once per bulk update with user, habits, added and removed ((habit, date) pairs).
+# The bulk update's inserts and deletes send no per-completion signals.
+completions_changed = Signal()
+
+# Sent with user and habits after completions were imported in bulk; derived state is rebuilt
+completions_imported = Signal()
 
 class HabitService:
     def __init__(self, user):
         self.user = user
 
+    @transaction.atomic
     def toggle_completion(self, habit, toggle_date):
-        """Toggle completion status for a habit on a specific date"""
+        """Toggle completion status for a habit on a specific date.
+
+        Runs in a single transaction so the streak state updated by the
+        completion signals commits together with the completion itself.
+        """
         if habit.frequency == 'weekly':
             return self._toggle_weekly_completion(habit, toggle_date)
         return self._toggle_daily_completion(habit, toggle_date)
@@ -48,4 +62,89 @@ class HabitService:
                 habit=habit,
                 completed_at=toggle_date
             )
-        return not existing_completion 
\ No newline at end of file
+        return not existing_completion
+
+    @transaction.atomic
+    def set_completions(self, operations):
+        """Apply many (habit_id, date, completed) operations in one transaction.
+
+        Ownership is checked and existing completions are read and locked with
+        one query each, then additions are inserted with one bulk insert and
+        removals deleted with one delete. Derived state (streaks, rollups,
+        counters, leaderboard, badges) is updated once through
+        completions_changed. Later operations on the same habit and date win.
+        A weekly habit is complete when any day of that week is. Returns
+        (added, removed). Raises Habit.DoesNotExist if any habit isn't the
+        user's, and IntegrityError if another request added one of the same
+        completions meanwhile (nothing is applied then).
+        """
+        operations = list(operations)
+        if not operations:
+            return [], []
+
+        habit_ids = {habit_id for habit_id, _, _ in operations}
+        # Concurrent bulk updates of the same habits take turns
+        habits = Habit.objects.select_for_update().filter(user=self.user, pk__in=habit_ids).in_bulk()
+        if len(habits) != len(habit_ids):
+            raise Habit.DoesNotExist("Habit not found")
+
+        def period(habit, day):
+            if habit.frequency == 'weekly':
+                start = day - timedelta(days=day.weekday())
+                return start, start + timedelta(days=6)
+            return day, day
+
+        periods = [period(habits[habit_id], day) for habit_id, day, _ in operations]
+        # Locked, so the rows reported as removed are the ones this delete removes
+        existing_pks = {
+            (habit_id, day): pk
+            for pk, habit_id, day in HabitCompletion.objects.select_for_update().filter(
+                habit_id__in=habit_ids,
+                completed_at__gte=min(start for start, _ in periods),
+                completed_at__lte=max(end for _, end in periods),
+            ).values_list('pk', 'habit_id', 'completed_at')
+        }
+        existing = set(existing_pks)
+
+        completed_days = {habit_id: set() for habit_id in habit_ids}
+        for habit_id, day in existing:
+            completed_days[habit_id].add(day)
+        for (habit_id, day, completed), (start, end) in zip(operations, periods):
+            days = completed_days[habit_id]
+            in_period = {d for d in days if start <= d <= end} if start != end else days & {day}
+            if not completed:
+                days -= in_period
+            elif not in_period:
+                days.add(day)
+
+        current = {(habit_id, day) for habit_id, days in completed_days.items() for day in days}
+        added = sorted(current - existing)
+        removed = sorted(existing - current)
+        if added:
+            # No ignore_conflicts: a completion someone else added meanwhile must fail the
+            # update rather than be reported (and counted) as added here
+            HabitCompletion.objects.bulk_create(
+                [HabitCompletion(habit_id=habit_id, completed_at=day) for habit_id, day in added]
+            )
+        if removed:
+            # A queryset delete would send post_delete for every row, and the per-completion
+            # receivers would redo what completions_changed below covers once
+            pks = [existing_pks[key] for key in removed]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(HabitCompletion._meta.db_table)} "
+                    f"WHERE {connection.ops.quote_name(HabitCompletion._meta.pk.column)} "
+                    f"IN ({', '.join(['%s'] * len(pks))})",
+                    pks,
+                )
+
+        if added or removed:
+            changed = {habit_id for habit_id, _ in added + removed}
+            completions_changed.send(
+                sender=HabitCompletion,
+                user=self.user,
+                habits=[habits[habit_id] for habit_id in sorted(changed)],
+                added=[(habits[habit_id], day) for habit_id, day in added],
+                removed=[(habits[habit_id], day) for habit_id, day in removed],
+            )
+        return added, removed
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+import time
+from datetime import date
+from django.db import transaction
+from habits.models import Habit, HabitCompletion
+from .habit_service import completions_imported
+
+class CompletionImportService:
+    """Imports historical completions from CSV or JSON Lines files of (habit, date) rows.
+
+    Rows are parsed lazily and inserted in batches, so memory stays flat no
+    matter how long the history is. Completions that already exist (or repeat
+    within the file) are skipped by the (habit, completed_at) unique constraint.
+    """
+
+    FORMATS = ('csv', 'json')
+    batch_size = 1000
+    max_reported_errors = 20
+
+    def __init__(self, user, batch_size=None):
+        self.user = user
+        if batch_size is not None:
+            self.batch_size = batch_size
+
+    @staticmethod
+    def detect_format(filename):
+        return 'json' if filename.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv'
+
+    @staticmethod
+    def parse_rows(lines, file_format):
+        """Yield (line number, habit name, date string) from a text stream.
+
+        CSV files need a header row with habit and date columns; JSON files
+        hold one {"habit": ..., "date": ...} object per line.
+        """
+        if file_format == 'csv':
+            reader = csv.DictReader(lines)
+            for row in reader:
+                yield reader.line_num, row.get('habit'), row.get('date')
+            return
+
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                row = {}
+            yield line_number, row.get('habit'), row.get('date')
+
+    def import_file(self, file, file_format):
+        """Import from a binary file object (e.g. an upload).
+
+        Lines are decoded as they're read, so a file that isn't UTF-8 (or a
+        malformed CSV) can fail part way through; nothing is imported then
+        and the problem is reported in the result's errors.
+        """
+        started = time.monotonic()
+        lines = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            return self.import_rows(self.parse_rows(lines, file_format))
+        except UnicodeDecodeError:
+            error = "The file is not UTF-8 encoded text"
+        except csv.Error as e:
+            error = f"The file is not valid CSV: {e}"
+        finally:
+            lines.detach()
+        return self._result(started, errors=[error])
+
+    @staticmethod
+    def _result(started, **counts):
+        result = {'rows': 0, 'imported': 0, 'duplicates': 0, 'rejected': 0, 'errors': [], **counts}
+        result['seconds'] = time.monotonic() - started
+        result['rows_per_second'] = result['rows'] / result['seconds'] if result['seconds'] else 0
+        return result
+
+    @staticmethod
+    def _insert(batch):
+        """Insert a batch of completions, returning how many were new"""
+        if not batch:
+            return 0
+        # Count only the batch's habits and dates rather than the user's whole history
+        in_batch = HabitCompletion.objects.filter(
+            habit_id__in={completion.habit_id for completion in batch},
+            completed_at__range=(
+                min(completion.completed_at for completion in batch),
+                max(completion.completed_at for completion in batch),
+            ),
+        )
+        before = in_batch.count()
+        HabitCompletion.objects.bulk_create(batch, ignore_conflicts=True)
+        return in_batch.count() - before
+
+    @transaction.atomic
+    def import_rows(self, rows):
+        """Insert completions for (line number, habit name, date string) rows.
+
+        Returns a summary with counts of rows, imported, duplicates and
+        rejected rows, the first few error messages and the throughput.
+        """
+        started = time.monotonic()
+        habits = {}
+        for habit in Habit.objects.filter(user=self.user).order_by('pk'):
+            habits.setdefault(habit.name, habit)
+
+        result = {'rows': 0, 'imported': 0, 'rejected': 0, 'errors': []}
+        imported_habits = {}
+        batch = []
+        for line_number, name, value in rows:
+            result['rows'] += 1
+            habit = habits.get(name.strip() if isinstance(name, str) else name)
+            try:
+                completed_at = date.fromisoformat(value.strip())
+            except (AttributeError, ValueError):
+                completed_at = None
+
+            if habit is None or completed_at is None:
+                result['rejected'] += 1
+                if len(result['errors']) < self.max_reported_errors:
+                    problem = f"unknown habit {name!r}" if habit is None else f"invalid date {value!r}"
+                    result['errors'].append(f"Line {line_number}: {problem}")
+                continue
+
+            imported_habits[habit.pk] = habit
+            batch.append(HabitCompletion(habit=habit, completed_at=completed_at))
+            if len(batch) >= self.batch_size:
+                result['imported'] += self._insert(batch)
+                batch = []
+        result['imported'] += self._insert(batch)
+
+        result['duplicates'] = result['rows'] - result['rejected'] - result['imported']
+        if result['imported']:
+            completions_imported.send(
+                sender=HabitCompletion, user=self.user, habits=list(imported_habits.values())
+            )
+        return self._result(started, **result)
@@ -0,0 +1,63 @@
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from habits.models import Habit, HabitStreak
+
+class StreakService:
+    """Keeps HabitStreak rows in sync with a habit's completions"""
+
+    @staticmethod
+    def rebuild(habit):
+        """Recalculate a habit's streak state from all of its completions"""
+        dates = habit.completions.values_list('completed_at', flat=True)
+        state, _ = HabitStreak.objects.update_or_create(
+            habit=habit,
+            defaults=HabitStreak.calculate(dates, habit.frequency)
+        )
+        habit.streak_state = state
+        return state
+
+    @classmethod
+    def rebuild_all(cls, habits=None):
+        """Rebuild streak state for many habits, returning how many were rebuilt"""
+        if habits is None:
+            habits = Habit.objects.all()
+
+        count = 0
+        for habit in habits.iterator():
+            cls.rebuild(habit)
+            count += 1
+        return count
+
+    @staticmethod
+    def record_completion(habit, completed_at):
+        """Extend the stored streak for a newly added completion.
+
+        Completions in or after the last completed period are applied with a
+        single conditional UPDATE; backfilled ones fall back to a rebuild.
+        """
+        period = HabitStreak.period_start(completed_at, habit.frequency)
+        previous_period = period - HabitStreak.period_step(habit.frequency)
+        current_streak = Case(
+            When(last_completed_period=period, then=F('current_streak')),
+            When(last_completed_period=previous_period, then=F('current_streak') + 1),
+            default=Value(1),
+        )
+
+        updated = (HabitStreak.objects
+            .filter(habit=habit)
+            .filter(Q(last_completed_period__isnull=True) | Q(last_completed_period__lte=period))
+            .update(
+                current_streak=current_streak,
+                longest_streak=Greatest(F('longest_streak'), current_streak),
+                last_completed_period=period,
+                updated_at=timezone.now(),
+            ))
+        if not updated:
+            return StreakService.rebuild(habit)
+
+        # The cached state on this instance is stale now
+        related = Habit.streak_state.related
+        if related.is_cached(habit):
+            related.delete_cached_value(habit)
+        return None
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+from momentum.signals import deleted_directly
+from .models import Habit, HabitCompletion, HabitStreak
+from .services.analytics.calendar_service import CalendarService
+from .services.analytics.rollup_service import RollupService
+from .services.analytics.snapshot_cache import AnalyticsSnapshotCache
+from .services.habits.habit_service import completions_changed, completions_imported
+from .services.habits.streak_service import StreakService
+
+@receiver(post_save, sender=Habit)
+def sync_streak_state_for_habit(instance, created, update_fields=None, **kwargs):
+    """Create streak state for new habits and rebuild it when frequency changes"""
+    if created:
+        instance.streak_state = HabitStreak.objects.create(habit=instance)
+    elif 'frequency' in instance.changed_fields(update_fields):
+        StreakService.rebuild(instance)
+
+def _completed_at(instance):
+    # completed_at may have been assigned a datetime; use the stored date
+    return HabitCompletion._meta.get_field('completed_at').to_python(instance.completed_at)
+
+def _rebuild_rollups(user_id):
+    RollupService.rebuild(get_user_model().objects.filter(pk=user_id))
+
+@receiver(post_save, sender=Habit)
+def rebuild_rollups_for_habit(instance, created, update_fields=None, **kwargs):
+    """Regroup the owner's daily rollups when a habit's category or frequency changes"""
+    if not created and {'category', 'frequency'} & instance.changed_fields(update_fields):
+        _rebuild_rollups(instance.user_id)
+
+@receiver(post_delete, sender=Habit)
+def rebuild_rollups_on_habit_removal(instance, origin=None, **kwargs):
+    """Drop a deleted habit's completions from the rollups (users' own deletes cascade)"""
+    if deleted_directly(origin, Habit):
+        _rebuild_rollups(instance.user_id)
+
+@receiver(post_save, sender=HabitCompletion)
+def update_streak_on_completion(instance, created, **kwargs):
+    """Keep streak state and daily rollups in sync when a completion is added"""
+    if created:
+        completed_at = _completed_at(instance)
+        StreakService.record_completion(instance.habit, completed_at)
+        RollupService.record(instance.habit, completed_at)
+    else:
+        StreakService.rebuild(instance.habit)
+        _rebuild_rollups(instance.habit.user_id)
+
+@receiver(post_delete, sender=HabitCompletion)
+def update_streak_on_removal(instance, origin=None, **kwargs):
+    """Keep streak state and daily rollups in sync when a completion is removed"""
+    if deleted_directly(origin, HabitCompletion):
+        StreakService.rebuild(instance.habit)
+        RollupService.record(instance.habit, _completed_at(instance), -1)
+
+@receiver([post_save, post_delete], sender=HabitCompletion)
+def invalidate_calendars_on_completion(instance, origin=None, **kwargs):
+    """Drop cached calendar bitsets for the completion's habit and owner"""
+    if deleted_directly(origin, HabitCompletion):
+        CalendarService.invalidate(instance.habit)
+
+@receiver(completions_changed)
+def sync_state_for_bulk_update(habits, added, removed, **kwargs):
+    """Rebuild streaks, apply rollup deltas and drop calendars once per bulk update"""
+    for habit in habits:
+        StreakService.rebuild(habit)
+        CalendarService.invalidate(habit)
+    RollupService.record_changes(
+        [(habit, day, 1) for habit, day in added] + [(habit, day, -1) for habit, day in removed]
+    )
+
+@receiver(post_delete, sender=Habit)
+def invalidate_calendars_on_habit_removal(instance, **kwargs):
+    CalendarService.invalidate(instance)
+
+@receiver(completions_imported)
+def rebuild_state_after_import(user, habits, **kwargs):
+    """Imports can backfill anywhere in history, so rebuild rather than patch"""
+    for habit in habits:
+        StreakService.rebuild(habit)
+        CalendarService.invalidate(habit)
+    _rebuild_rollups(user.pk)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def clear_analytics_for_new_user(instance, created, raw=False, **kwargs):
+    """A reused user id must not inherit a deleted user's snapshots"""
+    if created and not raw:
+        AnalyticsSnapshotCache.invalidate(instance.pk)
+
+@receiver([post_save, post_delete], sender=Habit)
+def invalidate_analytics_for_habit(instance, **kwargs):
+    AnalyticsSnapshotCache.invalidate(instance.user_id)
+
+@receiver([post_save, post_delete], sender=HabitCompletion)
+def invalidate_analytics_on_completion(instance, origin=None, **kwargs):
+    if deleted_directly(origin, HabitCompletion):
+        AnalyticsSnapshotCache.invalidate(instance.habit.user_id)
+
+@receiver(completions_changed)
+@receiver(completions_imported)
+def invalidate_analytics_after_bulk_change(user, **kwargs):
+    AnalyticsSnapshotCache.invalidate(user.pk)
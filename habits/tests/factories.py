@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion
+from habits.services.analytics.rollup_service import RollupService
+from habits.services.habits.streak_service import StreakService
+
+def today():
+    return timezone.localtime(timezone.now()).date()
+
+def create_habit(user, name, frequency="daily", category="health", days_ago=(), created_days_ago=0):
+    """A habit created `created_days_ago` days ago, completed the given numbers of days before today.
+
+    The completions are bulk inserted, which skips the signals that maintain
+    derived state, so the habit's streak and its owner's rollups are brought
+    up to date here.
+    """
+    habit = Habit.objects.create(
+        user=user, name=name, frequency=frequency, category=category,
+        created_at=timezone.now() - timedelta(days=created_days_ago)
+    )
+    completions = HabitCompletion.objects.bulk_create([
+        HabitCompletion(habit=habit, completed_at=today() - timedelta(days=ago))
+        for ago in sorted(set(days_ago))
+    ])
+    StreakService.rebuild(habit)
+    RollupService.record_changes([(habit, completion.completed_at, 1) for completion in completions])
+    return habit
+
+def complete(habit, *days_ago, weeks=False):
+    """Complete the habit the given numbers of days (or weeks) ago, one at a time through the ORM"""
+    for ago in days_ago:
+        delta = timedelta(weeks=ago) if weeks else timedelta(days=ago)
+        HabitCompletion.objects.create(habit=habit, completed_at=today() - delta)
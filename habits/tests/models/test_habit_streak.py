@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion, HabitStreak
+from habits.services.habits.habit_service import HabitService
+from habits.tests.factories import complete
+
+class TestHabitStreak(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        self.habit = Habit.objects.create(
+            user=self.user, name="Exercise", frequency="daily", category="health"
+        )
+
+    def test_state_created_with_habit(self):
+        state = HabitStreak.objects.get(habit=self.habit)
+        self.assertEqual(state.current_streak, 0)
+        self.assertEqual(state.longest_streak, 0)
+        self.assertIsNone(state.last_completed_period)
+
+    def test_consecutive_completions_extend_streak(self):
+        complete(self.habit, 2, 1, 0)
+
+        state = HabitStreak.objects.get(habit=self.habit)
+        self.assertEqual(state.current_streak, 3)
+        self.assertEqual(state.longest_streak, 3)
+        self.assertEqual(state.last_completed_period, self.today)
+        self.assertEqual(self.habit.current_streak(), 3)
+
+    def test_backfilled_completion_joins_runs(self):
+        complete(self.habit, 5, 4, 2, 1, 0)
+        self.assertEqual(self.habit.longest_streak(), 3)
+
+        complete(self.habit, 3)
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.current_streak(), 6)
+        self.assertEqual(self.habit.longest_streak(), 6)
+
+    def test_removing_completion_breaks_streak(self):
+        complete(self.habit, 3, 2, 1, 0)
+        HabitCompletion.objects.get(habit=self.habit, completed_at=self.today - timedelta(days=1)).delete()
+
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.current_streak(), 1)
+        self.assertEqual(self.habit.longest_streak(), 2)
+
+    def test_streak_is_zero_when_today_not_completed(self):
+        complete(self.habit, 2, 1)
+        self.assertEqual(self.habit.current_streak(), 0)
+        self.assertEqual(self.habit.longest_streak(), 2)
+
+    def test_weekly_streak(self):
+        habit = Habit.objects.create(
+            user=self.user, name="Review", frequency="weekly", category="learning"
+        )
+        complete(habit, 0, 1, 2, weeks=True)
+        # A second completion in the same week doesn't extend the streak
+        HabitCompletion.objects.get_or_create(
+            habit=habit, completed_at=self.today - timedelta(days=self.today.weekday())
+        )
+
+        self.assertEqual(habit.current_streak(), 3)
+        self.assertEqual(habit.longest_streak(), 3)
+
+    def test_future_completion_falls_back_to_run_ending_today(self):
+        complete(self.habit, 1, 0, -2)
+        self.assertEqual(self.habit.current_streak(), 2)
+
+    def test_future_completion_without_today_has_no_streak(self):
+        complete(self.habit, 2, 1, -1)
+        self.assertEqual(self.habit.current_streak(), 0)
+
+    def test_toggle_updates_state(self):
+        service = HabitService(self.user)
+        service.toggle_completion(self.habit, self.today - timedelta(days=1))
+        service.toggle_completion(self.habit, self.today)
+        self.assertEqual(self.habit.current_streak(), 2)
+
+        service.toggle_completion(self.habit, self.today)
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.current_streak(), 0)
+        self.assertEqual(self.habit.longest_streak(), 1)
+
+    def test_frequency_change_rebuilds_state(self):
+        complete(self.habit, 1, 0)
+        self.habit.frequency = 'weekly'
+        self.habit.save()
+
+        state = HabitStreak.objects.get(habit=self.habit)
+        self.assertEqual(state.last_completed_period, self.today - timedelta(days=self.today.weekday()))
+
+    def test_reading_selected_state_needs_no_queries(self):
+        complete(self.habit, 1, 0)
+        habit = Habit.objects.select_related('streak_state').get(pk=self.habit.pk)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(habit.current_streak(), 2)
+            self.assertEqual(habit.longest_streak(), 2)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_missing_state_is_rebuilt_on_read(self):
+        complete(self.habit, 1, 0)
+        HabitStreak.objects.filter(habit=self.habit).delete()
+
+        habit = Habit.objects.get(pk=self.habit.pk)
+        self.assertEqual(habit.current_streak(), 2)
+        self.assertTrue(HabitStreak.objects.filter(habit=self.habit).exists())
+
+    def test_rebuild_streaks_command_repairs_drift(self):
+        complete(self.habit, 1, 0)
+        HabitStreak.objects.filter(habit=self.habit).update(current_streak=40, longest_streak=40)
+
+        out = StringIO()
+        call_command('rebuild_streaks', stdout=out)
+
+        state = HabitStreak.objects.get(habit=self.habit)
+        self.assertEqual(state.current_streak, 2)
+        self.assertEqual(state.longest_streak, 2)
+        self.assertIn("1 habit", out.getvalue())
@@ -6,6 +6,7 @@ from django.utils import timezone
 from habits.models import Habit, HabitCompletion, AIHabitSummary
 from habits.services.ai.ai_service import AIHabitService
 from applications.models import Application
+from social.services.monitoring.metrics import AI_SUMMARY_DURATION
 
 class TestAIHabitService(TestCase):
     def setUp(self):
@@ -234,4 +235,19 @@ class TestAIHabitService(TestCase):
         stats = self.service._gather_application_stats(self.user)
         self.assertEqual(stats['total'], 2)
         self.assertEqual(stats['recent'], 2)
-        self.assertEqual(stats['active'], 2) 
\ No newline at end of file
+        self.assertEqual(stats['active'], 2) 
+
+    def test_generation_latency_is_recorded(self):
+        self.service.client = mock.MagicMock()
+        self.service.client.chat.completions.create.return_value.choices = [
+            mock.MagicMock(message=mock.MagicMock(content="Summary"))
+        ]
+        successes = AI_SUMMARY_DURATION.count(outcome='success')
+        errors = AI_SUMMARY_DURATION.count(outcome='error')
+
+        self.service.generate_habit_summary(self.user)
+        self.service.client.chat.completions.create.side_effect = Exception("API Error")
+        self.service.generate_habit_summary(self.user)
+
+        self.assertEqual(AI_SUMMARY_DURATION.count(outcome='success'), successes + 1)
+        self.assertEqual(AI_SUMMARY_DURATION.count(outcome='error'), errors + 1)
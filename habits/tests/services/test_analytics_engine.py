@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.analytics_engine import AnalyticsEngine, SUMMARY_METRICS
+from habits.tests.factories import create_habit
+
+class TestAnalyticsEngine(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        create_habit(self.user, "Run", "daily", "health", [0, 1, 2, 5, 6, 7, 8, 40], created_days_ago=49)
+        create_habit(self.user, "Read", "daily", "learning", [1, 3], created_days_ago=10)
+        create_habit(self.user, "Review", "weekly", "productivity", [0, 7, 21], created_days_ago=30)
+        create_habit(self.user, "Plan", "daily", "productivity", [-2], created_days_ago=3)  # future-dated
+
+    def habits(self):
+        return Habit.objects.filter(user=self.user).order_by('pk')
+
+    def test_queries_and_prefetched_habits_agree(self):
+        engine = AnalyticsEngine(self.today)
+        from_queries = engine.summarize(self.habits(), list(SUMMARY_METRICS))
+        from_memory = engine.summarize(
+            list(self.habits().prefetch_related('completions')), list(SUMMARY_METRICS)
+        )
+
+        self.assertEqual(from_queries, from_memory)
+        self.assertEqual(from_queries['total_habits'], 4)
+        self.assertEqual(from_queries['total_completions'], 13)
+        self.assertEqual(from_queries['best_streak'], 3)
+
+    def test_best_streak_is_a_streak_not_a_completion_count(self):
+        summary = AnalyticsEngine(self.today).summarize(self.habits().filter(name="Read"), ['best_streak'])
+        self.assertEqual(summary['best_streak'], 0)
+
+    def test_only_requested_metrics_are_queried(self):
+        engine = AnalyticsEngine(self.today)
+        cases = [
+            (['total_habits'], 1),
+            (['this_week_completions', 'category_stats'], 2),
+            (['completion_rate', 'best_streak'], 3),
+        ]
+        for metrics, expected_queries in cases:
+            with CaptureQueriesContext(connection) as context:
+                summary = engine.summarize(self.habits(), metrics)
+            self.assertEqual(list(summary), metrics)
+            self.assertEqual(len(context.captured_queries), expected_queries, metrics)
+
+        habits = list(self.habits().prefetch_related('completions'))
+        with CaptureQueriesContext(connection) as context:
+            engine.summarize(habits, list(SUMMARY_METRICS))
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_completed_current_period(self):
+        rows = AnalyticsEngine(self.today).habit_rows(self.habits(), {'completed_current_period'})
+        self.assertEqual([row['completed_current_period'] for row in rows], [True, False, True, False])
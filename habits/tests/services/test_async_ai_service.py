@@ -0,0 +1,85 @@
+import asyncio
+import os
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from habits.models import AIHabitSummary, Habit
+from habits.services.ai.async_ai_service import AsyncAIHabitService, get_async_client
+
+@override_settings(
+    AI_ASYNC_CLIENT='habits.services.ai.fake_client.FakeAsyncOpenAI',
+    AI_MAX_CONCURRENT_REQUESTS=2,
+)
+class TestAsyncAIHabitService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='testpass123')
+        Habit.objects.create(user=self.user, name="Exercise", category="health")
+        self.service = AsyncAIHabitService()
+
+    async def test_create_summary_uses_the_shared_client(self):
+        summary, error = await self.service.create_summary(self.user)
+
+        self.assertIsNone(error)
+        client = await get_async_client()
+        self.assertIs(client, await get_async_client())
+        self.assertEqual(summary.content, client.content)
+        self.assertEqual(len(client.calls), 1)
+        self.assertIn("Exercise", client.calls[0]['messages'][1]['content'])
+        self.assertEqual(await AIHabitSummary.objects.acount(), 1)
+
+    async def test_fake_client_needs_no_api_key(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('OPENAI_API_KEY', None)
+            summary, error = await self.service.create_summary(self.user)
+        self.assertIsNone(error)
+
+    def test_client_is_closed_with_its_loop(self):
+        client = asyncio.run(get_async_client())
+        self.assertTrue(client.closed)
+
+    async def test_concurrent_calls_are_limited(self):
+        client = await get_async_client()
+        client.delay = 0.05
+
+        results = await asyncio.gather(*[self.service.generate_habit_summary(self.user) for _ in range(6)])
+
+        self.assertEqual(results, [client.content] * 6)
+        self.assertEqual(len(client.calls), 6)
+        self.assertEqual(client.max_in_flight, 2)
+
+    async def test_no_habits_skips_the_call(self):
+        await Habit.objects.all().adelete()
+
+        self.assertEqual(await self.service.generate_habit_summary(self.user), "No habits found to analyze.")
+        self.assertEqual((await get_async_client()).calls, [])
+
+    async def test_client_errors_are_returned(self):
+        async def fail(**kwargs):
+            raise Exception("API Error")
+        (await get_async_client()).chat.completions.create = fail
+
+        summary, error = await self.service.create_summary(self.user)
+        self.assertIsNone(summary)
+        self.assertEqual(error, "Error: API Error")
+
+    async def test_stream_summary_yields_tokens_then_saves(self):
+        events = [event async for event in self.service.stream_summary(self.user)]
+
+        client = await get_async_client()
+        self.assertTrue(client.calls[0]['stream'])
+        tokens = [value for event, value in events if event == 'token']
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual(''.join(tokens), client.content)
+        event, summary = events[-1]
+        self.assertEqual(event, 'done')
+        self.assertEqual(summary.content, client.content)
+        self.assertEqual(await AIHabitSummary.objects.acount(), 1)
+
+    async def test_stream_summary_errors_save_nothing(self):
+        async def fail(**kwargs):
+            raise Exception("API Error")
+        (await get_async_client()).chat.completions.create = fail
+
+        events = [event async for event in self.service.stream_summary(self.user)]
+        self.assertEqual(events, [('error', "Error: API Error")])
+        self.assertEqual(await AIHabitSummary.objects.acount(), 0)
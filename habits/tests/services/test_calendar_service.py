@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.calendar_service import CalendarService
+from habits.tests.factories import complete
+
+class TestCalendarService(TestCase):
+    def setUp(self):
+        caches['analytics'].clear()
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        self.habit = Habit.objects.create(user=self.user, name="Run", category="health")
+
+    def test_bitmap_round_trip(self):
+        start, end = date(2024, 1, 1), date(2024, 1, 20)
+        dates = [date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 9), date(2024, 1, 20), date(2025, 1, 1)]
+        payload = CalendarService.to_payload(CalendarService.build_bitset(dates), start, end)
+
+        self.assertEqual(payload['days'], 20)
+        self.assertEqual(payload['completed_days'], 4)
+        self.assertEqual(CalendarService.decode(payload), dates[:4])
+
+    def test_range_before_first_completion(self):
+        bitset = CalendarService.build_bitset([date(2024, 1, 10)])
+        payload = CalendarService.to_payload(bitset, date(2024, 1, 1), date(2024, 1, 31))
+        self.assertEqual(CalendarService.decode(payload), [date(2024, 1, 10)])
+
+    def test_five_years_is_compact(self):
+        complete(self.habit, *range(0, 5 * 365, 2))
+        start = self.today - timedelta(days=5 * 365 - 1)
+        payload = CalendarService.habit_calendar(self.habit, start, self.today)
+
+        self.assertEqual(payload['completed_days'], len(range(0, 5 * 365, 2)))
+        self.assertLess(len(payload['bitmap']), 320)
+
+    def test_habit_calendar_is_cached_and_invalidated(self):
+        complete(self.habit, 0, 3)
+        start, end = CalendarService.default_range(self.today)
+
+        with CaptureQueriesContext(connection) as context:
+            CalendarService.habit_calendar(self.habit, start, end)
+            payload = CalendarService.habit_calendar(self.habit, start, end)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(payload['completed_days'], 2)
+
+        self.habit.toggle_completion(self.today)
+        payload = CalendarService.habit_calendar(self.habit, start, end)
+        self.assertEqual(CalendarService.decode(payload), [self.today - timedelta(days=3)])
+
+    def test_bitsets_cached_before_commit_are_dropped(self):
+        complete(self.habit, 0)
+        start, end = CalendarService.default_range(self.today)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.habit.toggle_completion(self.today)
+            # Stands in for a concurrent read that still sees the completion
+            caches['analytics'].set(CalendarService.habit_cache_key(self.habit.pk), CalendarService.build_bitset([self.today]))
+        self.assertEqual(CalendarService.habit_calendar(self.habit, start, end)['completed_days'], 1)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(CalendarService.habit_calendar(self.habit, start, end)['completed_days'], 0)
+
+    def test_user_calendar_combines_habits(self):
+        other = Habit.objects.create(user=self.user, name="Read", category="learning")
+        complete(self.habit, 0, 2)
+        complete(other, 2, 5)
+        start, end = CalendarService.default_range(self.today)
+
+        payload = CalendarService.user_calendar(self.user, start, end)
+        self.assertEqual(
+            CalendarService.decode(payload),
+            [self.today - timedelta(days=ago) for ago in (5, 2, 0)]
+        )
+
+        other.delete()
+        payload = CalendarService.user_calendar(self.user, start, end)
+        self.assertEqual(payload['completed_days'], 2)
@@ -0,0 +1,80 @@
+import random
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.completion_calculator import CompletionCalculator
+from habits.services.analytics.streak_engine import StreakEngine
+from habits.tests.factories import create_habit
+
+class TestCompletionCalculator(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def prefetched(self):
+        return Habit.objects.filter(user=self.user).prefetch_related('completions')
+
+    def test_ordinals_are_sorted_and_unique(self):
+        dates = [self.today, self.today - timedelta(days=2), self.today]
+        ordinals = CompletionCalculator.ordinals(dates)
+        self.assertEqual(list(ordinals), [(self.today - timedelta(days=2)).toordinal(), self.today.toordinal()])
+        self.assertEqual(ordinals.typecode, 'i')
+
+    def test_daily_metrics(self):
+        habit = create_habit(self.user, "Daily", "daily", days_ago=[0, 1, 2, 5, 6, 7, 8, 40], created_days_ago=49)
+        metrics = CompletionCalculator(self.today).calculate(self.prefetched().get(pk=habit.pk))
+
+        start_of_week = self.today - timedelta(days=self.today.weekday())
+        start_of_month = self.today.replace(day=1)
+        dates = [self.today - timedelta(days=ago) for ago in [0, 1, 2, 5, 6, 7, 8, 40]]
+
+        self.assertEqual(metrics['current_streak'], 3)
+        self.assertEqual(metrics['longest_streak'], 4)
+        self.assertEqual(metrics['total_completions'], 8)
+        self.assertEqual(metrics['week_count'], len([d for d in dates if d >= start_of_week]))
+        self.assertEqual(metrics['month_count'], len([d for d in dates if d >= start_of_month]))
+        possible = habit.get_total_possible_completions()
+        self.assertEqual(metrics['possible_completions'], possible)
+        self.assertEqual(metrics['completion_rate'], round(8 * 100 / possible, 1))
+        self.assertTrue(metrics['completed_current_period'])
+
+    def test_weekly_metrics(self):
+        monday_offset = self.today.weekday()
+        habit = create_habit(self.user, "Weekly", "weekly", days_ago=[monday_offset + 1, monday_offset + 7])
+        metrics = CompletionCalculator(self.today).calculate(habit)
+
+        self.assertEqual(metrics['current_streak'], 0)
+        self.assertEqual(metrics['longest_streak'], 1)
+        self.assertFalse(metrics['completed_current_period'])
+
+    def test_matches_streak_engine(self):
+        rng = random.Random(7)
+        for i in range(10):
+            frequency = 'weekly' if i % 4 == 0 else 'daily'
+            days_ago = [ago for ago in range(-3, 500) if rng.random() < rng.choice([0.4, 0.8, 0.97])]
+            create_habit(self.user, f"Random {i}", frequency, days_ago=days_ago)
+
+        habits = self.prefetched()
+        metrics = CompletionCalculator().calculate_many(habits)
+        streaks = StreakEngine.compute(habits)
+        for habit in habits:
+            with self.subTest(habit=habit.name):
+                expected = StreakEngine.get(streaks, habit)
+                self.assertEqual(metrics[habit.pk]['current_streak'], expected['current_streak'])
+                self.assertEqual(metrics[habit.pk]['longest_streak'], expected['longest_streak'])
+
+    def test_no_queries_for_prefetched_habits(self):
+        for i in range(50):
+            create_habit(self.user, f"Habit {i}", "daily", days_ago=range(0, 365, 1 + i % 3))
+
+        habits = list(self.prefetched())
+        with CaptureQueriesContext(connection) as context:
+            metrics = CompletionCalculator().calculate_many(habits)
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(len(metrics), 50)
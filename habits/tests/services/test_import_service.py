@@ -0,0 +1,131 @@
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion
+from habits.services.analytics.rollup_service import RollupService
+from habits.services.habits.import_service import CompletionImportService
+from social.models import Badge, LeaderboardEntry, UserCounter
+
+class TestCompletionImportService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        self.run = Habit.objects.create(user=self.user, name="Run", category="health")
+        self.read = Habit.objects.create(user=self.user, name="Read", category="learning")
+        self.service = CompletionImportService(self.user, batch_size=3)
+
+    def csv_file(self, rows):
+        return io.BytesIO(("habit,date\n" + "".join(f"{habit},{day}\n" for habit, day in rows)).encode())
+
+    def test_import_csv(self):
+        HabitCompletion.objects.create(habit=self.run, completed_at=self.today)
+        rows = [("Run", self.today - timedelta(days=ago)) for ago in range(10)]
+        rows += [("Read", self.today), ("Read", self.today), ("Swim", self.today), ("Run", "yesterday")]
+
+        result = self.service.import_file(self.csv_file(rows), 'csv')
+
+        self.assertEqual(result['rows'], 14)
+        self.assertEqual(result['imported'], 10)
+        self.assertEqual(result['duplicates'], 2)
+        self.assertEqual(result['rejected'], 2)
+        self.assertEqual(result['errors'], [
+            "Line 14: unknown habit 'Swim'",
+            "Line 15: invalid date 'yesterday'",
+        ])
+
+        # Derived state is rebuilt once for the imported history
+        self.assertEqual(self.run.completions.count(), 10)
+        self.run.refresh_from_db()
+        self.assertEqual(self.run.current_streak(), 10)
+        self.assertEqual(RollupService.total(self.user), 11)
+        self.assertEqual(UserCounter.objects.get(user=self.user).total_completions, 11)
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user, category='all').total_completions, 11)
+        self.assertTrue(Badge.objects.filter(user=self.user, badge_type='health_7_day').exists())
+        self.assertTrue(Badge.objects.filter(user=self.user, badge_type='completions_10').exists())
+
+    def test_import_json_lines(self):
+        lines = io.BytesIO(
+            b'{"habit": "Read", "date": "2024-01-01"}\n'
+            b'\n'
+            b'not json\n'
+            b'{"habit": "Read", "date": "2024-01-02"}\n'
+        )
+        result = self.service.import_file(lines, 'json')
+
+        self.assertEqual((result['rows'], result['imported'], result['rejected']), (3, 2, 1))
+        self.assertEqual(
+            sorted(self.read.completions.values_list('completed_at', flat=True)),
+            [date(2024, 1, 1), date(2024, 1, 2)]
+        )
+
+    def test_unreadable_files_are_reported(self):
+        valid = "".join(f"Run,{self.today - timedelta(days=ago)}\n" for ago in range(5)).encode()
+        files = [
+            (b"habit,date\n" + valid + "Run,café\n".encode('latin-1'), 'csv', "The file is not UTF-8 encoded text"),
+            (b'{"habit": "Run", "date": "2024-01-01"}\n\xff\n', 'json', "The file is not UTF-8 encoded text"),
+            (b"habit,date\n" + valid + b"Run," + b"x" * 200000 + b"\n", 'csv', "The file is not valid CSV"),
+        ]
+        for content, file_format, error in files:
+            with self.subTest(file_format=file_format, error=error):
+                result = self.service.import_file(io.BytesIO(content), file_format)
+                self.assertEqual(result['imported'], 0)
+                self.assertTrue(result['errors'][0].startswith(error), result['errors'])
+                # Batches inserted before the bad line are rolled back
+                self.assertFalse(HabitCompletion.objects.exists())
+
+    def test_imported_count_ignores_other_history(self):
+        HabitCompletion.objects.bulk_create([
+            HabitCompletion(habit=self.run, completed_at=date(2010, 1, 1) + timedelta(days=n)) for n in range(50)
+        ])
+        rows = [(n, "Read", str(date(2020, 1, 1) + timedelta(days=n % 4))) for n in range(8)]
+
+        with CaptureQueriesContext(connection) as context:
+            result = self.service.import_rows(iter(rows))
+        self.assertEqual((result['imported'], result['duplicates']), (4, 4))
+        counts = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT COUNT(*) AS "__count" FROM "habits_habitcompletion"')
+        ]
+        self.assertEqual(len(counts), 6)
+        self.assertTrue(all('"completed_at" BETWEEN' in sql for sql in counts), counts)
+
+    def test_inserts_in_batches(self):
+        rows = [(n, "Run", str(date(2020, 1, 1) + timedelta(days=n))) for n in range(30)]
+
+        with CaptureQueriesContext(connection) as context:
+            self.service.import_rows(iter(rows))
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT') and '"habits_habitcompletion"' in query['sql'].split('(')[0]
+        ]
+        self.assertEqual(len(inserts), 10)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write("habit,date\nRun,2024-01-01\nRun,2024-01-02\n")
+        self.addCleanup(os.remove, f.name)
+
+        out = io.StringIO()
+        call_command("import_completions", "testuser", f.name, stdout=out)
+        self.assertEqual(self.run.completions.count(), 2)
+        self.assertIn("Imported 2 completion(s) from 2 row(s)", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+    def test_import_command_reports_unreadable_files(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.csv', delete=False) as f:
+            f.write("habit,date\nRun,2024-01-01\nRun,café\n".encode('latin-1'))
+        self.addCleanup(os.remove, f.name)
+
+        out, err = io.StringIO(), io.StringIO()
+        call_command("import_completions", "testuser", f.name, stdout=out, stderr=err)
+        self.assertIn("not UTF-8", err.getvalue())
+        self.assertIn("Imported 0 completion(s)", out.getvalue())
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import DailyCompletionRollup, Habit
+from habits.services.analytics.rollup_service import RollupService
+from habits.tests.factories import complete
+
+class TestRollupService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        self.health = Habit.objects.create(user=self.user, name="Run", category="health")
+        self.gym = Habit.objects.create(user=self.user, name="Gym", category="health")
+        self.reading = Habit.objects.create(
+            user=self.user, name="Read", category="learning", frequency="weekly"
+        )
+
+    def assert_matches_rebuild(self):
+        maintained = sorted(
+            DailyCompletionRollup.objects.filter(completions__gt=0)
+            .values_list('date', 'category', 'frequency', 'completions')
+        )
+        RollupService.rebuild(get_user_model().objects.filter(pk=self.user.pk))
+        rebuilt = sorted(
+            DailyCompletionRollup.objects.values_list('date', 'category', 'frequency', 'completions')
+        )
+        self.assertEqual(maintained, rebuilt)
+
+    def test_completions_are_rolled_up_per_day_and_category(self):
+        complete(self.health, 0, 1, 2)
+        complete(self.gym, 0, 1)
+        complete(self.reading, 0)
+
+        rollup = DailyCompletionRollup.objects.get(
+            user=self.user, date=self.today, category="health", frequency="daily"
+        )
+        self.assertEqual(rollup.completions, 2)
+        self.assertEqual(DailyCompletionRollup.objects.count(), 4)
+        self.assert_matches_rebuild()
+
+    def test_toggling_off_decrements(self):
+        self.health.toggle_completion(self.today)
+        self.gym.toggle_completion(self.today)
+        self.health.toggle_completion(self.today)
+
+        self.assertEqual(RollupService.total(self.user), 1)
+        self.assert_matches_rebuild()
+
+    def test_habit_changes_regroup_rollups(self):
+        complete(self.health, 0, 1)
+        self.health.category = "productivity"
+        self.health.save()
+        self.assertEqual(RollupService.category_totals(self.user), {"productivity": 2})
+
+        self.health.delete()
+        self.assertEqual(RollupService.total(self.user), 0)
+
+    def test_period_totals(self):
+        days_ago = [0, 1, 3, 10, 40, 400]
+        complete(self.health, *days_ago)
+        dates = [self.today - timedelta(days=ago) for ago in days_ago]
+
+        with CaptureQueriesContext(connection) as context:
+            totals = RollupService.period_totals(self.user, self.today)
+        self.assertEqual(len(context.captured_queries), 1)
+
+        start_of_week = self.today - timedelta(days=self.today.weekday())
+        self.assertEqual(totals['today'], 1)
+        self.assertEqual(totals['week'], len([d for d in dates if d >= start_of_week]))
+        self.assertEqual(totals['month'], len([d for d in dates if d >= self.today.replace(day=1)]))
+        self.assertEqual(totals['year'], len([d for d in dates if d >= self.today.replace(month=1, day=1)]))
+        self.assertEqual(totals['total'], 6)
+
+    def test_daily_totals_are_zero_filled(self):
+        complete(self.health, 0, 2)
+        complete(self.gym, 0)
+
+        totals = RollupService.daily_totals(self.user, self.today - timedelta(days=3), self.today)
+        self.assertEqual(list(totals.values()), [0, 1, 0, 2])
+
+    def test_rebuild_rollups_command(self):
+        complete(self.health, 0, 1)
+        DailyCompletionRollup.objects.all().delete()
+
+        out = StringIO()
+        call_command("rebuild_rollups", stdout=out)
+        self.assertEqual(RollupService.total(self.user), 2)
+        self.assertIn("2 daily rollup", out.getvalue())
+
+    def test_removing_uncounted_completions_never_goes_negative(self):
+        complete(self.health, 0)
+        DailyCompletionRollup.objects.all().delete()
+
+        RollupService.record_changes([(self.health, self.today, -1), (self.reading, self.today, 1)])
+        self.assertEqual(
+            list(DailyCompletionRollup.objects.values_list('category', 'completions')), [("learning", 1)]
+        )
@@ -0,0 +1,80 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion
+from habits.services.analytics.snapshot_cache import AnalyticsSnapshotCache
+from habits.services.habits.habit_service import HabitService
+
+class TestAnalyticsSnapshotCache(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+        self.habit = Habit.objects.create(user=self.user, name="Run", category="health")
+        self.builds = 0
+
+    def snapshot(self, name=AnalyticsSnapshotCache.DASHBOARD):
+        def build():
+            self.builds += 1
+            return {'total_completions': self.habit.completions.count()}
+        return AnalyticsSnapshotCache.get_or_build(self.user, name, build)
+
+    def test_snapshot_is_built_once(self):
+        self.snapshot()
+        self.snapshot()
+        self.assertEqual(self.builds, 1)
+
+    def test_changes_invalidate_snapshots(self):
+        changes = [
+            lambda: HabitCompletion.objects.create(habit=self.habit, completed_at=self.today),
+            lambda: self.habit.toggle_completion(self.today),
+            lambda: HabitService(self.user).set_completions([(self.habit.pk, self.today, True)]),
+            lambda: Habit.objects.filter(pk=self.habit.pk).first().save(),
+            lambda: Habit.objects.create(user=self.user, name="Read", category="learning"),
+        ]
+        for change in changes:
+            self.snapshot()
+            self.snapshot(AnalyticsSnapshotCache.habit_list("health"))
+            builds = self.builds
+            change()
+            self.snapshot()
+            self.snapshot(AnalyticsSnapshotCache.habit_list("health"))
+            self.assertEqual(self.builds, builds + 2)
+
+    def test_snapshots_rebuilt_before_commit_are_dropped(self):
+        HabitCompletion.objects.create(habit=self.habit, completed_at=self.today)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.habit.toggle_completion(self.today)
+            # A concurrent read before the commit would still see the completion
+            AnalyticsSnapshotCache.get_or_build(self.user, AnalyticsSnapshotCache.DASHBOARD, lambda: 'stale')
+        self.assertEqual(self.snapshot(), 'stale')
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.snapshot(), {'total_completions': 0})
+
+    def test_snapshots_roll_over_each_day(self):
+        self.snapshot()
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(days=1)):
+            self.snapshot()
+        self.assertEqual(self.builds, 2)
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "analytics": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                },
+            }
+            with override_settings(CACHES=caches):
+                self.assertEqual(self.snapshot(), {'total_completions': 0})
+                self.assertEqual(self.snapshot(), {'total_completions': 0})
+                HabitCompletion.objects.create(habit=self.habit, completed_at=self.today)
+                self.assertEqual(self.snapshot(), {'total_completions': 1})
+        self.assertEqual(self.builds, 2)
@@ -0,0 +1,76 @@
+import random
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.streak_engine import StreakEngine
+from habits.tests.factories import create_habit
+
+class TestStreakEngine(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def assert_matches_python(self, habits):
+        streaks = StreakEngine.compute(Habit.objects.filter(pk__in=[h.pk for h in habits]))
+        for habit in habits:
+            habit = Habit.objects.get(pk=habit.pk)
+            with self.subTest(habit=habit.name):
+                result = StreakEngine.get(streaks, habit)
+                self.assertEqual(result['current_streak'], habit.current_streak())
+                self.assertEqual(result['longest_streak'], habit.longest_streak())
+
+    def test_empty_habits(self):
+        habit = create_habit(self.user, "No Completions", "daily", days_ago=[])
+        self.assertEqual(StreakEngine.compute([habit]), {})
+        self.assertEqual(StreakEngine.get({}, habit), {'current_streak': 0, 'longest_streak': 0})
+        self.assertEqual(StreakEngine.compute([]), {})
+        self.assertEqual(StreakEngine.compute(Habit.objects.none()), {})
+        self.assertEqual(StreakEngine.compute(Habit.objects.filter(pk__in=[])), {})
+
+    def test_daily_streaks(self):
+        habit = create_habit(self.user, "Daily", "daily", days_ago=[0, 1, 2, 5, 6, 7, 8, 20])
+        result = StreakEngine.get(StreakEngine.compute([habit]), habit)
+        self.assertEqual(result, {'current_streak': 3, 'longest_streak': 4})
+
+    def test_daily_streak_broken_today(self):
+        habit = create_habit(self.user, "Yesterday", "daily", days_ago=[1, 2, 3])
+        result = StreakEngine.get(StreakEngine.compute([habit]), habit)
+        self.assertEqual(result, {'current_streak': 0, 'longest_streak': 3})
+
+    def test_weekly_streaks(self):
+        start_of_week = self.today.weekday()
+        habit = create_habit(
+            self.user, "Weekly", "weekly",
+            days_ago=[start_of_week, start_of_week + 7, start_of_week + 8, start_of_week + 14, start_of_week + 35]
+        )
+        result = StreakEngine.get(StreakEngine.compute([habit]), habit)
+        self.assertEqual(result, {'current_streak': 3, 'longest_streak': 3})
+
+    def test_future_completions(self):
+        habit = create_habit(self.user, "Future", "daily", days_ago=[-2, -1, 0, 1])
+        result = StreakEngine.get(StreakEngine.compute([habit]), habit)
+        self.assertEqual(result, {'current_streak': 2, 'longest_streak': 4})
+
+    def test_randomized_equivalence_with_python_implementation(self):
+        rng = random.Random(20240101)
+        habits = []
+        for i in range(12):
+            frequency = 'weekly' if i % 3 == 0 else 'daily'
+            density = rng.choice([0.3, 0.7, 0.95])
+            days_ago = [ago for ago in range(-3, 400) if rng.random() < density]
+            habits.append(create_habit(self.user, f"Random {i}", frequency, days_ago=days_ago))
+
+        self.assert_matches_python(habits)
+
+    def test_single_query_for_many_habits(self):
+        for i in range(5):
+            create_habit(self.user, f"Habit {i}", "daily", days_ago=range(i * 3))
+
+        with CaptureQueriesContext(connection) as context:
+            StreakEngine.compute(Habit.objects.filter(user=self.user))
+        self.assertEqual(len(context.captured_queries), 1)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+from habits.models import AIHabitSummary, AISummaryJob, Habit
+from habits.services.ai.ai_service import AIHabitService
+from habits.services.ai.summary_queue_service import SummaryQueueService
+
+def mock_openai(content="Keep it up"):
+    patcher = mock.patch('habits.services.ai.ai_service.OpenAI')
+    client = patcher.start().return_value
+    client.chat.completions.create.return_value.choices = [mock.MagicMock(message=mock.MagicMock(content=content))]
+    return patcher, client
+
+class TestSummaryQueueService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="testuser", password="testpass123")
+        Habit.objects.create(user=self.user, name="Run", category="health")
+        patcher, self.openai = mock_openai()
+        self.addCleanup(patcher.stop)
+
+    def test_enqueue_reuses_the_active_job(self):
+        job = SummaryQueueService.enqueue(self.user)
+        self.assertEqual(SummaryQueueService.enqueue(self.user), job)
+
+        job.status = 'done'
+        job.save()
+        self.assertNotEqual(SummaryQueueService.enqueue(self.user), job)
+
+    def test_enqueue_creates_again_when_the_active_job_finished_meanwhile(self):
+        create = AISummaryJob.objects.create
+        calls = []
+
+        def create_after_a_conflict(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise IntegrityError("duplicate key value violates unique constraint")
+            return create(**kwargs)
+
+        with mock.patch.object(AISummaryJob.objects, 'create', side_effect=create_after_a_conflict):
+            job = SummaryQueueService.enqueue(self.user)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.status, 'pending')
+
+    def test_claim_takes_the_oldest_pending_jobs(self):
+        other = get_user_model().objects.create_user(username="other", password="testpass123")
+        first = SummaryQueueService.enqueue(self.user)
+        second = SummaryQueueService.enqueue(other)
+
+        claimed = SummaryQueueService.claim()
+        self.assertEqual(claimed, [first])
+        self.assertEqual(claimed[0].status, 'running')
+        self.assertIsNotNone(claimed[0].started_at)
+        self.assertEqual(SummaryQueueService.claim(5), [second])
+        self.assertEqual(SummaryQueueService.claim(5), [])
+
+    def test_process_saves_the_summary(self):
+        SummaryQueueService.enqueue(self.user)
+        job = SummaryQueueService.process(SummaryQueueService.claim()[0])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.summary.content, "Keep it up")
+        self.assertIsNotNone(job.finished_at)
+
+    def test_process_records_failures(self):
+        self.openai.chat.completions.create.side_effect = Exception("API Error")
+        SummaryQueueService.enqueue(self.user)
+        job = SummaryQueueService.process(SummaryQueueService.claim()[0])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error, "Error: API Error")
+        self.assertEqual(AIHabitSummary.objects.count(), 0)
+
+    def test_stale_running_jobs_are_requeued(self):
+        SummaryQueueService.enqueue(self.user)
+        job = SummaryQueueService.claim()[0]
+
+        self.assertEqual(SummaryQueueService.requeue_stale(), 0)
+        self.assertEqual(SummaryQueueService.requeue_stale(timezone.now() + timedelta(minutes=11)), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+
+    def test_claim_retries_jobs_left_running_by_a_dead_worker(self):
+        SummaryQueueService.enqueue(self.user)
+        job = SummaryQueueService.claim()[0]
+        AISummaryJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(minutes=11))
+
+        self.assertEqual(SummaryQueueService.claim(), [job])
+        self.assertEqual(SummaryQueueService.enqueue(self.user), job)
+
+    def test_slow_running_jobs_are_not_claimed_twice(self):
+        SummaryQueueService.enqueue(self.user)
+        job = SummaryQueueService.claim()[0]
+        started = timezone.now() - SummaryQueueService.STALE_AFTER + timedelta(minutes=1)
+        AISummaryJob.objects.filter(pk=job.pk).update(started_at=started)
+
+        self.assertEqual(SummaryQueueService.claim(), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+    def test_llm_calls_give_up_before_jobs_go_stale(self):
+        with mock.patch('habits.services.ai.ai_service.OpenAI') as openai:
+            AIHabitService().client
+        options = openai.call_args.kwargs
+        longest_call = timedelta(seconds=options['timeout'] * (options['max_retries'] + 1))
+        self.assertLess(longest_call, SummaryQueueService.STALE_AFTER / 2)
+
+    def test_worker_processes_queued_jobs(self):
+        SummaryQueueService.enqueue(self.user)
+        out = StringIO()
+        call_command('ai_summary_worker', once=True, concurrency=1, stdout=out)
+
+        self.assertEqual(AISummaryJob.objects.get().status, 'done')
+        self.assertIn("Processed 1 job(s)", out.getvalue())
+
+class TestSummaryWorkerPool(TransactionTestCase):
+    # Without SKIP LOCKED (SQLite) the worker threads contend for the whole database
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_worker_pool_processes_jobs_concurrently(self):
+        patcher, _ = mock_openai()
+        self.addCleanup(patcher.stop)
+        for index in range(5):
+            user = get_user_model().objects.create_user(username=f"user{index}", password="testpass123")
+            Habit.objects.create(user=user, name="Run", category="health")
+            SummaryQueueService.enqueue(user)
+
+        out = StringIO()
+        call_command('ai_summary_worker', once=True, concurrency=3, stdout=out)
+
+        self.assertEqual(set(AISummaryJob.objects.values_list('status', flat=True)), {'done'})
+        self.assertEqual(AIHabitSummary.objects.count(), 5)
+        self.assertIn("Processed 5 job(s)", out.getvalue())
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.trend_service import TrendService
+from habits.tests.factories import create_habit
+
+class TestTrendService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def test_rolling_rates(self):
+        # Every other day for the last 30 days
+        run = create_habit(self.user, "Run", "daily", "health", range(0, 30, 2), created_days_ago=400)
+        trends = TrendService(self.user, self.today).build()
+
+        self.assertEqual(trends['end'], self.today.isoformat())
+        self.assertEqual(trends['windows'], [7, 30, 90])
+        rates = trends['habits'][0]['rates']
+        self.assertEqual(trends['habits'][0]['id'], run.pk)
+        self.assertEqual(len(rates['7']), TrendService.DAYS)
+        self.assertEqual(rates['7'][-1], round(4 * 100 / 7, 1))
+        self.assertEqual(rates['30'][-1], 50.0)
+        self.assertEqual(rates['90'][-1], round(15 * 100 / 90, 1))
+        self.assertEqual(rates['7'][0], 0.0)
+
+    def test_new_and_weekly_habits(self):
+        create_habit(self.user, "Read", "daily", "learning", [0, 1], created_days_ago=2)
+        create_habit(self.user, "Review", "weekly", "learning", [0, 7, 14, 21], created_days_ago=200)
+        trends = TrendService(self.user, self.today).build()
+
+        read, review = trends['habits']
+        # No rate before the habit existed; windows only count days since creation
+        self.assertIsNone(read['rates']['30'][-4])
+        self.assertEqual(read['rates']['30'][-1], round(2 * 100 / 3, 1))
+        self.assertEqual(review['rates']['30'][-1], round(4 * 100 / (30 / 7), 1))
+
+        learning = trends['categories'][0]
+        self.assertEqual(learning['category'], 'learning')
+        self.assertEqual(learning['rates']['7'][-1], round(3 * 100 / (3 + 1), 1))
+
+    def test_trends_are_cached_for_the_day(self):
+        habit = create_habit(self.user, "Run", "daily", "health", [1], created_days_ago=10)
+        service = TrendService(self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            service.get_trends()
+        self.assertEqual(len(context.captured_queries), 2)
+        with CaptureQueriesContext(connection) as context:
+            trends = service.get_trends(days=30)
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(len(trends['habits'][0]['rates']['7']), 30)
+        self.assertEqual(trends['start'], (service.today - timedelta(days=29)).isoformat())
+
+        habit.toggle_completion(service.today)
+        self.assertEqual(service.get_trends()['habits'][0]['rates']['7'][-1], round(2 * 100 / 7, 1))
+
+    def test_sql_windows_match_python_fallback(self):
+        create_habit(self.user, "Run", "daily", "health", range(0, 500, 3), created_days_ago=600)
+        create_habit(self.user, "Review", "weekly", "learning", range(1, 120, 7), created_days_ago=150)
+        create_habit(self.user, "Read", "daily", "learning", [], created_days_ago=5)
+        service = TrendService(self.user, self.today)
+        length = TrendService.DAYS + max(TrendService.WINDOWS) - 1
+        first_day = self.today - timedelta(days=length - 1)
+        habits = list(Habit.objects.filter(user=self.user).values('pk'))
+
+        with CaptureQueriesContext(connection) as context:
+            from_sql = service.window_sums(first_day, length)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(from_sql, service._window_sums_in_python(habits, first_day, length))
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from habits.models import Habit
+
+class TestCompletionImportView(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.habit = Habit.objects.create(user=self.user, name="Run", category="health")
+        self.url = reverse("habits:import_completions")
+
+    def test_import_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "habits/completion_import.html")
+
+    def test_upload_csv(self):
+        upload = SimpleUploadedFile("history.csv", b"habit,date\nRun,2024-01-01\nRun,2024-01-02\nGym,2024-01-02\n")
+        response = self.client.post(self.url, {"file": upload}, follow=True)
+
+        self.assertRedirects(response, reverse("habits:habit_list"))
+        self.assertEqual(self.habit.completions.count(), 2)
+        messages = [str(message) for message in response.context["messages"]]
+        self.assertIn("Imported 2 completion(s) (0 duplicate(s), 1 rejected)", messages)
+        self.assertIn("Line 4: unknown habit 'Gym'", messages)
+
+    def test_upload_json_lines(self):
+        upload = SimpleUploadedFile("history.txt", b'{"habit": "Run", "date": "2024-01-01"}\n')
+        self.client.post(self.url, {"file": upload, "format": "json"})
+        self.assertEqual(self.habit.completions.count(), 1)
+
+    def test_upload_that_is_not_utf8(self):
+        upload = SimpleUploadedFile("history.csv", "habit,date\nRun,2024-01-01\nRün,2024-01-02\n".encode('latin-1'))
+        response = self.client.post(self.url, {"file": upload}, follow=True)
+
+        self.assertRedirects(response, reverse("habits:habit_list"))
+        self.assertFalse(self.habit.completions.exists())
+        messages = [str(message) for message in response.context["messages"]]
+        self.assertIn("The file is not UTF-8 encoded text", messages)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
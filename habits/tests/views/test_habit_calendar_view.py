@@ -0,0 +1,57 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+from habits.models import Habit, HabitCompletion
+from habits.services.analytics.calendar_service import CalendarService
+
+class TestHabitCalendarView(TestCase):
+    def setUp(self):
+        caches['analytics'].clear()
+        self.today = timezone.localtime(timezone.now()).date()
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.habit = Habit.objects.create(
+            user=self.user, name="Test Habit", frequency="daily", category="health"
+        )
+        HabitCompletion.objects.create(habit=self.habit, completed_at=self.today)
+
+    def test_habit_calendar(self):
+        response = self.client.get(reverse("habits:habit_calendar", kwargs={"pk": self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["days"], CalendarService.DEFAULT_DAYS)
+        self.assertEqual(payload["end"], self.today.isoformat())
+        self.assertEqual(CalendarService.decode(payload), [self.today])
+
+    def test_user_calendar_with_range(self):
+        start = self.today - timedelta(days=6)
+        response = self.client.get(
+            reverse("habits:user_calendar"), {"start": start.isoformat(), "end": self.today.isoformat()}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["days"], 7)
+        self.assertEqual(response.json()["completed_days"], 1)
+
+    def test_invalid_range(self):
+        response = self.client.get(reverse("habits:user_calendar"), {"start": "not-a-date"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            reverse("habits:user_calendar"), {"start": "2024-02-01", "end": "2024-01-01"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_habit(self):
+        other_user = get_user_model().objects.create_user(username="other", password="testpass123")
+        habit = Habit.objects.create(user=other_user, name="Other Habit")
+        response = self.client.get(reverse("habits:habit_calendar", kwargs={"pk": habit.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_calendar_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse("habits:user_calendar"))
+        self.assertEqual(response.status_code, 302)
@@ -106,6 +106,47 @@ class TestHabitListView(TestCase):
             self.assertEqual(response.status_code, 200)
             self.assertLess(len(context.captured_queries), 20)
 
+    def test_habit_list_query_count_independent_of_habit_count(self):
+        """Test that the list view query count doesn't grow with habits or completions"""
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse("habits:habit_list") + "?view=category")
+                self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        baseline = count_queries()
+
+        today = timezone.localtime(timezone.now()).date()
+        for i in range(20):
+            habit = Habit.objects.create(
+                user=self.user,
+                name=f"Extra Habit {i}",
+                frequency="weekly" if i % 2 else "daily",
+                category="learning",
+            )
+            for days_ago in range(10):
+                HabitCompletion.objects.create(
+                    habit=habit, completed_at=today - timedelta(days=days_ago * 2)
+                )
+
+        # Session, user, habits, prefetched completions and latest AI summary
+        self.assertEqual(count_queries(), baseline)
+        self.assertLessEqual(baseline, 5)
+
+    def test_repeat_views_skip_completions(self):
+        """A cached snapshot serves analytics, notifications and cards without touching completions"""
+        self.habit1.toggle_completion(timezone.localtime(timezone.now()).date())
+        first = self.client.get(reverse("habits:habit_list"))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("habits:habit_list"))
+        self.assertFalse([q for q in context.captured_queries if "habits_habitcompletion" in q['sql']])
+        self.assertEqual(response.context["habit_analytics"], first.context["habit_analytics"])
+        self.assertEqual(response.context["notifications"], first.context["notifications"])
+        streaks = {habit.pk: (habit.streak, habit.completed_current_period) for habit in response.context["daily_habits"]}
+        self.assertEqual(streaks[self.habit1.pk], (1, True))
+        self.assertEqual(streaks[self.habit2.pk], (0, False))
+
     def test_habit_list_view_analytics_calculation(self):
         """Test that habit analytics are calculated correctly"""
         # First delete all habits
@@ -0,0 +1,23 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from habits.models import Habit
+
+class TestHabitTrendsView(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        Habit.objects.create(user=self.user, name="Test Habit", frequency="daily", category="health")
+
+    def test_trends(self):
+        response = self.client.get(reverse("habits:habit_trends"), {"days": 90})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["windows"], [7, 30, 90])
+        self.assertEqual(len(payload["categories"][0]["rates"]["30"]), 90)
+
+    def test_invalid_days(self):
+        response = self.client.get(reverse("habits:habit_trends"), {"days": "all"})
+        self.assertEqual(response.status_code, 400)
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from habits.models import Habit
@@ -31,6 +33,19 @@ class TestHabitUpdateView(TestCase):
         self.habit.refresh_from_db()
         self.assertEqual(self.habit.name, "Exercise Updated")
 
+    def test_only_grouping_changes_rebuild_derived_state(self):
+        url = reverse("habits:habit_update", args=[self.habit.pk])
+        data = {"name": "Run", "description": "Every morning", "frequency": "daily", "category": "health"}
+        derived_tables = ('habits_habitstreak', 'habits_dailycompletionrollup', 'social_leaderboardentry', 'social_usercounter')
+
+        def derived_queries(data):
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.client.post(url, data).status_code, 302)
+            return [q['sql'] for q in context.captured_queries if any(table in q['sql'] for table in derived_tables)]
+
+        self.assertEqual(derived_queries(data), [])
+        self.assertNotEqual(derived_queries({**data, "category": "learning"}), [])
+
     def test_habit_update_view_invalid_data(self):
         url = reverse("habits:habit_update", args=[self.habit.pk])
         data = {
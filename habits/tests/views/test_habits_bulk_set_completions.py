@@ -0,0 +1,156 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from habits.models import DailyCompletionRollup, Habit, HabitCompletion, HabitStreak
+from habits.services.analytics.rollup_service import RollupService
+from social.models import Badge, LeaderboardEntry, UserCounter
+from social.services.counters.counter_service import CounterService
+
+class TestHabitsBulkSetCompletions(TestCase):
+    def setUp(self):
+        self.today = timezone.localtime(timezone.now()).date()
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.habit = Habit.objects.create(
+            user=self.user, name="Run", frequency="daily", category="health"
+        )
+        self.weekly = Habit.objects.create(
+            user=self.user, name="Review", frequency="weekly", category="productivity"
+        )
+        self.url = reverse("habits:bulk_set_completions")
+
+    def post(self, operations):
+        return self.client.post(
+            self.url, json.dumps({"operations": operations}), content_type="application/json"
+        )
+
+    def operation(self, habit, days_ago, completed=True):
+        day = self.today - timedelta(days=days_ago)
+        return {"habit": habit.pk, "date": day.isoformat(), "completed": completed}
+
+    def test_backfill_week(self):
+        response = self.post([self.operation(self.habit, ago) for ago in range(7)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"added": 7, "removed": 0})
+
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.current_streak(), 7)
+        self.assertEqual(RollupService.total(self.user), 7)
+        self.assertEqual(UserCounter.objects.get(user=self.user).health_completions, 7)
+        entry = LeaderboardEntry.objects.get(user=self.user, category="health")
+        self.assertEqual((entry.total_completions, entry.current_streak), (7, 7))
+        self.assertTrue(Badge.objects.filter(user=self.user, badge_type="health_7_day").exists())
+
+    def test_mixed_operations_match_rebuilt_state(self):
+        HabitCompletion.objects.create(habit=self.habit, completed_at=self.today - timedelta(days=1))
+        HabitCompletion.objects.create(habit=self.habit, completed_at=self.today - timedelta(days=2))
+        HabitCompletion.objects.create(habit=self.weekly, completed_at=self.today - timedelta(days=14))
+
+        response = self.post([
+            self.operation(self.habit, 0),
+            self.operation(self.habit, 1),  # already completed
+            self.operation(self.habit, 2, completed=False),
+            self.operation(self.habit, 5),
+            self.operation(self.habit, 5, completed=False),  # later operations win
+            self.operation(self.weekly, 14, completed=False),
+            self.operation(self.weekly, 0),
+        ])
+        self.assertEqual(response.json(), {"added": 2, "removed": 2})
+        self.assertEqual(
+            sorted(HabitCompletion.objects.values_list("habit_id", "completed_at")),
+            sorted([
+                (self.habit.pk, self.today),
+                (self.habit.pk, self.today - timedelta(days=1)),
+                (self.weekly.pk, self.today),
+            ])
+        )
+
+        streaks = dict(HabitStreak.objects.values_list("habit_id", "current_streak"))
+        rollups = sorted(DailyCompletionRollup.objects.filter(completions__gt=0)
+            .values_list("date", "category", "frequency", "completions"))
+        counters = UserCounter.objects.filter(user=self.user).values().get()
+        RollupService.rebuild(get_user_model().objects.filter(pk=self.user.pk))
+        CounterService.rebuild(self.user)
+
+        self.assertEqual(streaks, {self.habit.pk: 2, self.weekly.pk: 1})
+        self.assertEqual(rollups, sorted(DailyCompletionRollup.objects
+            .values_list("date", "category", "frequency", "completions")))
+        counters.pop("updated_at")
+        rebuilt = UserCounter.objects.filter(user=self.user).values().get()
+        rebuilt.pop("updated_at")
+        self.assertEqual(counters, rebuilt)
+
+    def test_weekly_habit_completes_once_per_week(self):
+        monday = self.today - timedelta(days=self.today.weekday())
+        response = self.post([
+            {"habit": self.weekly.pk, "date": monday.isoformat(), "completed": True},
+            {"habit": self.weekly.pk, "date": (monday + timedelta(days=3)).isoformat(), "completed": True},
+        ])
+        self.assertEqual(response.json(), {"added": 1, "removed": 0})
+
+    def test_query_count_does_not_grow_with_operations(self):
+        def count_queries(days):
+            with CaptureQueriesContext(connection) as context:
+                response = self.post([self.operation(self.habit, ago) for ago in days])
+                self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        few = count_queries(range(40, 42))
+        many = count_queries(range(50, 57))  # stays under the completions_10 badge
+        self.assertEqual(few, many)
+
+    def test_removals_are_one_delete(self):
+        monday = self.today - timedelta(days=self.today.weekday())
+        self.post([self.operation(self.habit, ago) for ago in range(10, 17)])
+        self.post([{"habit": self.weekly.pk, "date": monday.isoformat(), "completed": True}])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(
+                [self.operation(self.habit, ago, completed=False) for ago in range(10, 17)]
+                + [{"habit": self.weekly.pk, "date": monday.isoformat(), "completed": False}]
+            )
+        self.assertEqual(response.json(), {"added": 0, "removed": 8})
+        completion_table = HabitCompletion._meta.db_table
+        deletes = [q['sql'] for q in context.captured_queries if q['sql'].startswith(f'DELETE FROM "{completion_table}"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertFalse(HabitCompletion.objects.exists())
+        self.assertEqual(RollupService.total(self.user), 0)
+
+    def test_completion_added_meanwhile_fails_the_update(self):
+        HabitCompletion.objects.create(habit=self.habit, completed_at=self.today)
+        # As if another request added it after this one read the existing completions
+        with mock.patch.object(HabitCompletion.objects, 'select_for_update', return_value=HabitCompletion.objects.none()):
+            response = self.post([self.operation(self.habit, 0), self.operation(self.habit, 1)])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(HabitCompletion.objects.count(), 1)
+        self.assertEqual(RollupService.total(self.user), 1)
+        self.assertEqual(CounterService.get(self.user).total_completions, 1)
+
+    def test_other_users_habit_is_rejected(self):
+        other_user = get_user_model().objects.create_user(username="other", password="testpass123")
+        other_habit = Habit.objects.create(user=other_user, name="Other Habit")
+
+        response = self.post([self.operation(self.habit, 0), self.operation(other_habit, 0)])
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(HabitCompletion.objects.exists())
+
+    def test_malformed_operations(self):
+        for operations in ([{"habit": self.habit.pk}], [self.operation(self.habit, 0) | {"completed": "yes"}], "x"):
+            response = self.post(operations)
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.post([self.operation(self.habit, 0)])
+        self.assertEqual(response.status_code, 302)
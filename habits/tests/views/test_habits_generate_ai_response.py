@@ -1,6 +1,9 @@
-from django.test import TestCase
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from habits.models import AIHabitSummary, AISummaryJob, Habit
 
 class TestHabitIntegration(TestCase):
     def setUp(self):
@@ -10,7 +13,57 @@ class TestHabitIntegration(TestCase):
         self.client.login(username="testuser", password="testpass123")
 
     def test_generate_ai_summary(self):
-        # Test AI summary generation endpoint
+        # Requests only queue the job; the worker generates the summary
         response = self.client.post(reverse('habits:generate_ai_summary'))
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data['status'], 'pending')
+
+        call_command('ai_summary_worker', once=True, concurrency=1, stdout=StringIO())
+
+        response = self.client.get(data['status_url'])
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'done')
         self.assertTrue('content' in response.json())
+
+    def test_repeated_clicks_share_one_job(self):
+        first = self.client.post(reverse('habits:generate_ai_summary')).json()
+        second = self.client.post(reverse('habits:generate_ai_summary')).json()
+        self.assertEqual(first['job_id'], second['job_id'])
+        self.assertEqual(AISummaryJob.objects.count(), 1)
+
+    def test_jobs_are_private(self):
+        job = AISummaryJob.objects.create(
+            user=get_user_model().objects.create_user(username="other", password="testpass123")
+        )
+        response = self.client.get(reverse('habits:ai_summary_job', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+@override_settings(AI_ASYNC_CLIENT='habits.services.ai.fake_client.FakeAsyncOpenAI')
+class TestAsyncAISummaryView(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        Habit.objects.create(user=self.user, name="Exercise", category="health")
+
+    async def test_generate_ai_summary_async(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('habits:generate_ai_summary_async'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('momentum', response.json()['raw_content'])
+        self.assertEqual(await AIHabitSummary.objects.filter(user=self.user).acount(), 1)
+        # Queries made from the async view's worker threads are still counted
+        self.assertGreater(response.asgi_request.query_stats.count, 0)
+
+    async def test_requires_login(self):
+        response = await self.async_client.post(reverse('habits:generate_ai_summary_async'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_refused_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('habits:generate_ai_summary_async'))
+
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(AIHabitSummary.objects.count(), 0)
@@ -59,8 +59,14 @@ class TestHabitsToggleCompletion(TestCase):
             # We expect queries for:
             # 1. User authentication
             # 2. Get habit
-            # 3. Check existing completion
-            # 4. Create/delete completion
-            # 5. Get completions for badge check
-            # 6. Update/create badge if needed
-            self.assertLessEqual(len(context.captured_queries), 7)
\ No newline at end of file
+            # 3. Open transaction (savepoint)
+            # 4. Check existing completion
+            # 5. Create/delete completion
+            # 6. Update streak state
+            # 7. Upsert daily completion rollup
+            # 8. Update completion counters
+            # 9. Update leaderboard entries
+            # 10. Read streak state and counters for badge rules
+            # 11. Commit transaction (release savepoint)
+            # 12. Update/create badge if needed
+            self.assertLessEqual(len(context.captured_queries), 12)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from habits.models import AIHabitSummary, Habit
+
+TOKENS = ['Great', ' week', ' for', ' **Exercise**', '!']
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completions like OpenAI does with stream=True, or fails if asked to"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(body)
+        if self.server.fail:
+            payload = json.dumps({'error': {'message': 'Bad request', 'type': 'invalid_request_error'}}).encode()
+            self.send_response(400)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for token in TOKENS:
+            chunk = {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'],
+                'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+class TestStreamAISummaryView(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubOpenAIHandler)
+        cls.server.requests = []
+        cls.server.fail = False
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.enterClassContext(override_settings(
+            AI_ASYNC_CLIENT='openai.AsyncOpenAI',
+            AI_BASE_URL=f'http://127.0.0.1:{cls.server.server_port}/v1',
+        ))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        Habit.objects.create(user=self.user, name="Exercise", category="health")
+        self.server.requests.clear()
+        self.server.fail = False
+
+    async def stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(reverse('habits:stream_ai_summary'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        return parse_events(body)
+
+    async def test_tokens_are_relayed_in_order_then_saved(self):
+        events = await self.stream()
+
+        self.assertEqual([data['text'] for event, data in events[:-1]], TOKENS)
+        self.assertTrue(all(event == 'token' for event, _ in events[:-1]))
+        event, data = events[-1]
+        self.assertEqual(event, 'done')
+        self.assertEqual(data['raw_content'], ''.join(TOKENS))
+        self.assertIn('<strong>Exercise</strong>', data['content'])
+
+        summary = await AIHabitSummary.objects.aget(user=self.user)
+        self.assertEqual(summary.content, ''.join(TOKENS))
+        self.assertTrue(self.server.requests[0]['stream'])
+        self.assertIn("Exercise", self.server.requests[0]['messages'][1]['content'])
+
+    async def test_upstream_errors_are_sent_as_an_event(self):
+        self.server.fail = True
+        events = await self.stream()
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][0], 'error')
+        self.assertIn('Bad request', events[0][1]['error'])
+        self.assertEqual(await AIHabitSummary.objects.acount(), 0)
+
+    async def test_requires_login(self):
+        response = await self.async_client.post(reverse('habits:stream_ai_summary'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_requires_post(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('habits:stream_ai_summary'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_refused_under_wsgi(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('habits:stream_ai_summary'))
+
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(self.server.requests, [])
@@ -11,5 +11,13 @@ urlpatterns = [
     path('<int:pk>/edit/', views.HabitUpdateView.as_view(), name='habit_update'),
     path('<int:pk>/delete/', views.HabitDeleteView.as_view(), name='habit_delete'),
     path('<int:pk>/toggle/', views.toggle_habit_completion, name='toggle_completion'),
-    path('ai-summary/', views.generate_ai_summary, name='generate_ai_summary')
+    path('completions/import/', views.CompletionImportView.as_view(), name='import_completions'),
+    path('completions/bulk/', views.bulk_set_completions, name='bulk_set_completions'),
+    path('<int:pk>/calendar/', views.habit_calendar, name='habit_calendar'),
+    path('calendar/', views.user_calendar, name='user_calendar'),
+    path('trends/', views.habit_trends, name='habit_trends'),
+    path('ai-summary/', views.generate_ai_summary, name='generate_ai_summary'),
+    path('ai-summary/async/', views.generate_ai_summary_async, name='generate_ai_summary_async'),
+    path('ai-summary/stream/', views.stream_ai_summary, name='stream_ai_summary'),
+    path('ai-summary/jobs/<int:pk>/', views.ai_summary_job, name='ai_summary_job'),
 ]
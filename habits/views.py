@@ -1,84 +1,69 @@
+import json
 import logging
-from datetime import datetime, timedelta
-from django.db import models
-from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+from datetime import datetime, date
+from functools import wraps
+from django.views.generic import (CreateView, DeleteView, DetailView, FormView,
+                                  ListView, UpdateView)
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, get_object_or_404
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST, require_http_methods
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.db.models import Count, Q, Case, When, Value
 from django.urls import reverse
 from django.views.decorators.csrf import csrf_protect
-from django.db.models.functions import Cast
 
 from habits.templatetags.markdown.filters import markdown_filter
-from social.services.badges.badge_service import BadgeService
-from .models import Habit
-from .services.ai.ai_service import AIHabitService
+from social.services.monitoring.query_budget import query_budget
+from .models import AISummaryJob, Habit
+from .services.ai.async_ai_service import AsyncAIHabitService
+from .services.ai.summary_queue_service import SummaryQueueService
 from .services.analytics.analytics_service import HabitAnalyticsService
+from .services.analytics.calendar_service import CalendarService
+from .services.analytics.trend_service import TrendService
 from .services.habits.habit_service import HabitService
+from .services.habits.import_service import CompletionImportService
 from .services.navigation.navigation_service import NavigationService
-from .forms import HabitForm
+from .forms import CompletionImportForm, HabitForm
 
 logger = logging.getLogger(__name__)
 
+@query_budget(8)
 class HabitListView(LoginRequiredMixin, ListView):
     model = Habit
     template_name = "habits/habit_list.html"
     context_object_name = 'habits'
 
     def get_queryset(self):
-        today = timezone.localtime(timezone.now()).date()
-        start_of_week = today - timedelta(days=today.weekday())
-        start_of_month = today.replace(day=1)
-
-        return (Habit.objects.filter(user=self.request.user)
-            .select_related('user')
-            .annotate(
-                completed_today=Count('completions',
-                    filter=Q(completions__completed_at=Cast(Value(today), output_field=models.DateField()))),
-                completed_this_week=Count('completions',
-                    filter=Q(completions__completed_at__gte=Cast(Value(start_of_week),
-                                                                 output_field=models.DateField()))),
-                month_count=Count('completions',
-                    filter=Q(completions__completed_at__gte=Cast(Value(start_of_month),
-                                                                 output_field=models.DateField()))),
-                total_completions=Count('completions'),
-                # Add annotations for notifications
-                needs_completion_daily=Case(
-                    When(frequency='daily', completed_today=0, then=Value(1)),
-                    default=Value(0),
-                    output_field=models.IntegerField(),
-                ),
-                needs_completion_weekly=Case(
-                    When(frequency='weekly', completed_this_week=0, then=Value(1)),
-                    default=Value(0),
-                    output_field=models.IntegerField(),
-                )
-            ).prefetch_related(
-                'completions'  # Single prefetch for all completions we need
-            ))
+        analytics_service = HabitAnalyticsService(self.request.user)
+        # Completions are only loaded if the habit list snapshot isn't cached
+        return analytics_service.get_habits(
+            selected_category=self.request.GET.get('category')
+        )
 
     def get_context_data(self, **kwargs):
+        # Evaluate the habits once; analytics, notifications and grouping share this snapshot
+        self.object_list = list(self.object_list)
         context = super().get_context_data(**kwargs)
         context['viewed_user'] = self.request.user
 
         analytics_service = HabitAnalyticsService(self.request.user)
         view_mode = self.request.GET.get('view', 'frequency')
-        selected_category = self.request.GET.get('category')
 
         context.update(
             analytics_service.get_list_view_data(
+                habits=self.object_list,
                 view_mode=view_mode,
-                selected_category=selected_category
+                selected_category=self.request.GET.get('category')
             )
         )
 
         return context
 
+@query_budget(8)
 class HabitDetailView(LoginRequiredMixin, DetailView):
     model = Habit
     template_name = "habits/habit_detail.html"
@@ -86,11 +71,12 @@ class HabitDetailView(LoginRequiredMixin, DetailView):
     def get_queryset(self):
         return (Habit.objects
             .filter(user=self.request.user)
+            .select_related('streak_state')
             .prefetch_related('completions'))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        habit = self.get_object()
+        habit = self.object
 
         # Get analytics data from service
         analytics_service = HabitAnalyticsService(self.request.user)
@@ -132,6 +118,24 @@ class HabitDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         return Habit.objects.filter(user=self.request.user)
 
+class CompletionImportView(LoginRequiredMixin, FormView):
+    form_class = CompletionImportForm
+    template_name = "habits/completion_import.html"
+
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        file_format = form.cleaned_data['format'] or CompletionImportService.detect_format(upload.name)
+        result = CompletionImportService(self.request.user).import_file(upload.file, file_format)
+
+        messages.success(
+            self.request,
+            f"Imported {result['imported']} completion(s) "
+            f"({result['duplicates']} duplicate(s), {result['rejected']} rejected)"
+        )
+        for error in result['errors']:
+            messages.warning(self.request, error)
+        return redirect('habits:habit_list')
+
 @require_POST
 @login_required
 def toggle_habit_completion(request, pk):
@@ -148,19 +152,57 @@ def toggle_habit_completion(request, pk):
         toggle_date = timezone.localtime(timezone.now()).date()
 
     # Use service to handle completion logic
+    # Completion badges are awarded by the completion_added badge rules
     habit_service = HabitService(request.user)
-    was_completed = habit_service.toggle_completion(habit, toggle_date)
-
-    # Only check badges if we completed (not uncompleted)
-    if was_completed:
-        badge_service = BadgeService(request.user)
-        badge_service.check_completion_badges()
+    habit_service.toggle_completion(habit, toggle_date)
 
     referer = request.META.get('HTTP_REFERER')
     if referer:
         return redirect(referer)
     return redirect('habits:habit_detail', pk=pk)
 
+MAX_BULK_OPERATIONS = 1000
+
+def _parse_completion_operations(body):
+    """Parse {"operations": [{"habit": id, "date": "YYYY-MM-DD", "completed": bool}, ...]}
+
+    Raises ValueError if the payload is malformed.
+    """
+    try:
+        operations = json.loads(body)['operations']
+        if not isinstance(operations, list):
+            raise TypeError
+        parsed = []
+        for operation in operations:
+            if not isinstance(operation['completed'], bool):
+                raise TypeError
+            parsed.append(
+                (int(operation['habit']), date.fromisoformat(operation['date']), operation['completed'])
+            )
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Expected operations: [{habit, date, completed}, ...]") from None
+    if len(parsed) > MAX_BULK_OPERATIONS:
+        raise ValueError(f"At most {MAX_BULK_OPERATIONS} operations per request")
+    return parsed
+
+@login_required
+@csrf_protect
+@require_POST
+def bulk_set_completions(request):
+    """Set many habit/date completions in one transaction; returns the added and removed counts"""
+    try:
+        operations = _parse_completion_operations(request.body)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        added, removed = HabitService(request.user).set_completions(operations)
+    except Habit.DoesNotExist:
+        raise Http404("Habit not found")
+    except IntegrityError:
+        return JsonResponse({'error': "Completions changed during the update; try again"}, status=409)
+    return JsonResponse({'added': len(added), 'removed': len(removed)})
+
 def root_redirect(request):
     """Redirect root URL to either dashboard or login page"""
     nav_service = NavigationService()
@@ -170,8 +212,31 @@ def root_redirect(request):
 @csrf_protect
 @require_http_methods(["POST"])
 def generate_ai_summary(request):
-    service = AIHabitService()
-    summary, error = service.create_summary(request.user)
+    """Queue an AI summary for the worker; poll the returned status_url for the result"""
+    job = SummaryQueueService.enqueue(request.user)
+    return JsonResponse(_summary_job_payload(job), status=202)
+
+def asgi_only(view):
+    """Answer 501 unless served under ASGI. Under WSGI every request runs its async view
+    in a loop of its own, so the shared client and concurrency cap would be per request.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse({'error': 'This endpoint needs the app served under ASGI'}, status=501)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+@asgi_only
+async def generate_ai_summary_async(request):
+    """Generate a summary within the request, for ASGI deployments where waiting on OpenAI
+    doesn't hold a worker thread. Concurrent LLM calls are capped by AI_MAX_CONCURRENT_REQUESTS.
+    """
+    user = await request.auser()
+    summary, error = await AsyncAIHabitService().create_summary(user)
 
     if error:
         return JsonResponse({'error': error}, status=500)
@@ -184,3 +249,102 @@ def generate_ai_summary(request):
         'raw_content': summary.content,
         'created_at': summary.created_at.isoformat()
     })
+
+@login_required
+@csrf_protect
+@require_http_methods(["POST"])
+@asgi_only
+async def stream_ai_summary(request):
+    """Relay the summary to the browser as server-sent events while OpenAI generates it:
+    a `token` event per chunk of text, then `done` with the saved summary or `error`.
+    """
+    user = await request.auser()
+    response = StreamingHttpResponse(_summary_events(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+async def _summary_events(user):
+    async for event, value in AsyncAIHabitService().stream_summary(user):
+        if event == 'token':
+            data = {'text': value}
+        elif event == 'done':
+            data = {
+                # Render the markdown to HTML before sending
+                'content': markdown_filter(value.content),
+                'raw_content': value.content,
+                'created_at': value.created_at.isoformat(),
+            }
+        else:
+            data = {'error': value}
+        yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(6)
+def ai_summary_job(request, pk):
+    job = get_object_or_404(AISummaryJob.objects.select_related('summary'), pk=pk, user=request.user)
+    return JsonResponse(_summary_job_payload(job))
+
+def _summary_job_payload(job):
+    payload = {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': reverse('habits:ai_summary_job', args=[job.pk]),
+    }
+    if job.status == 'done' and job.summary:
+        payload.update({
+            # Render the markdown to HTML before sending
+            'content': markdown_filter(job.summary.content),
+            'raw_content': job.summary.content,
+            'created_at': job.summary.created_at.isoformat(),
+        })
+    elif job.status == 'failed':
+        payload['error'] = job.error
+    return payload
+
+def _calendar_range(request):
+    """Parse ?start=&end= (YYYY-MM-DD), defaulting to the last year; raises ValueError if invalid"""
+    default_start, default_end = CalendarService.default_range()
+    start = request.GET.get('start')
+    end = request.GET.get('end')
+    start = date.fromisoformat(start) if start else default_start
+    end = date.fromisoformat(end) if end else default_end
+    if start > end or (end - start).days >= CalendarService.MAX_DAYS:
+        raise ValueError(f"Range must be 1 to {CalendarService.MAX_DAYS} days")
+    return start, end
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(6)
+def habit_calendar(request, pk):
+    """Completion heatmap for one habit as a base64 bitmap"""
+    habit = get_object_or_404(Habit, pk=pk, user=request.user)
+    try:
+        start, end = _calendar_range(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(CalendarService.habit_calendar(habit, start, end))
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(6)
+def user_calendar(request):
+    """Days on which the user completed any habit, as a base64 bitmap"""
+    try:
+        start, end = _calendar_range(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(CalendarService.user_calendar(request.user, start, end))
+
+@login_required
+@require_http_methods(["GET"])
+@query_budget(6)
+def habit_trends(request):
+    """Rolling 7/30/90-day completion rates per habit and category, oldest day first"""
+    try:
+        days = int(request.GET.get('days', TrendService.DAYS))
+    except ValueError:
+        return JsonResponse({'error': "days must be a number"}, status=400)
+    return JsonResponse(TrendService(request.user).get_trends(days))
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -39,7 +40,6 @@ AUTHENTICATION_BACKENDS = [
 # Application definition
 
 INSTALLED_APPS = [
-    "debug_toolbar",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -72,22 +72,52 @@ INTERNAL_IPS = [
 
 MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "social.middleware.MetricsMiddleware",
+    "social.middleware.ServerTimingMiddleware",
+    "social.middleware.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "social.middleware.BadgeMemoMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_browser_reload.middleware.BrowserReloadMiddleware"
 ]
 
+# The debug toolbar is a development dependency, so only load it when debugging
+DEBUG_TOOLBAR = DEBUG and find_spec("debug_toolbar") is not None
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.insert(0, "debug_toolbar")
+    MIDDLEWARE.insert(1, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Server-Timing headers and a timing log line per request (see ServerTimingMiddleware)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "False") == "True"
+
+# Async AI summaries (see AsyncAIHabitService): the client class, e.g.
+# "habits.services.ai.fake_client.FakeAsyncOpenAI" to run offline, and the most
+# LLM calls a process makes at once
+AI_ASYNC_CLIENT = os.getenv("AI_ASYNC_CLIENT", "openai.AsyncOpenAI")
+AI_MAX_CONCURRENT_REQUESTS = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "4"))
+# An OpenAI-compatible API to use instead of api.openai.com
+AI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+# Stream dashboard summaries token by token over server-sent events (needs ASGI)
+AI_SUMMARY_STREAMING = os.getenv("AI_SUMMARY_STREAMING", "False") == "True"
+
+# Bearer token Prometheus sends to scrape /metrics (staff users can always view it)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Directory the web and worker processes share their metrics through; unset keeps them in this process
+METRICS_DIR = os.getenv("METRICS_DIR")
+
 ROOT_URLCONF = "momentum.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates with render timing for ServerTimingMiddleware
+        "BACKEND": "social.services.monitoring.profiling.TimedDjangoTemplates",
+        "NAME": "django",
         "DIRS": [
             BASE_DIR / "applications" / "templates",
             BASE_DIR / "books" / "templates",
@@ -129,6 +159,42 @@ DATABASES = {
     }
 }
 
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Analytics snapshots and calendar bitsets get their own cache so the backend can
+# be chosen with ANALYTICS_CACHE_BACKEND (locmem, file or database) and
+# ANALYTICS_CACHE_LOCATION. Writes invalidate entries with delete_many, which
+# locmem only applies to the current process, so use file or database when
+# serving from more than one process. The database backend needs
+# `python manage.py createcachetable`.
+
+ANALYTICS_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "momentum-analytics"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "cache" / "analytics")),
+    "database": ("django.core.cache.backends.db.DatabaseCache", "analytics_cache"),
+}
+ANALYTICS_CACHE_BACKEND, ANALYTICS_CACHE_DEFAULT_LOCATION = ANALYTICS_CACHE_BACKENDS[
+    os.getenv("ANALYTICS_CACHE_BACKEND", "locmem")
+]
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analytics": {
+        "BACKEND": ANALYTICS_CACHE_BACKEND,
+        "LOCATION": os.getenv("ANALYTICS_CACHE_LOCATION", ANALYTICS_CACHE_DEFAULT_LOCATION),
+        "TIMEOUT": 60 * 60 * 24,
+    },
+}
+
+# Query budgets
+# Views declare a maximum query count with @query_budget; QueryBudgetMiddleware
+# logs a warning when one is exceeded, or raises when QUERY_BUDGET_STRICT is on
+# (the test suite turns it on in conftest.py).
+
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "False") == "True"
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
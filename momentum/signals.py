@@ -0,0 +1,12 @@
+from django.db.models import QuerySet
+
+def deleted_directly(origin, model):
+    """True when a post_delete is for a delete of model itself rather than a cascade from its owner.
+
+    origin is the instance or queryset whose delete() sent the signal, or
+    None when it was sent some other way.
+    """
+    if origin is None:
+        return True
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is model
@@ -42,7 +42,7 @@ urlpatterns = [
     path("__reload__/", include("django_browser_reload.urls")),
 ]
 
-if settings.DEBUG:
+if settings.DEBUG_TOOLBAR:
     import debug_toolbar
     urlpatterns = [
         path('__debug__/', include(debug_toolbar.urls)),
@@ -5,11 +5,13 @@ from django.urls import reverse_lazy
 from django.db.models import Sum
 from django.contrib import messages
 from django.utils import timezone
+from social.services.monitoring.query_budget import query_budget
 from .models import Food, Weight
 from .forms import FoodForm, WeightForm
 
 # Create your views here.
 
+@query_budget(10)
 class FoodListView(LoginRequiredMixin, ListView):
     model = Food
     template_name = 'nutrition/food_list.html'
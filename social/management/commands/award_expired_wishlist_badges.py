@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from social.services.badges.badge_service import BadgeService
+
+class Command(BaseCommand):
+    help = "Award the expired wishlist badge for wishlist items that recently fell due; schedule daily"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=1,
+            help="Look back this many days of due dates (raise it to catch up after missed runs)"
+        )
+
+    def handle(self, *args, **options):
+        count = BadgeService.award_expired_wishlist_badges(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Awarded expired wishlist badge to {count} user(s)"))
@@ -0,0 +1,45 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from social.services.benchmarks.benchmark_service import CASES, BenchmarkService
+
+class Command(BaseCommand):
+    help = "Benchmark the hot views and services against seeded datasets and write JSON results"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=list(BenchmarkService.DEFAULT_SIZES),
+                            help="Seeded user counts to benchmark at (default 10 100 500)")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (default 5)")
+        parser.add_argument('--case', action='append', choices=list(CASES), dest='cases',
+                            help="Only run this case (repeatable)")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the seeded datasets")
+        parser.add_argument('--output', help="Write the JSON results to this file")
+        parser.add_argument('--compare', help="Baseline JSON results to check for regressions")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed time/memory growth over the baseline as a fraction (default 0.2)")
+
+    def handle(self, *args, **options):
+        results = BenchmarkService(
+            sizes=options['sizes'], repeat=options['repeat'], cases=options['cases'], seed=options['seed'],
+        ).run()
+
+        for name, sizes in results['results'].items():
+            for size, measurements in sizes.items():
+                self.stdout.write(
+                    f"{name:<45} {size:>6} users  {measurements['median_ms']:>9.2f} ms  "
+                    f"{measurements['queries']:>4} queries  {measurements['peak_kib']:>9.1f} KiB"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            regressions = BenchmarkService.compare(baseline, results, options['threshold'])
+            for name, size, metric, before, after in regressions:
+                self.stderr.write(f"{name} @ {size} users: {metric} {before} -> {after}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS("No regressions"))
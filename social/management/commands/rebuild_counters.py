@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from social.services.counters.counter_service import CounterService
+
+class Command(BaseCommand):
+    help = "Recount per-user completion, application and contact counters from the raw tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild counters for this username")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        count = CounterService.rebuild_all(users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {count} user(s)"))
@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from social.services.leaderboard.leaderboard_service import LeaderboardService
+
+class Command(BaseCommand):
+    help = "Rebuild materialized leaderboard entries; run daily to roll over possible completions and streaks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild entries for this username")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        count = LeaderboardService().rebuild(users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt leaderboard entries for {count} user(s)"))
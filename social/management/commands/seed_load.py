@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from social.services.seeding.seed_service import SeedService
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic dataset (users, habits, completions, friends, applications, books, food) for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help="Number of users (default 100)")
+        parser.add_argument('--habits', type=int, default=5, help="Habits per user (default 5)")
+        parser.add_argument('--years', type=float, default=2, help="Years of completion history (default 2)")
+        parser.add_argument('--friends', type=int, default=3, help="Friend requests sent per user (default 3)")
+        parser.add_argument('--applications', type=int, default=10, help="Applications per user (default 10)")
+        parser.add_argument('--books', type=int, default=5, help="Books per user (default 5)")
+        parser.add_argument('--food-days', type=int, default=90, help="Days of food and weight logs (default 90)")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same data")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per insert (default 5000)")
+        parser.add_argument('--prefix', default='load', help="Username prefix (default 'load')")
+        parser.add_argument('--password', default='password', help="Password for every seeded user")
+
+    def handle(self, *args, **options):
+        if get_user_model().objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users starting with {options['prefix']!r} already exist; pick another --prefix")
+
+        counts = SeedService(
+            users=options['users'],
+            habits=options['habits'],
+            years=options['years'],
+            friends=options['friends'],
+            applications=options['applications'],
+            books=options['books'],
+            food_days=options['food_days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            password=options['password'],
+        ).run()
+
+        seconds = counts.pop('seconds')
+        for table, count in counts.items():
+            self.stdout.write(f"{table}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {sum(counts.values())} row(s) in {seconds:.1f}s"))
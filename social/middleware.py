@@ -0,0 +1,113 @@
+import time
+from contextlib import contextmanager, nullcontext
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from social.services.badges.badge_memo import badge_memo
+from social.services.monitoring.metrics import REQUEST_DURATION, REQUEST_QUERIES, REQUESTS
+from social.services.monitoring.profiling import profile_request
+from social.services.monitoring.query_budget import get_query_budget, record_request_queries
+
+class RequestScopeMiddleware:
+    """Middleware that runs the rest of the request inside scope() and then calls finish().
+
+    Works under WSGI and ASGI alike, so async views stay on the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def scope(self, request):
+        return nullcontext()
+
+    def finish(self, request, response, state):
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.scope(request) as state:
+            response = self.get_response(request)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        with self.scope(request) as state:
+            response = await self.get_response(request)
+        return self.finish(request, response, state)
+
+class BadgeMemoMiddleware(RequestScopeMiddleware):
+    """Share highest-badge lookups across everything that renders one request"""
+
+    def scope(self, request):
+        return badge_memo()
+
+class QueryBudgetMiddleware(RequestScopeMiddleware):
+    """Count the queries and SQL time of each request and hold views to their @query_budget.
+
+    The stats are left on request.query_stats. A view over budget logs a
+    warning with its most repeated SQL, or raises QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is on (as it is under the tests).
+    """
+
+    def scope(self, request):
+        return record_request_queries(request)
+
+    def finish(self, request, response, query_stats):
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None and query_stats.count > budget:
+            query_stats.over_budget(
+                budget, request.query_budget_view, getattr(settings, 'QUERY_BUDGET_STRICT', False)
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+        request.query_budget_view = getattr(view_func, 'view_class', view_func).__name__
+
+class ServerTimingMiddleware(RequestScopeMiddleware):
+    """Report each request's SQL, template and view time as Server-Timing headers and a log line.
+
+    Enabled by SERVER_TIMING. Template time comes from the TimedDjangoTemplates
+    backend and excludes SQL run while rendering, so the parts add up to the total.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    @contextmanager
+    def scope(self, request):
+        with record_request_queries(request) as query_stats:
+            with profile_request(query_stats) as profile:
+                yield profile
+
+    def finish(self, request, response, profile):
+        response['Server-Timing'] = profile.server_timing()
+        profile.log(request, response)
+        return response
+
+class MetricsMiddleware(RequestScopeMiddleware):
+    """Record request latency, status and query count per URL name for the /metrics endpoint"""
+
+    @contextmanager
+    def scope(self, request):
+        started = time.perf_counter()
+        with record_request_queries(request) as query_stats:
+            yield started, query_stats
+
+    def finish(self, request, response, state):
+        started, query_stats = state
+        duration = time.perf_counter() - started
+
+        # URL names rather than paths keep the label set small
+        view = request.resolver_match.view_name if request.resolver_match else 'unmatched'
+        REQUEST_DURATION.observe(duration, view=view, method=request.method)
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(query_stats.count, view=view)
+        return response
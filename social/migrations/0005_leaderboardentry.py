@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0004_alter_badge_badge_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(default='all', max_length=20)),
+                ('total_completions', models.PositiveIntegerField(default=0)),
+                ('total_possible', models.PositiveIntegerField(default=0)),
+                ('completion_rate', models.FloatField(default=0)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('total_habits', models.PositiveIntegerField(default=0)),
+                ('badge_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-completion_rate', '-total_completions', 'user_id'],
+                'indexes': [models.Index(fields=['category', '-completion_rate', '-total_completions', 'user'], name='leaderboard_rank_idx')],
+                'unique_together': {('user', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 05:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0005_leaderboardentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_completions', models.PositiveIntegerField(default=0)),
+                ('health_completions', models.PositiveIntegerField(default=0)),
+                ('productivity_completions', models.PositiveIntegerField(default=0)),
+                ('learning_completions', models.PositiveIntegerField(default=0)),
+                ('wishlist_applications', models.PositiveIntegerField(default=0)),
+                ('applied_applications', models.PositiveIntegerField(default=0)),
+                ('interviewing_applications', models.PositiveIntegerField(default=0)),
+                ('offered_applications', models.PositiveIntegerField(default=0)),
+                ('rejected_applications', models.PositiveIntegerField(default=0)),
+                ('contacts', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='counters', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
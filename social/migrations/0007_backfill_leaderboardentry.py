@@ -0,0 +1,14 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Entries are only maintained incrementally, so existing users need a full build.
+    # That depends on streak and badge logic that historical models don't have, so it
+    # is left to `python manage.py rebuild_leaderboard` after migrating (see README).
+
+    dependencies = [
+        ('social', '0006_usercounter'),
+        ('habits', '0002_habitstreak'),
+    ]
+
+    operations = []
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count
+
+COMPLETION_CATEGORIES = ['health', 'productivity', 'learning']
+APPLICATION_STATUSES = ['wishlist', 'applied', 'interviewing', 'offered', 'rejected']
+
+
+def backfill_counters(apps, schema_editor):
+    # Counters are only created for new users and maintained incrementally, so existing users need a full count
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserCounter = apps.get_model('social', 'UserCounter')
+    HabitCompletion = apps.get_model('habits', 'HabitCompletion')
+    Application = apps.get_model('applications', 'Application')
+    Contact = apps.get_model('applications', 'Contact')
+
+    counters = {
+        user_id: UserCounter(user_id=user_id)
+        for user_id in User.objects.filter(counters__isnull=True).values_list('pk', flat=True).iterator()
+    }
+    if not counters:
+        return
+
+    completions = (HabitCompletion.objects
+        .values('habit__user', 'habit__category')
+        .annotate(total=Count('id'))
+        .order_by())
+    for row in completions.iterator():
+        counter = counters.get(row['habit__user'])
+        if counter is None:
+            continue
+        counter.total_completions += row['total']
+        if row['habit__category'] in COMPLETION_CATEGORIES:
+            field = f"{row['habit__category']}_completions"
+            setattr(counter, field, getattr(counter, field) + row['total'])
+
+    applications = (Application.objects
+        .filter(status__in=APPLICATION_STATUSES)
+        .values('user', 'status')
+        .annotate(total=Count('id'))
+        .order_by())
+    for row in applications.iterator():
+        counter = counters.get(row['user'])
+        if counter is not None:
+            setattr(counter, f"{row['status']}_applications", row['total'])
+
+    contacts = Contact.objects.values('user').annotate(total=Count('id')).order_by()
+    for row in contacts.iterator():
+        counter = counters.get(row['user'])
+        if counter is not None:
+            counter.contacts = row['total']
+
+    UserCounter.objects.bulk_create(counters.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0007_backfill_leaderboardentry'),
+        ('habits', '0005_backfill_dailycompletionrollup'),
+        ('applications', '0002_application_status_due_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -72,10 +72,10 @@ class Badge(models.Model):
     def __str__(self):
         return f"{self.get_badge_type_display()} - {self.user.username}"
 
-    @classmethod
-    def get_user_highest_badges(cls, user):
-        """Get the highest badge for each category for a user"""
-        badges = cls.objects.filter(user=user)
+    @staticmethod
+    def highest_badges_from_types(badge_types):
+        """Get the highest badge for each category from a collection of badge types"""
+        badge_types = set(badge_types)
         highest_badges = {
             "health": None,
             "learning": None,
@@ -92,33 +92,117 @@ class Badge(models.Model):
 
         # Check streak badges
         for category in ["health", "learning", "productivity"]:
-            if badges.filter(badge_type=f"{category}_30_day").exists():
-                highest_badges[category] = f"{category}_30_day"
-            elif badges.filter(badge_type=f"{category}_7_day").exists():
-                highest_badges[category] = f"{category}_7_day"
-
-        # Check friend badge
-        if badges.filter(badge_type="first_friend").exists():
-            highest_badges["friend"] = "first_friend"
+            for badge_type in (f"{category}_30_day", f"{category}_7_day"):
+                if badge_type in badge_types:
+                    highest_badges[category] = badge_type
+                    break
 
         # Check completion badges
-        if badges.filter(badge_type="completions_100").exists():
-            highest_badges["completions"] = "completions_100"
-        elif badges.filter(badge_type="completions_50").exists():
-            highest_badges["completions"] = "completions_50"
-        elif badges.filter(badge_type="completions_10").exists():
-            highest_badges["completions"] = "completions_10"
-
-        # Check job application badges
-        if badges.filter(badge_type="applications_5").exists():
-            highest_badges["applications"] = "applications_5"
-        if badges.filter(badge_type="applied_5").exists():
-            highest_badges["applied"] = "applied_5"
-        if badges.filter(badge_type="job_offered").exists():
-            highest_badges["offered"] = "job_offered"
-        if badges.filter(badge_type="first_contact").exists():
-            highest_badges["contact"] = "first_contact"
-        if badges.filter(badge_type="wishlist_expired").exists():
-            highest_badges["wishlist"] = "wishlist_expired"
+        for badge_type in ("completions_100", "completions_50", "completions_10"):
+            if badge_type in badge_types:
+                highest_badges["completions"] = badge_type
+                break
+
+        # Check friend and job application badges
+        for key, badge_type in [
+            ("friend", "first_friend"),
+            ("applications", "applications_5"),
+            ("applied", "applied_5"),
+            ("offered", "job_offered"),
+            ("contact", "first_contact"),
+            ("wishlist", "wishlist_expired"),
+        ]:
+            if badge_type in badge_types:
+                highest_badges[key] = badge_type
 
         return highest_badges
+
+    @classmethod
+    def get_users_highest_badges(cls, users):
+        """Get {user_id: highest badges} for many users (or user ids) in one query"""
+        user_ids = [getattr(user, "pk", user) for user in users]
+        badge_types = {user_id: set() for user_id in user_ids}
+        if user_ids:
+            for user_id, badge_type in cls.objects.filter(user_id__in=user_ids).values_list("user_id", "badge_type"):
+                badge_types[user_id].add(badge_type)
+        return {
+            user_id: cls.highest_badges_from_types(types)
+            for user_id, types in badge_types.items()
+        }
+
+    @classmethod
+    def get_user_highest_badges(cls, user):
+        """Get the highest badge for each category for a user"""
+        return cls.get_users_highest_badges([user])[user.pk]
+
+class LeaderboardEntry(models.Model):
+    """Denormalized leaderboard row per user and habit category ('all' for every habit)"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='leaderboard_entries',
+        on_delete=models.CASCADE
+    )
+    category = models.CharField(max_length=20, default='all')
+    total_completions = models.PositiveIntegerField(default=0)
+    total_possible = models.PositiveIntegerField(default=0)
+    completion_rate = models.FloatField(default=0)
+    current_streak = models.PositiveIntegerField(default=0)
+    total_habits = models.PositiveIntegerField(default=0)
+    badge_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'category')
+        ordering = ['-completion_rate', '-total_completions', 'user_id']
+        indexes = [
+            models.Index(
+                fields=['category', '-completion_rate', '-total_completions', 'user'],
+                name='leaderboard_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} ({self.category}): {self.completion_rate:.1f}%"
+
+class UserCounter(models.Model):
+    """Running per-user totals kept current by signal handlers, so readers don't aggregate raw tables"""
+    COMPLETION_CATEGORIES = ['health', 'productivity', 'learning']
+    APPLICATION_STATUSES = ['wishlist', 'applied', 'interviewing', 'offered', 'rejected']
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        related_name='counters',
+        on_delete=models.CASCADE
+    )
+    total_completions = models.PositiveIntegerField(default=0)
+    health_completions = models.PositiveIntegerField(default=0)
+    productivity_completions = models.PositiveIntegerField(default=0)
+    learning_completions = models.PositiveIntegerField(default=0)
+    wishlist_applications = models.PositiveIntegerField(default=0)
+    applied_applications = models.PositiveIntegerField(default=0)
+    interviewing_applications = models.PositiveIntegerField(default=0)
+    offered_applications = models.PositiveIntegerField(default=0)
+    rejected_applications = models.PositiveIntegerField(default=0)
+    contacts = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Counters for {self.user}"
+
+    @staticmethod
+    def completion_field(category):
+        return f"{category}_completions"
+
+    @staticmethod
+    def application_field(status):
+        return f"{status}_applications"
+
+    def completions_in(self, category):
+        return getattr(self, self.completion_field(category))
+
+    def applications_with_status(self, status):
+        return getattr(self, self.application_field(status))
+
+    @property
+    def total_applications(self):
+        return sum(self.applications_with_status(status) for status in self.APPLICATION_STATUSES)
@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from social.models import Badge
+
+_highest_badges = ContextVar('highest_badges', default=None)
+
+@contextmanager
+def badge_memo():
+    """Remember highest-badge lookups until the block exits (one request, via BadgeMemoMiddleware)"""
+    token = _highest_badges.set({})
+    try:
+        yield
+    finally:
+        _highest_badges.reset(token)
+
+def get_highest_badges(users):
+    """Get {user_id: highest badges}, fetching only users not already looked up in this request"""
+    memo = _highest_badges.get()
+    user_ids = [getattr(user, 'pk', user) for user in users]
+    if memo is None:
+        return Badge.get_users_highest_badges(user_ids)
+
+    missing = [user_id for user_id in user_ids if user_id not in memo]
+    if missing:
+        memo.update(Badge.get_users_highest_badges(missing))
+    return {user_id: memo[user_id] for user_id in user_ids}
+
+def forget_highest_badges(user_id):
+    """Drop a memoized lookup after the user's badges change"""
+    memo = _highest_badges.get()
+    if memo is not None:
+        memo.pop(user_id, None)
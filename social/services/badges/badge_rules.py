@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import Callable
+from django.db.models import F
+from django.utils import timezone
+from habits.models import HabitStreak
+from social.services.counters.counter_service import CounterService
+
+# Domain events badge rules subscribe to
+COMPLETION_ADDED = 'completion_added'
+FRIENDSHIP_ACCEPTED = 'friendship_accepted'
+APPLICATION_STATUS_CHANGED = 'application_status_changed'
+CONTACT_CREATED = 'contact_created'
+
+STREAK_CATEGORIES = ['health', 'learning', 'productivity']
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """Award badge_type when condition(facts) holds after event"""
+    badge_type: str
+    event: str
+    condition: Callable[[dict], bool]
+
+def _streak_rule(category, days):
+    return BadgeRule(
+        f'{category}_{days}_day',
+        COMPLETION_ADDED,
+        lambda facts: facts['category'] == category and facts['daily_streak'] >= days,
+    )
+
+RULES = [
+    BadgeRule('completions_10', COMPLETION_ADDED, lambda facts: facts['total_completions'] >= 10),
+    BadgeRule('completions_50', COMPLETION_ADDED, lambda facts: facts['total_completions'] >= 50),
+    BadgeRule('completions_100', COMPLETION_ADDED, lambda facts: facts['total_completions'] >= 100),
+    *[_streak_rule(category, days) for category in STREAK_CATEGORIES for days in (7, 30)],
+    BadgeRule('first_friend', FRIENDSHIP_ACCEPTED, lambda facts: True),
+    BadgeRule('applications_5', APPLICATION_STATUS_CHANGED, lambda facts: facts['total_applications'] >= 5),
+    BadgeRule('applied_5', APPLICATION_STATUS_CHANGED, lambda facts: facts['applied_applications'] >= 5),
+    BadgeRule('job_offered', APPLICATION_STATUS_CHANGED, lambda facts: facts['status'] == 'offered'),
+    BadgeRule(
+        'wishlist_expired',
+        APPLICATION_STATUS_CHANGED,
+        lambda facts: facts['status'] == 'wishlist' and facts['due'] is not None and facts['due'] < facts['today'],
+    ),
+    BadgeRule('first_contact', CONTACT_CREATED, lambda facts: True),
+]
+
+def completion_facts(user, habit):
+    """The user's completion total and the completed habit's daily streak, in one query"""
+    state = (HabitStreak.objects
+        .filter(habit=habit)
+        .annotate(total_completions=F('habit__user__counters__total_completions'))
+        .first())
+    if state is None or state.total_completions is None:
+        total_completions = CounterService.get(user).total_completions
+    else:
+        total_completions = state.total_completions
+    if state is not None:
+        habit.streak_state = state
+    return habit_completion_facts(habit, total_completions)
+
+def habit_completion_facts(habit, total_completions):
+    """Completion facts for a habit whose streak state is already loaded"""
+    return {
+        'total_completions': total_completions,
+        'category': habit.category,
+        # Only daily habits count towards streak badges
+        'daily_streak': habit.current_streak() if habit.frequency == 'daily' else 0,
+    }
+
+def application_facts(user, application):
+    """Application counts for the user plus the changed application's status and due date"""
+    counter = CounterService.get(user)
+    return {
+        'total_applications': counter.total_applications,
+        'applied_applications': counter.applied_applications,
+        'status': application.status,
+        'due': application.due,
+        'today': timezone.localtime(timezone.now()).date(),
+    }
+
+# Each event loads its facts with at most one query, shared by all of its rules
+FACT_LOADERS = {
+    COMPLETION_ADDED: completion_facts,
+    FRIENDSHIP_ACCEPTED: lambda user: {},
+    APPLICATION_STATUS_CHANGED: application_facts,
+    CONTACT_CREATED: lambda user, contact: {},
+}
+
+def rules_for(event):
+    return [rule for rule in RULES if rule.event == event]
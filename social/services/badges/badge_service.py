@@ -1,18 +1,83 @@
 import logging
+from datetime import timedelta
 from django.db.models import Q, Count, Exists
+from django.dispatch import Signal
 from django.utils import timezone
 from social.models import Badge
-from habits.models import Habit, HabitCompletion
-from applications.models import Application, Contact
+from habits.models import Habit
+from habits.services.analytics.streak_engine import StreakEngine
+from applications.models import Application
+from social.services.counters.counter_service import CounterService
+from .badge_rules import COMPLETION_ADDED, FACT_LOADERS, habit_completion_facts, rules_for
 
 logger = logging.getLogger(__name__)
 
+# Sent with user_id and badge_types after award_badges inserts new badges
+badges_awarded = Signal()
+
 class BadgeService:
     def __init__(self, user):
         self.user = user
 
+    def handle_event(self, event, **payload):
+        """Evaluate the badge rules subscribed to event and award any that now hold"""
+        rules = rules_for(event)
+        facts = FACT_LOADERS[event](self.user, **payload)
+        return self.award_badges([rule.badge_type for rule in rules if rule.condition(facts)])
+
+    def handle_completions(self, habits):
+        """Evaluate completion_added rules once for several habits that just gained completions"""
+        total_completions = CounterService.get(self.user).total_completions
+        rules = rules_for(COMPLETION_ADDED)
+        badge_types = []
+        for habit in habits:
+            facts = habit_completion_facts(habit, total_completions)
+            badge_types.extend(rule.badge_type for rule in rules if rule.condition(facts))
+        return self.award_badges(badge_types)
+
+    def award_badges(self, badge_types):
+        """Award badges the user doesn't have yet in one insert. Once awarded, badges are permanent."""
+        if not badge_types:
+            return []
+        existing = set(
+            Badge.objects.filter(user=self.user, badge_type__in=badge_types).values_list('badge_type', flat=True)
+        )
+        new_types = [badge_type for badge_type in dict.fromkeys(badge_types) if badge_type not in existing]
+        if new_types:
+            Badge.objects.bulk_create(
+                [Badge(user=self.user, badge_type=badge_type) for badge_type in new_types],
+                ignore_conflicts=True
+            )
+            badges_awarded.send(sender=Badge, user_id=self.user.pk, badge_types=new_types)
+        return new_types
+
+    @staticmethod
+    def award_expired_wishlist_badges(today=None, days=1):
+        """Batch job: award wishlist_expired to owners of wishlist items that fell due in the last `days` days.
+
+        Returns the number of users newly awarded.
+        """
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        user_ids = set(Application.objects.filter(
+            status='wishlist',
+            due__gte=today - timedelta(days=days),
+            due__lt=today
+        ).values_list('user_id', flat=True).distinct())
+        user_ids -= set(Badge.objects.filter(
+            user_id__in=user_ids, badge_type='wishlist_expired'
+        ).values_list('user_id', flat=True))
+
+        Badge.objects.bulk_create(
+            [Badge(user_id=user_id, badge_type='wishlist_expired') for user_id in sorted(user_ids)],
+            ignore_conflicts=True
+        )
+        for user_id in sorted(user_ids):
+            badges_awarded.send(sender=Badge, user_id=user_id, badge_types=['wishlist_expired'])
+        return len(user_ids)
+
     def check_all_badges(self):
-        """Check all possible badges for the user"""
+        """Rescan everything and award all badges the user qualifies for (handle_event covers day-to-day changes)"""
         self.check_completion_badges()
         self.check_social_badges()
         self.check_streak_badges()
@@ -30,51 +95,43 @@ class BadgeService:
         ).exists()
         
         if has_friends:
-            self._award_badge('first_friend')
+            self.award_badges(['first_friend'])
 
     def check_completion_badges(self):
         """Check and award completion-based badges"""
-        # Get total completions and per-habit counts in one query
-        total_completions = HabitCompletion.objects.filter(
-            habit__user=self.user
-        ).count()
+        total_completions = CounterService.get(self.user).total_completions
         
-        # Check each threshold - order matters to log all eligible badges
-        if total_completions >= 100:
-            self._award_badge('completions_100')
-        if total_completions >= 50:
-            self._award_badge('completions_50')
-        if total_completions >= 10:
-            self._award_badge('completions_10')
+        self.award_badges([
+            f'completions_{threshold}' for threshold in (100, 50, 10)
+            if total_completions >= threshold
+        ])
 
     def check_streak_badges(self):
         """Check and award streak-based badges"""
-        habits = (Habit.objects
-            .filter(user=self.user, frequency='daily')
-            .prefetch_related('completions')
-            .select_related('user'))
-        
-        for category in ['health', 'learning', 'productivity']:
-            category_habits = [h for h in habits if h.category == category]
-            longest_streak = max((habit.current_streak() for habit in category_habits), default=0)
-            
-            # Check each threshold - order matters to log all eligible badges
-            if longest_streak >= 30:
-                self._award_badge(f'{category}_30_day')
-            if longest_streak >= 7:
-                self._award_badge(f'{category}_7_day')
+        habits = Habit.objects.filter(user=self.user, frequency='daily')
+        streaks = StreakEngine.compute(habits)
+
+        # Best current streak per category, from one query over all daily habits
+        category_streaks = {}
+        for habit_id, category in habits.values_list('pk', 'category'):
+            current = streaks.get(habit_id, {}).get('current_streak', 0)
+            category_streaks[category] = max(category_streaks.get(category, 0), current)
+
+        self.award_badges([
+            f'{category}_{days}_day'
+            for category in ['health', 'learning', 'productivity']
+            for days in (30, 7)
+            if category_streaks.get(category, 0) >= days
+        ])
 
     def check_application_badges(self):
         """Check and award job application badges"""
         # Get all applications in one query with annotations
         applications = Application.objects.filter(user=self.user)
-        total_count = applications.count()
-        
-        if total_count >= 5:
-            self._award_badge('applications_5')
 
-        # Get counts and flags for other badges
+        # Get counts and flags for all application badges
         status_stats = applications.aggregate(
+            total_count=Count('id'),
             applied_count=Count('id', filter=Q(status='applied')),
             has_offer=Count('id', filter=Q(status='offered')),
             has_expired_wishlist=Count(
@@ -86,24 +143,18 @@ class BadgeService:
             )
         )
 
+        badge_types = []
+        if status_stats['total_count'] >= 5:
+            badge_types.append('applications_5')
         if status_stats['applied_count'] >= 5:
-            self._award_badge('applied_5')
-        
+            badge_types.append('applied_5')
         if status_stats['has_offer'] > 0:
-            self._award_badge('job_offered')
-            
+            badge_types.append('job_offered')
         if status_stats['has_expired_wishlist'] > 0:
-            self._award_badge('wishlist_expired')
+            badge_types.append('wishlist_expired')
+        self.award_badges(badge_types)
 
     def check_contact_badges(self):
         """Check and award contact badges"""
-        has_contact = Contact.objects.filter(user=self.user).exists()
-        if has_contact:
-            self._award_badge('first_contact')
-
-    def _award_badge(self, badge_type):
-        """Award a badge if it hasn't been awarded yet. Once awarded, badges are permanent."""
-        Badge.objects.get_or_create(
-            user=self.user,
-            badge_type=badge_type
-        )
+        if CounterService.get(self.user).contacts > 0:
+            self.award_badges(['first_contact'])
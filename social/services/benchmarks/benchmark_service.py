@@ -0,0 +1,176 @@
+import statistics
+import subprocess
+import time
+import tracemalloc
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from habits.models import Habit
+from habits.services.analytics.analytics_service import HabitAnalyticsService
+from habits.services.analytics.calendar_service import CalendarService
+from habits.services.analytics.snapshot_cache import AnalyticsSnapshotCache
+from social.services.badges.badge_service import BadgeService
+from social.services.seeding.seed_service import SeedService
+
+def _get(url_name, **kwargs):
+    def run(context):
+        response = context['client'].get(reverse(url_name, kwargs={
+            key: value(context) for key, value in kwargs.items()
+        }))
+        if response.status_code != 200:
+            raise RuntimeError(f"{url_name} returned {response.status_code}")
+    return run
+
+# Benchmark name -> callable run against a context of user, habit and a logged-in client
+CASES = {
+    'HabitListView': _get('habits:habit_list'),
+    'HabitDetailView': _get('habits:habit_detail', pk=lambda context: context['habit'].pk),
+    'DashboardView': _get('social:dashboard', username=lambda context: context['user'].username),
+    'LeaderboardView': _get('social:leaderboard'),
+    'FoodListView': _get('nutrition:food_list'),
+    'ApplicationListView': _get('applications:application_list'),
+    'BadgeService.check_all_badges': lambda context: BadgeService(context['user']).check_all_badges(),
+    'HabitAnalyticsService.get_list_view_data':
+        lambda context: HabitAnalyticsService(context['user']).get_list_view_data(),
+    'HabitAnalyticsService.get_habit_detail_data':
+        lambda context: HabitAnalyticsService(context['user']).get_habit_detail_data(context['habit']),
+}
+
+class BenchmarkService:
+    """Times the hot views and services against seeded datasets of increasing size.
+
+    Each size is seeded with SeedService inside a transaction that is rolled
+    back afterwards, so runs leave the database as they found it. Every case
+    is timed `repeat` times with the seeded users' cached analytics cleared
+    first (so cached snapshots don't hide the work), then run once more to
+    count queries and trace peak Python memory. Only those keys are touched,
+    so other users' caches survive a run against a shared cache.
+    """
+
+    DEFAULT_SIZES = (10, 100, 500)
+
+    def __init__(self, sizes=DEFAULT_SIZES, repeat=5, cases=None, seed=0):
+        self.sizes = list(sizes)
+        self.repeat = repeat
+        self.cases = {name: CASES[name] for name in (cases or CASES)}
+        self.seed = seed
+
+    def run(self):
+        """{'meta': ..., 'results': {case: {size: measurements}}}"""
+        results = {name: {} for name in self.cases}
+        for size in self.sizes:
+            for name, measurements in self.run_size(size).items():
+                results[name][str(size)] = measurements
+        return {'meta': self.meta(), 'results': results}
+
+    def meta(self):
+        return {
+            'commit': self._commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'sizes': self.sizes,
+            'repeat': self.repeat,
+            'seed': self.seed,
+        }
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    # The test client's host has to be allowed outside the test runner
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def run_size(self, size):
+        with transaction.atomic():
+            SeedService(users=size, seed=self.seed, prefix=f'benchmark{size}-').run()
+            context = self._context(size)
+            try:
+                measurements = {name: self.measure(case, context) for name, case in self.cases.items()}
+            finally:
+                # The rows are rolled back, so their ids may be handed out again
+                self._clear_caches(context)
+            transaction.set_rollback(True)
+        return measurements
+
+    def _context(self, size):
+        users = get_user_model().objects.filter(username__startswith=f'benchmark{size}-')
+        user = users.get(username=f'benchmark{size}-{0:06d}')
+        client = Client()
+        client.force_login(user)
+        return {
+            'user': user,
+            'habit': user.habits.order_by('pk').first(),
+            'client': client,
+            'cache_keys': self._cache_keys(users),
+        }
+
+    @staticmethod
+    def _cache_keys(users):
+        """The analytics cache keys the seeded users' requests can fill"""
+        today = timezone.localtime(timezone.now()).date()
+        keys = []
+        for user_id in users.values_list('pk', flat=True):
+            keys.append(CalendarService.user_cache_key(user_id))
+            keys.extend(
+                AnalyticsSnapshotCache.cache_key(user_id, name, today) for name in AnalyticsSnapshotCache.names()
+            )
+        habits = Habit.objects.filter(user__in=users).values_list('pk', flat=True)
+        keys.extend(CalendarService.habit_cache_key(habit_id) for habit_id in habits)
+        return keys
+
+    def measure(self, case, context):
+        timings = []
+        for _ in range(self.repeat):
+            self._clear_caches(context)
+            started = time.perf_counter()
+            case(context)
+            timings.append(time.perf_counter() - started)
+
+        # Tracing allocations slows everything down, so memory gets its own run
+        self._clear_caches(context)
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as captured:
+                case(context)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'min_ms': round(min(timings) * 1000, 2),
+            'queries': len(captured.captured_queries),
+            'peak_kib': round(peak / 1024, 1),
+        }
+
+    @staticmethod
+    def _clear_caches(context):
+        caches['analytics'].delete_many(context['cache_keys'])
+
+    @staticmethod
+    def compare(baseline, current, threshold=0.2):
+        """Regressions from baseline to current: (case, size, metric, before, after).
+
+        Times and memory regress when they grow by more than `threshold`
+        (a fraction); any increase in the query count is a regression.
+        """
+        regressions = []
+        for name, sizes in current['results'].items():
+            for size, after in sizes.items():
+                before = baseline['results'].get(name, {}).get(size)
+                if before is None:
+                    continue
+                if after['queries'] > before['queries']:
+                    regressions.append((name, size, 'queries', before['queries'], after['queries']))
+                for metric in ('median_ms', 'peak_kib'):
+                    if after[metric] > before[metric] * (1 + threshold):
+                        regressions.append((name, size, metric, before[metric], after[metric]))
+        return regressions
@@ -0,0 +1,103 @@
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from habits.models import HabitCompletion
+from applications.models import Application, Contact
+from social.models import UserCounter
+
+class CounterService:
+    """Reads and maintains UserCounter rows.
+
+    Writers call the increment helpers from signal handlers, so each change
+    is a single F() UPDATE in the same transaction as the row it counts.
+    Rows for existing users are backfilled by migration; a row that is still
+    missing is counted from the raw tables on read and only rebuilt by writers.
+    """
+
+    @staticmethod
+    def get(user):
+        """The user's counters, counted without saving if they don't exist yet"""
+        user_id = getattr(user, 'pk', user)
+        counter = UserCounter.objects.filter(user_id=user_id).first()
+        if counter is None:
+            counter = UserCounter(user_id=user_id, **CounterService._count(user_id))
+        return counter
+
+    @staticmethod
+    def rebuild(user):
+        """Recount everything for a user from habits, applications and contacts"""
+        user_id = getattr(user, 'pk', user)
+        counter, _ = UserCounter.objects.update_or_create(
+            user_id=user_id, defaults=CounterService._count(user_id)
+        )
+        return counter
+
+    @staticmethod
+    def _count(user_id):
+        completions = HabitCompletion.objects.filter(habit__user_id=user_id).aggregate(
+            total_completions=Count('id'),
+            **{
+                UserCounter.completion_field(category): Count('id', filter=Q(habit__category=category))
+                for category in UserCounter.COMPLETION_CATEGORIES
+            }
+        )
+        applications = Application.objects.filter(user_id=user_id).aggregate(**{
+            UserCounter.application_field(status): Count('id', filter=Q(status=status))
+            for status in UserCounter.APPLICATION_STATUSES
+        })
+        return {
+            **completions,
+            **applications,
+            'contacts': Contact.objects.filter(user_id=user_id).count(),
+        }
+
+    @staticmethod
+    def rebuild_all(users):
+        count = 0
+        for user_id in users.values_list('pk', flat=True):
+            CounterService.rebuild(user_id)
+            count += 1
+        return count
+
+    @staticmethod
+    def add_completion(user_id, category, delta=1):
+        CounterService._increment(user_id, {
+            'total_completions': delta,
+            UserCounter.completion_field(category): delta,
+        })
+
+    @staticmethod
+    def add_completions(user_id, category_deltas):
+        """Apply {category: delta} completion changes in one update"""
+        deltas = {'total_completions': sum(category_deltas.values())}
+        for category, delta in category_deltas.items():
+            field = UserCounter.completion_field(category)
+            deltas[field] = deltas.get(field, 0) + delta
+        CounterService._increment(user_id, deltas)
+
+    @staticmethod
+    def change_application_status(user_id, old_status=None, new_status=None):
+        """Move an application between status counts; None means created or deleted"""
+        deltas = {}
+        if old_status is not None:
+            deltas[UserCounter.application_field(old_status)] = -1
+        if new_status is not None:
+            field = UserCounter.application_field(new_status)
+            deltas[field] = deltas.get(field, 0) + 1
+        CounterService._increment(user_id, deltas)
+
+    @staticmethod
+    def add_contact(user_id, delta=1):
+        CounterService._increment(user_id, {'contacts': delta})
+
+    @staticmethod
+    def _increment(user_id, deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        updated = UserCounter.objects.filter(user_id=user_id).update(
+            **{field: F(field) + delta for field, delta in deltas.items()},
+            updated_at=timezone.now()
+        )
+        if not updated:
+            # The write being counted is already visible, so rebuilding includes it
+            CounterService.rebuild(user_id)
@@ -0,0 +1,157 @@
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from habits.models import Habit, HabitStreak
+from habits.services.analytics.streak_engine import StreakEngine
+from social.services.badges.badge_memo import get_highest_badges
+from social.models import Badge, LeaderboardEntry
+
+class LeaderboardService:
+    """Maintains and reads the materialized LeaderboardEntry table.
+
+    Entries are rebuilt per user when their habits or badges change, and
+    completion toggles adjust the counts in place with a single UPDATE.
+    Possible completions and streaks also move with the calendar, so the
+    rebuild_leaderboard command should run once a day to roll them over.
+    """
+
+    paginate_by = 25
+    rebuild_batch_size = 500
+
+    def __init__(self, category='all', today=None):
+        self.category = category
+        if today is None:
+            today = timezone.localtime(timezone.now()).date()
+        self.today = today
+
+    def get_page(self, page_number=None):
+        """Read one pre-sorted page of entries as leaderboard rows with ranks and highest badges"""
+        entries = LeaderboardEntry.objects.filter(category=self.category).select_related('user')
+        page = Paginator(entries, self.paginate_by).get_page(page_number)
+        entries = list(page.object_list)
+
+        badges = get_highest_badges([entry.user_id for entry in entries])
+
+        page.object_list = [
+            {
+                'rank': rank,
+                'user': entry.user,
+                'total_completions': entry.total_completions,
+                'completion_rate': entry.completion_rate,
+                'current_streak': entry.current_streak,
+                'total_habits': entry.total_habits,
+                'badges': badges[entry.user_id],
+                'badge_count': entry.badge_count,
+            }
+            for rank, entry in enumerate(entries, start=page.start_index())
+        ]
+        return page
+
+    def build_entries(self, user_ids=None):
+        """Unsaved entries for the given users (or everyone) from their current habits"""
+        habits = Habit.objects.all()
+        badges = Badge.objects.all()
+        if user_ids is not None:
+            habits = habits.filter(user_id__in=user_ids)
+            badges = badges.filter(user_id__in=user_ids)
+
+        badge_types = {}
+        for user_id, badge_type in badges.values_list('user_id', 'badge_type'):
+            badge_types.setdefault(user_id, set()).add(badge_type)
+
+        streaks = StreakEngine.compute(habits, self.today)
+        habit_rows = (habits
+            .order_by()
+            .annotate(completion_count=Count('completions'))
+            .values_list('pk', 'user_id', 'category', 'frequency', 'created_at', 'completion_count'))
+
+        entries = {}
+        for habit_id, user_id, category, frequency, created_at, completion_count in habit_rows:
+            possible = Habit.total_possible_completions(created_at, frequency, self.today)
+            streak = streaks.get(habit_id, {}).get('current_streak', 0)
+            for key in ('all', category):
+                entry = entries.get((user_id, key))
+                if entry is None:
+                    highest_badges = Badge.highest_badges_from_types(badge_types.get(user_id, ()))
+                    entry = entries[(user_id, key)] = LeaderboardEntry(
+                        user_id=user_id,
+                        category=key,
+                        badge_count=sum(1 for badge in highest_badges.values() if badge is not None),
+                    )
+                entry.total_completions += completion_count
+                entry.total_possible += possible
+                entry.total_habits += 1
+                entry.current_streak = max(entry.current_streak, streak)
+
+        for entry in entries.values():
+            entry.completion_rate = (
+                entry.total_completions / entry.total_possible * 100 if entry.total_possible > 0 else 0
+            )
+        return list(entries.values())
+
+    @transaction.atomic
+    def refresh_users(self, user_ids):
+        """Replace the entries of the given users"""
+        entries = self.build_entries(user_ids)
+        LeaderboardEntry.objects.filter(user_id__in=user_ids).delete()
+        LeaderboardEntry.objects.bulk_create(entries)
+        return entries
+
+    def rebuild(self, users=None):
+        """Rebuild entries for the given users (default: everyone) in batches; returns the user count"""
+        if users is None:
+            users = get_user_model().objects.all()
+        user_ids = list(users.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(user_ids), self.rebuild_batch_size):
+            self.refresh_users(user_ids[start:start + self.rebuild_batch_size])
+        return len(user_ids)
+
+    def record_completion(self, habit, delta):
+        """Apply a completion being added (+1) or removed (-1) to the habit owner's entries.
+
+        Streak state is updated first by the habits app, so the best current
+        streak is re-read from HabitStreak rows whose last period is current.
+        """
+        total_completions = F('total_completions') + delta
+        updated = (LeaderboardEntry.objects
+            .filter(user_id=habit.user_id, category__in=['all', habit.category])
+            .update(
+                total_completions=total_completions,
+                completion_rate=Case(
+                    When(total_possible=0, then=Value(0.0)),
+                    default=ExpressionWrapper(
+                        total_completions * 100.0 / F('total_possible'), output_field=FloatField()
+                    ),
+                ),
+                current_streak=Case(
+                    When(category='all', then=self._best_current_streak()),
+                    default=self._best_current_streak(category=habit.category),
+                ),
+                updated_at=timezone.now(),
+            ))
+        if updated < 2:
+            # Entries are missing (e.g. before the first rebuild); build them from scratch
+            self.refresh_users([habit.user_id])
+
+    def refresh_badge_count(self, user_id):
+        """Recount a user's highest badges after one is awarded"""
+        highest_badges = Badge.get_users_highest_badges([user_id])[user_id]
+        LeaderboardEntry.objects.filter(user_id=user_id).update(
+            badge_count=sum(1 for badge in highest_badges.values() if badge is not None),
+            updated_at=timezone.now(),
+        )
+
+    def _best_current_streak(self, category=None):
+        states = HabitStreak.objects.filter(habit__user=OuterRef('user')).filter(
+            Q(habit__frequency='daily', last_completed_period=HabitStreak.period_start(self.today, 'daily')) |
+            Q(habit__frequency='weekly', last_completed_period=HabitStreak.period_start(self.today, 'weekly'))
+        )
+        if category is not None:
+            states = states.filter(habit__category=category)
+        return Coalesce(
+            Subquery(states.order_by('-current_streak').values('current_streak')[:1]),
+            0,
+        )
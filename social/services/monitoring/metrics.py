@@ -0,0 +1,311 @@
+import atexit
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Metric:
+    """A named metric with a fixed set of label names, kept in this process's memory
+    and shared with other processes through METRICS_DIR when it is set"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _changed(self):
+        store = _store()
+        if store is not None:
+            store.changed()
+
+    def snapshot(self):
+        """This process's values as JSON-ready [label values, value] pairs"""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def render(self, values=None):
+        """Exposition lines for `values` ({label values: value}), this process's own by default"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.extend(self._samples(list(zip(self.labelnames, key)), value))
+        return lines
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._changed()
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def merge(self, value, other):
+        return value + other
+
+    def _samples(self, labels, value):
+        return [f'{self.name}_total{_format_labels(labels)} {_format_value(value)}']
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            # A new list, so snapshots already taken are left as they were
+            counts = list(counts)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+        self._changed()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def merge(self, value, other):
+        counts, total = value
+        other_counts, other_total = other
+        if len(other_counts) != len(counts):
+            # Written by a process with different buckets
+            return value
+        return [a + b for a, b in zip(counts, other_counts)], total + other_total
+
+    def _samples(self, labels, value):
+        counts, total = value
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            samples.append(
+                f'{self.name}_bucket{_format_labels(labels + [("le", _format_value(bound))])} {cumulative}'
+            )
+        samples.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+        samples.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return samples
+
+REGISTRY = []
+
+class FileStore:
+    """Shares metric values between processes through a directory with one file per process.
+
+    A process rewrites its own file at most once every `interval` seconds after
+    a change (and when it exits), and the exposition sums every file in the
+    directory. When a scrape finds files of processes that have exited, it
+    merges them into one file for all exited processes and deletes them, so
+    counters do not go backwards when a worker restarts and the directory
+    does not grow with every restart. The processes must share a host, since
+    liveness is checked by pid.
+    """
+
+    interval = 1.0
+    EXITED = 'exited.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._timer = None
+        self._pid = None
+        self._path = None
+
+    def _own_path(self):
+        # A new file per process; a forked child must not overwrite its parent's
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._path = os.path.join(self.directory, f'{self._pid}-{uuid.uuid4().hex}.json')
+        return self._path
+
+    def changed(self):
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write this process's values to its file"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            values = {metric.name: metric.snapshot() for metric in REGISTRY}
+            os.makedirs(self.directory, exist_ok=True)
+            self._write(self._own_path(), values)
+
+    @staticmethod
+    def _write(path, values):
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(values, file)
+        os.replace(f'{path}.tmp', path)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _exited(name):
+        """Whether a per-process file belongs to a process that is no longer running"""
+        pid, _, _ = name.partition('-')
+        if not pid.isdigit() or int(pid) == os.getpid():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    @staticmethod
+    def _merge(totals, values):
+        for metric in REGISTRY:
+            metric_totals = totals.setdefault(metric.name, {})
+            for key, value in values.get(metric.name, ()):
+                key = tuple(key)
+                metric_totals[key] = metric.merge(metric_totals[key], value) if key in metric_totals else value
+        return totals
+
+    def collect(self):
+        """{metric name: {label values: value}} summed over every process's file"""
+        self.flush()
+        # Scrapes take turns, so a file is never counted both on its own and merged
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            names = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+            exited = [name for name in names if self._exited(name)]
+            if exited:
+                self._compact(exited)
+            totals = {}
+            for name in set(names) - set(exited) | {self.EXITED}:
+                self._merge(totals, self._read(os.path.join(self.directory, name)))
+        return totals
+
+    def _compact(self, names):
+        """Fold exited processes' files into the exited file and delete them"""
+        path = os.path.join(self.directory, self.EXITED)
+        totals = self._merge({}, self._read(path))
+        for name in names:
+            self._merge(totals, self._read(os.path.join(self.directory, name)))
+        self._write(path, {
+            name: [[list(key), value] for key, value in values.items()]
+            for name, values in totals.items()
+        })
+        for name in names:
+            os.remove(os.path.join(self.directory, name))
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._timer = None
+
+_STORE = None
+
+def _store():
+    global _STORE
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return None
+    if _STORE is None or _STORE.directory != directory:
+        _STORE = FileStore(directory)
+    return _STORE
+
+def _flush_at_exit():
+    if _STORE is not None:
+        _STORE.flush()
+
+def _reset_after_fork():
+    # The child starts with no values of its own; the parent's are in the parent's file
+    for metric in REGISTRY:
+        metric._lock = threading.Lock()
+        metric._values.clear()
+    if _STORE is not None:
+        _STORE.reset_after_fork()
+
+atexit.register(_flush_at_exit)
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def exposition():
+    """Every registered metric in the Prometheus text exposition format, summed over
+    the processes sharing METRICS_DIR when it is set"""
+    store = _store()
+    if store is None:
+        return '\n'.join(line for metric in REGISTRY for line in metric.render()) + '\n'
+    totals = store.collect()
+    return '\n'.join(line for metric in REGISTRY for line in metric.render(totals[metric.name])) + '\n'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUEST_DURATION = Histogram(
+    'momentum_http_request_duration_seconds', 'Request latency by URL name',
+    ('view', 'method'), LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    'momentum_http_requests', 'Requests by URL name and status code', ('view', 'method', 'status'),
+)
+REQUEST_QUERIES = Histogram(
+    'momentum_http_request_queries', 'Database queries per request by URL name',
+    ('view',), (1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+AI_SUMMARY_DURATION = Histogram(
+    'momentum_ai_summary_duration_seconds', 'AI summary generation latency', ('outcome',),
+    (0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+BADGES_AWARDED = Counter('momentum_badges_awarded', 'Badges awarded by type', ('badge_type',))
@@ -0,0 +1,91 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+_profile = ContextVar('request_profile', default=None)
+
+class RequestProfile:
+    """Where one request's time went: SQL, template rendering and everything else (the view)"""
+
+    def __init__(self, query_stats):
+        self.query_stats = query_stats
+        self.template_seconds = 0.0
+        self.total_seconds = 0.0
+
+    @property
+    def view_seconds(self):
+        return max(self.total_seconds - self.query_stats.seconds - self.template_seconds, 0.0)
+
+    def server_timing(self):
+        """The Server-Timing header value, durations in milliseconds"""
+        return ', '.join([
+            f'db;dur={self.query_stats.seconds * 1000:.1f};desc="{self.query_stats.count} queries"',
+            f'template;dur={self.template_seconds * 1000:.1f}',
+            f'view;dur={self.view_seconds * 1000:.1f}',
+            f'total;dur={self.total_seconds * 1000:.1f}',
+        ])
+
+    def log(self, request, response):
+        match = request.resolver_match
+        logger.info('request timing %s', json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': self.query_stats.count,
+            'db_ms': round(self.query_stats.seconds * 1000, 1),
+            'template_ms': round(self.template_seconds * 1000, 1),
+            'view_ms': round(self.view_seconds * 1000, 1),
+            'total_ms': round(self.total_seconds * 1000, 1),
+        }))
+
+@contextmanager
+def profile_request(query_stats):
+    """Time the block as one request; templates rendered inside it add to its template time"""
+    profile = RequestProfile(query_stats)
+    token = _profile.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.total_seconds = time.perf_counter() - started
+        _profile.reset(token)
+
+class TimedTemplate:
+    """A backend template that adds its render time, less the SQL it runs, to the request profile"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        profile = _profile.get()
+        if profile is None:
+            return self._template.render(context, request)
+
+        started = time.perf_counter()
+        db_seconds = profile.query_stats.seconds
+        try:
+            return self._template.render(context, request)
+        finally:
+            elapsed = time.perf_counter() - started
+            profile.template_seconds += elapsed - (profile.query_stats.seconds - db_seconds)
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with top-level renders timed for ServerTimingMiddleware.
+
+    Includes and extends render inside the engine, so each page is timed once.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,109 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run per request, on a view class or function.
+
+    Put it innermost (directly on the function, under login_required and
+    friends) so the wrappers copy the budget onto the resolved view.
+    QueryBudgetMiddleware enforces it.
+    """
+    def decorate(view):
+        view.query_budget = max_queries
+        return view
+    return decorate
+
+def get_query_budget(view_func):
+    """The budget declared on a resolved view (function or as_view() of a class), or None"""
+    view_class = getattr(view_func, 'view_class', None)
+    return getattr(view_class, 'query_budget', getattr(view_func, 'query_budget', None))
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r'\s+')
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so the same query with other values matches"""
+    sql = _NUMBER.sub('%s', _STRING.sub('%s', sql))
+    return _IN_LIST.sub('IN (...)', _WHITESPACE.sub(' ', sql).strip())
+
+class QueryStats:
+    """The queries one request ran: how many, total SQL time and a count per fingerprint"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def add(self, sql, seconds):
+        self.seconds += seconds
+        self.count += 1
+        self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def record(self):
+        """Count the queries run in this context, including sync_to_async threads it calls into"""
+        _install_recorder(connection)
+        token = _recording.set(self)
+        try:
+            yield self
+        finally:
+            _recording.reset(token)
+
+    def over_budget(self, budget, view_name, strict):
+        """Raise (strict, e.g. under tests) or log a warning with the most repeated SQL"""
+        message = (
+            f"{view_name} ran {self.count} queries ({self.seconds * 1000:.1f} ms), "
+            f"over its budget of {budget}"
+        )
+        if strict:
+            raise QueryBudgetExceeded(message + ":\n" + self.describe())
+        logger.warning("%s:\n%s", message, self.describe())
+
+    def describe(self, limit=5):
+        return '\n'.join(
+            f"  {count}x {sql}" for sql, count in self.fingerprints.most_common(limit)
+        )
+
+# Connections are per thread (an async view's queries run on executor threads), so every
+# connection gets one permanent wrapper that reports to the stats of the current context
+_recording = ContextVar('query_stats', default=None)
+
+def _record_query(execute, sql, params, many, context):
+    stats = _recording.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - started)
+
+def _install_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        # Outermost, so execute_wrapper() blocks, which pop the last wrapper, leave it alone
+        connection.execute_wrappers.insert(0, _record_query)
+
+connection_created.connect(_install_recorder)
+
+@contextmanager
+def record_request_queries(request):
+    """Record the request's queries on request.query_stats, unless an outer middleware already is"""
+    if hasattr(request, 'query_stats'):
+        yield request.query_stats
+        return
+    request.query_stats = QueryStats()
+    with request.query_stats.record() as stats:
+        yield stats
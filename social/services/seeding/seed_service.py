@@ -0,0 +1,304 @@
+import random
+import time
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from applications.models import Application, StatusChange
+from books.models import Book
+from habits.models import Habit, HabitCompletion, HabitStreak
+from habits.services.analytics.rollup_service import RollupService
+from nutrition.models import Food, Weight
+from social.models import Badge, Friendship, UserCounter
+from social.services.badges.badge_rules import (
+    APPLICATION_STATUS_CHANGED, COMPLETION_ADDED, FRIENDSHIP_ACCEPTED, rules_for
+)
+from social.services.leaderboard.leaderboard_service import LeaderboardService
+
+HABIT_NAMES = {
+    'health': ['Run', 'Stretch', 'Drink water', 'Lift', 'Walk 10k steps', 'Sleep by 11'],
+    'productivity': ['Inbox zero', 'Plan the day', 'Deep work block', 'Weekly review', 'Tidy desk'],
+    'learning': ['Read', 'Practice Spanish', 'Leetcode', 'Watch a lecture', 'Write notes'],
+}
+COMPANIES = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark', 'Wayne', 'Wonka']
+TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'Designer', 'SRE']
+FOODS = ['Oatmeal', 'Chicken salad', 'Pasta', 'Yogurt', 'Rice bowl', 'Sandwich', 'Stir fry']
+
+# Statuses an application passes through (after wishlist) to reach its current one
+STATUS_PATHS = {
+    'wishlist': [],
+    'applied': ['applied'],
+    'interviewing': ['applied', 'interviewing'],
+    'offered': ['applied', 'interviewing', 'offered'],
+    'rejected': ['applied', 'rejected'],
+}
+STATUS_WEIGHTS = {'wishlist': 3, 'applied': 4, 'interviewing': 2, 'offered': 1, 'rejected': 3}
+FRIENDSHIP_WEIGHTS = {'accepted': 7, 'pending': 2, 'declined': 1}
+
+class SeedService:
+    """Generates a reproducible, production-shaped dataset for load testing.
+
+    Everything is drawn from one seeded Random, so the same options give the
+    same rows. Rows are written with bulk_create in large batches, which
+    skips signals, so derived state (streaks, counters, badges) is computed
+    from the generated data as it goes and rollups and the leaderboard are
+    rebuilt once at the end.
+    """
+
+    def __init__(self, users=100, habits=5, years=2, friends=3, applications=10, books=5,
+                 food_days=90, seed=0, batch_size=5000, prefix='load', password='password', today=None):
+        self.user_count = users
+        self.habits_per_user = habits
+        self.days = max(int(years * 365), 1)
+        self.friends_per_user = friends
+        self.applications_per_user = applications
+        self.books_per_user = books
+        self.food_days = food_days
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.password = password
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.today = today or timezone.localtime(self.now).date()
+        self.counts = {}
+
+    @transaction.atomic
+    def run(self):
+        """Create the dataset; returns {table: rows created} plus elapsed seconds"""
+        started = time.monotonic()
+        users = self._create_users()
+        habits = self._create_habits(users)
+        totals = self._create_completions(habits)
+        accepted = self._create_friendships(users)
+        applications = self._create_applications(users)
+        self._create_books(users)
+        self._create_nutrition(users)
+
+        counters = self._create_counters(users, totals, applications)
+        self._award_badges(habits, totals, accepted, applications, counters)
+        user_queryset = get_user_model().objects.filter(pk__in=[user.pk for user in users])
+        RollupService.rebuild(user_queryset)
+        LeaderboardService().rebuild(user_queryset)
+
+        return {**self.counts, 'seconds': time.monotonic() - started}
+
+    def _bulk_create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        key = model._meta.verbose_name_plural
+        self.counts[key] = self.counts.get(key, 0) + len(created)
+        return created
+
+    def _create_users(self):
+        # Hashing is deliberately slow, so every seeded user shares one hash
+        password = make_password(self.password)
+        return self._bulk_create(get_user_model(), [
+            get_user_model()(username=f'{self.prefix}{index:06d}', password=password)
+            for index in range(self.user_count)
+        ])
+
+    def _create_habits(self, users):
+        names = [(category, name) for category, category_names in HABIT_NAMES.items() for name in category_names]
+        habits = []
+        for user in users:
+            # Names are unique per user, so draw without replacement and number any repeats
+            picks = self.random.sample(names, len(names))
+            for number in range(self.habits_per_user):
+                category, name = picks[number % len(picks)]
+                habits.append(Habit(
+                    user=user,
+                    name=name if number < len(picks) else f'{name} {number // len(picks) + 1}',
+                    category=category,
+                    frequency='weekly' if self.random.random() < 0.2 else 'daily',
+                    created_at=self.now - timedelta(days=self.random.randint(0, self.days - 1)),
+                ))
+        return self._bulk_create(Habit, habits)
+
+    def _completion_dates(self, habit):
+        """Completed days as runs broken by gaps: each period continues the current state or flips it"""
+        keep_going = self.random.uniform(0.6, 0.97)
+        resume = self.random.uniform(0.2, 0.5)
+        weekly = habit.frequency == 'weekly'
+        created = timezone.localtime(habit.created_at).date()
+        period = created - timedelta(days=created.weekday()) if weekly else created
+
+        dates = []
+        completed = self.random.random() < keep_going
+        while period <= self.today:
+            if completed:
+                day = period + timedelta(days=self.random.randrange(7)) if weekly else period
+                if created <= day <= self.today:
+                    dates.append(day)
+            completed = self.random.random() < (keep_going if completed else resume)
+            period += timedelta(days=7 if weekly else 1)
+        return dates
+
+    def _create_completions(self, habits):
+        """Completions plus streak state; returns {user_id: {category: completions}}"""
+        totals = {}
+        streaks = []
+        batch = []
+        for habit in habits:
+            dates = self._completion_dates(habit)
+            batch.extend(HabitCompletion(habit=habit, completed_at=day) for day in dates)
+            if len(batch) >= self.batch_size:
+                self._bulk_create(HabitCompletion, batch)
+                batch = []
+
+            streak = HabitStreak(habit=habit, **HabitStreak.calculate(dates, habit.frequency))
+            streaks.append(streak)
+            habit.streak_state = streak
+            by_category = totals.setdefault(habit.user_id, {})
+            by_category[habit.category] = by_category.get(habit.category, 0) + len(dates)
+
+        self._bulk_create(HabitCompletion, batch)
+        self._bulk_create(HabitStreak, streaks)
+        return totals
+
+    def _create_friendships(self, users):
+        """Returns the ids of users with an accepted friendship"""
+        pairs = set()
+        friendships = []
+        for index, user in enumerate(users):
+            picks = self.random.sample(range(len(users)), min(self.friends_per_user + 1, len(users)))
+            for other in [users[pick] for pick in picks if pick != index][:self.friends_per_user]:
+                pair = frozenset((user.pk, other.pk))
+                if pair in pairs:
+                    continue
+                pairs.add(pair)
+                status = self.random.choices(list(FRIENDSHIP_WEIGHTS), FRIENDSHIP_WEIGHTS.values())[0]
+                friendships.append(Friendship(
+                    sender=user, receiver=other, status=status,
+                    rejected_by=other if status == 'declined' else None,
+                ))
+        self._bulk_create(Friendship, friendships)
+        return {
+            user_id
+            for friendship in friendships if friendship.status == 'accepted'
+            for user_id in (friendship.sender_id, friendship.receiver_id)
+        }
+
+    def _create_applications(self, users):
+        applications = []
+        for user in users:
+            for _ in range(self.applications_per_user):
+                applications.append(Application(
+                    user=user,
+                    company=self.random.choice(COMPANIES),
+                    title=self.random.choice(TITLES),
+                    status=self.random.choices(list(STATUS_WEIGHTS), STATUS_WEIGHTS.values())[0],
+                    due=self.today + timedelta(days=self.random.randint(-60, 60)),
+                ))
+        applications = self._bulk_create(Application, applications)
+
+        history = []
+        for application in applications:
+            old_status = 'wishlist'
+            for new_status in STATUS_PATHS[application.status]:
+                history.append(StatusChange(
+                    application=application, old_status=old_status, new_status=new_status
+                ))
+                old_status = new_status
+        self._bulk_create(StatusChange, history)
+        return applications
+
+    def _create_books(self, users):
+        books = []
+        for user in users:
+            for number in range(self.books_per_user):
+                status = self.random.choice([status for status, _ in Book.STATUS_CHOICES])
+                started = finished = None
+                if status != 'TBR':
+                    started = self.today - timedelta(days=self.random.randint(0, self.days - 1))
+                if status in ('CMP', 'DNF'):
+                    finished = min(started + timedelta(days=self.random.randint(1, 60)), self.today)
+                books.append(Book(
+                    user=user,
+                    title=f'Book {number + 1}',
+                    author=self.random.choice(['A. Author', 'B. Writer', 'C. Novelist']),
+                    pages=self.random.randint(120, 800),
+                    genre=self.random.choice([genre for genre, _ in Book.GENRE_CHOICES]),
+                    status=status,
+                    date_started=started,
+                    date_finished=finished,
+                    rating=self.random.randint(1, 5) if status == 'CMP' else None,
+                ))
+        self._bulk_create(Book, books)
+
+    def _create_nutrition(self, users):
+        foods = []
+        weights = []
+        # Weight.date is unique across all users, so each date can only be used once
+        taken = set(Weight.objects.filter(
+            date__gt=self.today - timedelta(days=self.food_days)
+        ).values_list('date', flat=True))
+        for user in users:
+            weight = self.random.randint(120, 220)
+            for offset in range(self.food_days):
+                day = self.today - timedelta(days=offset)
+                for _ in range(3):
+                    foods.append(Food(
+                        user=user, date=day, name=self.random.choice(FOODS),
+                        calories=self.random.randint(200, 900),
+                        protein=self.random.randint(5, 60),
+                        carbs=self.random.randint(10, 120),
+                    ))
+                if len(foods) >= self.batch_size:
+                    self._bulk_create(Food, foods)
+                    foods = []
+                if offset % 7 == 0:
+                    weight += self.random.randint(-2, 2)
+                    if day not in taken:
+                        taken.add(day)
+                        weights.append(Weight(user=user, date=day, weight=weight))
+        self._bulk_create(Food, foods)
+        self._bulk_create(Weight, weights)
+
+    def _create_counters(self, users, totals, applications):
+        statuses = {}
+        for application in applications:
+            by_status = statuses.setdefault(application.user_id, {})
+            by_status[application.status] = by_status.get(application.status, 0) + 1
+
+        counters = []
+        for user in users:
+            completions = totals.get(user.pk, {})
+            counter = UserCounter(user=user, total_completions=sum(completions.values()))
+            for category in UserCounter.COMPLETION_CATEGORIES:
+                setattr(counter, UserCounter.completion_field(category), completions.get(category, 0))
+            for status in UserCounter.APPLICATION_STATUSES:
+                setattr(counter, UserCounter.application_field(status), statuses.get(user.pk, {}).get(status, 0))
+            counters.append(counter)
+        # bulk_create skipped the post_save receiver that normally creates these
+        self._bulk_create(UserCounter, counters)
+        return {counter.user_id: counter for counter in counters}
+
+    def _award_badges(self, habits, totals, accepted, applications, counters):
+        """Evaluate the event badge rules against the generated history"""
+        earned = set()
+
+        def award(user_id, event, facts):
+            earned.update((user_id, rule.badge_type) for rule in rules_for(event) if rule.condition(facts))
+
+        for habit in habits:
+            award(habit.user_id, COMPLETION_ADDED, {
+                'total_completions': sum(totals.get(habit.user_id, {}).values()),
+                'category': habit.category,
+                # Badges are permanent, so any run in the history would have earned one
+                'daily_streak': habit.streak_state.longest_streak if habit.frequency == 'daily' else 0,
+            })
+        for user_id in accepted:
+            award(user_id, FRIENDSHIP_ACCEPTED, {})
+        for application in applications:
+            counter = counters[application.user_id]
+            award(application.user_id, APPLICATION_STATUS_CHANGED, {
+                'total_applications': counter.total_applications,
+                'applied_applications': counter.applied_applications,
+                'status': application.status,
+                'due': application.due,
+                'today': self.today,
+            })
+
+        self._bulk_create(Badge, [
+            Badge(user_id=user_id, badge_type=badge_type) for user_id, badge_type in sorted(earned)
+        ])
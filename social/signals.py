@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from habits.models import Habit, HabitCompletion
+from habits.services.habits.habit_service import completions_changed, completions_imported
+from momentum.signals import deleted_directly
+from .models import Badge, Friendship, UserCounter
+from .services.badges.badge_memo import forget_highest_badges
+from .services.badges.badge_rules import COMPLETION_ADDED, FRIENDSHIP_ACCEPTED
+from .services.badges.badge_service import BadgeService, badges_awarded
+from .services.counters.counter_service import CounterService
+from .services.leaderboard.leaderboard_service import LeaderboardService
+from .services.monitoring.metrics import BADGES_AWARDED
+
+LEADERBOARD_HABIT_FIELDS = {'category', 'frequency', 'created_at'}
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_counter(instance, created, raw=False, **kwargs):
+    """Start every new user with an empty counters row"""
+    if created and not raw:
+        UserCounter.objects.create(user=instance)
+
+@receiver(post_save, sender=HabitCompletion)
+def count_completion(instance, created, **kwargs):
+    """Count a new completion towards the owner's totals"""
+    if created:
+        habit = instance.habit
+        CounterService.add_completion(habit.user_id, habit.category)
+
+@receiver(post_delete, sender=HabitCompletion)
+def uncount_completion(instance, origin=None, **kwargs):
+    """Uncount a removed completion unless its habit or user is being deleted"""
+    if deleted_directly(origin, HabitCompletion):
+        habit = instance.habit
+        CounterService.add_completion(habit.user_id, habit.category, -1)
+
+@receiver(post_save, sender=HabitCompletion)
+def update_leaderboard_on_completion(instance, created, **kwargs):
+    """Count a new completion in the owner's leaderboard entries"""
+    if created:
+        LeaderboardService().record_completion(instance.habit, 1)
+    else:
+        LeaderboardService().refresh_users([instance.habit.user_id])
+
+@receiver(post_delete, sender=HabitCompletion)
+def update_leaderboard_on_removal(instance, origin=None, **kwargs):
+    """Uncount a removed completion unless its habit or user is being deleted"""
+    if deleted_directly(origin, HabitCompletion):
+        LeaderboardService().record_completion(instance.habit, -1)
+
+@receiver(post_save, sender=Habit)
+def refresh_leaderboard_for_habit(instance, created, update_fields=None, **kwargs):
+    """Rebuild the owner's entries and counters when a habit is added or re-categorised"""
+    if created or LEADERBOARD_HABIT_FIELDS & instance.changed_fields(update_fields):
+        if not created:
+            CounterService.rebuild(instance.user_id)
+        LeaderboardService().refresh_users([instance.user_id])
+
+@receiver(post_delete, sender=Habit)
+def refresh_leaderboard_on_habit_removal(instance, origin=None, **kwargs):
+    """Rebuild the owner's entries and counters when a habit is deleted, but not when the user is"""
+    if deleted_directly(origin, Habit):
+        CounterService.rebuild(instance.user_id)
+        LeaderboardService().refresh_users([instance.user_id])
+
+@receiver(post_save, sender=HabitCompletion)
+def award_completion_badges(instance, created, **kwargs):
+    """Evaluate completion and streak badges for the habit's owner"""
+    if created:
+        habit = instance.habit
+        BadgeService(habit.user).handle_event(COMPLETION_ADDED, habit=habit)
+
+@receiver(completions_changed)
+def update_social_state_for_bulk_update(user, habits, added, removed, **kwargs):
+    """Apply a bulk completion update to counters, the leaderboard and badges once"""
+    category_deltas = {}
+    for habit, _ in added:
+        category_deltas[habit.category] = category_deltas.get(habit.category, 0) + 1
+    for habit, _ in removed:
+        category_deltas[habit.category] = category_deltas.get(habit.category, 0) - 1
+    CounterService.add_completions(user.pk, category_deltas)
+    LeaderboardService().refresh_users([user.pk])
+    if added:
+        completed = {habit.pk: habit for habit, _ in added}
+        BadgeService(user).handle_completions(completed.values())
+
+@receiver(completions_imported)
+def rebuild_social_state_after_import(user, habits, **kwargs):
+    """Recount, re-rank and evaluate completion badges once after an import"""
+    CounterService.rebuild(user.pk)
+    LeaderboardService().refresh_users([user.pk])
+    BadgeService(user).handle_completions(habits)
+
+@receiver(post_save, sender=Friendship)
+def award_friendship_badges(instance, **kwargs):
+    """Evaluate social badges for both users once a friendship is accepted"""
+    if instance.status == 'accepted':
+        for user in (instance.sender, instance.receiver):
+            BadgeService(user).handle_event(FRIENDSHIP_ACCEPTED)
+
+@receiver(post_save, sender=Badge)
+def update_leaderboard_badge_count(instance, created, **kwargs):
+    """Keep the leaderboard badge count in step with awarded badges"""
+    if created:
+        forget_highest_badges(instance.user_id)
+        LeaderboardService().refresh_badge_count(instance.user_id)
+
+@receiver(badges_awarded)
+def update_leaderboard_for_awarded_badges(user_id, **kwargs):
+    """Bulk awards skip post_save, so refresh badge counts here"""
+    forget_highest_badges(user_id)
+    LeaderboardService().refresh_badge_count(user_id)
+
+@receiver(post_save, sender=Badge)
+def count_created_badge(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        BADGES_AWARDED.inc(badge_type=instance.badge_type)
+
+@receiver(badges_awarded)
+def count_awarded_badges(badge_types, **kwargs):
+    for badge_type in badge_types:
+        BADGES_AWARDED.inc(badge_type=badge_type)
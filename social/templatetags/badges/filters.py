@@ -1,10 +1,9 @@
 from django import template
-from social.models import Badge
-from django.db.models import Q
+from social.services.badges.badge_memo import get_highest_badges
 
 register = template.Library()
 
 @register.filter
 def get_user_badges(user):
     """Get the highest badges for a user"""
-    return Badge.get_user_highest_badges(user)
+    return get_highest_badges([user])[user.pk]
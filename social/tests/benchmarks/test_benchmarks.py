@@ -0,0 +1,18 @@
+import json
+import os
+import pytest
+from django.test import TestCase
+from social.services.benchmarks.benchmark_service import CASES, BenchmarkService
+
+@pytest.mark.benchmark
+class TestBenchmarks(TestCase):
+    """Full benchmark run: pytest -m benchmark [BENCHMARK_OUTPUT=results.json]"""
+
+    def test_benchmarks(self):
+        run = BenchmarkService().run()
+        self.assertEqual(set(run['results']), set(CASES))
+
+        output = os.environ.get('BENCHMARK_OUTPUT')
+        if output:
+            with open(output, 'w') as file:
+                json.dump(run, file, indent=2, sort_keys=True)
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from social.services.monitoring.query_budget import get_query_budget
+from social.services.seeding.seed_service import SeedService
+
+class TestQueryBudgets(TestCase):
+    """Budgeted views stay within budget, and their query counts don't grow with the data"""
+
+    def query_counts(self, prefix, **options):
+        SeedService(prefix=prefix, years=0.3, applications=5, books=3, food_days=10, **options).run()
+        user = get_user_model().objects.get(username=f'{prefix}000000')
+        habit = user.habits.order_by('pk').first()
+        self.client.force_login(user)
+
+        counts = {}
+        for name, kwargs in [
+            ('habits:habit_list', {}),
+            ('habits:habit_detail', {'pk': habit.pk}),
+            ('habits:habit_calendar', {'pk': habit.pk}),
+            ('habits:user_calendar', {}),
+            ('habits:habit_trends', {}),
+            ('social:dashboard', {'username': user.username}),
+            ('social:friends_list', {}),
+            ('social:leaderboard', {}),
+            ('nutrition:food_list', {}),
+            ('applications:application_list', {}),
+            ('books:book_list', {}),
+        ]:
+            for cache in caches.all():
+                cache.clear()
+            # Strict budgets make the request raise if it goes over
+            response = self.client.get(reverse(name, kwargs=kwargs))
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(get_query_budget(response.resolver_match.func), name)
+            counts[name] = response.wsgi_request.query_stats.count
+        return counts
+
+    def test_query_counts_do_not_grow_with_data(self):
+        small = self.query_counts('small', users=2, habits=1, friends=1)
+        large = self.query_counts('large', users=8, habits=12, friends=6)
+        self.assertEqual(small, large)
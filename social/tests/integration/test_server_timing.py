@@ -0,0 +1,49 @@
+import json
+import re
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from habits.models import Habit
+
+def timings(header):
+    return {name: float(duration) for name, duration in re.findall(r'(\w+);dur=([\d.]+)', header)}
+
+@override_settings(SERVER_TIMING=True)
+class TestServerTiming(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="testuser", password="testpass123")
+        Habit.objects.create(user=self.user, name="Run", category="health")
+        self.client.force_login(self.user)
+
+    def test_response_has_server_timing(self):
+        response = self.client.get(reverse('social:dashboard', args=[self.user.username]))
+
+        header = response['Server-Timing']
+        durations = timings(header)
+        self.assertEqual(set(durations), {'db', 'template', 'view', 'total'})
+        self.assertGreater(durations['template'], 0)
+        self.assertIn(f'desc="{response.wsgi_request.query_stats.count} queries"', header)
+        self.assertAlmostEqual(
+            durations['db'] + durations['template'] + durations['view'], durations['total'], delta=0.5
+        )
+
+    def test_timing_is_logged(self):
+        with self.assertLogs('social.services.monitoring.profiling', 'INFO') as logs:
+            self.client.get(reverse('habits:habit_list'))
+
+        line = json.loads(logs.records[0].getMessage().removeprefix('request timing '))
+        self.assertEqual(line['view'], 'habits:habit_list')
+        self.assertEqual(line['status'], 200)
+        self.assertGreater(line['queries'], 0)
+        self.assertEqual(set(line), {
+            'method', 'path', 'view', 'status', 'queries', 'db_ms', 'template_ms', 'view_ms', 'total_ms'
+        })
+
+    def test_json_views_have_no_template_time(self):
+        response = self.client.get(reverse('habits:habit_trends'))
+        self.assertEqual(timings(response['Server-Timing'])['template'], 0)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse('habits:habit_list'))
+        self.assertFalse(response.has_header('Server-Timing'))
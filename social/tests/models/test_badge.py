@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth import get_user_model
+from social.models import Badge
+from social.services.badges.badge_memo import badge_memo, get_highest_badges
+
+class TestBadgeModel(TestCase):
+    def setUp(self):
+        self.user1 = get_user_model().objects.create_user(
+            username='user1', password='testpass123'
+        )
+        self.user2 = get_user_model().objects.create_user(
+            username='user2', password='testpass123'
+        )
+        for badge_type in ['health_7_day', 'health_30_day', 'completions_10', 'first_friend']:
+            Badge.objects.create(user=self.user1, badge_type=badge_type)
+        Badge.objects.create(user=self.user2, badge_type='completions_50')
+
+    def test_highest_badges_for_one_user(self):
+        badges = Badge.get_user_highest_badges(self.user1)
+        self.assertEqual(badges['health'], 'health_30_day')
+        self.assertEqual(badges['completions'], 'completions_10')
+        self.assertEqual(badges['friend'], 'first_friend')
+        self.assertIsNone(badges['learning'])
+
+    def test_bulk_lookup_uses_one_query(self):
+        user3 = get_user_model().objects.create_user(username='user3', password='testpass123')
+
+        with CaptureQueriesContext(connection) as context:
+            badges = Badge.get_users_highest_badges([self.user1, self.user2, user3])
+        self.assertEqual(len(context.captured_queries), 1)
+
+        self.assertEqual(badges[self.user1.pk], Badge.get_user_highest_badges(self.user1))
+        self.assertEqual(badges[self.user2.pk]['completions'], 'completions_50')
+        self.assertTrue(all(badge is None for badge in badges[user3.pk].values()))
+
+    def test_memo_fetches_each_user_once(self):
+        with badge_memo():
+            with CaptureQueriesContext(connection) as context:
+                get_highest_badges([self.user1])
+                get_highest_badges([self.user1, self.user2])
+                badges = get_highest_badges([self.user2.pk, self.user1.pk])
+            self.assertEqual(len(context.captured_queries), 2)
+            self.assertEqual(badges[self.user1.pk]['health'], 'health_30_day')
+
+            # Awarding a badge drops the stale lookup
+            Badge.objects.create(user=self.user2, badge_type='completions_100')
+            self.assertEqual(get_highest_badges([self.user2])[self.user2.pk]['completions'], 'completions_100')
@@ -441,3 +441,87 @@ class TestBadgeService(TestCase):
                 badge_type='applied_5'
             ).exists()
         )
+
+    def test_completion_event_awards_badges(self):
+        habit = Habit.objects.create(
+            user=self.user, name="Exercise", frequency="daily", category="health"
+        )
+
+        # Completions publish completion_added, so no explicit check is needed
+        for i in range(10):
+            HabitCompletion.objects.create(
+                habit=habit, completed_at=self.today - timedelta(days=i)
+            )
+
+        badge_types = set(Badge.objects.filter(user=self.user).values_list('badge_type', flat=True))
+        self.assertEqual(badge_types, {'completions_10', 'health_7_day'})
+
+    def test_completion_event_query_count_is_constant(self):
+        habit = Habit.objects.create(
+            user=self.user, name="Exercise", frequency="daily", category="health"
+        )
+        for i in range(1, 60):
+            HabitCompletion.objects.create(
+                habit=habit, completed_at=self.today - timedelta(days=i)
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            awarded = self.service.handle_event('completion_added', habit=habit)
+        self.assertEqual(awarded, [])
+        # Load facts, then look up which earned badges already exist
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_award_badges_inserts_once(self):
+        with CaptureQueriesContext(connection) as context:
+            awarded = self.service.award_badges(['completions_10', 'completions_50'])
+        self.assertEqual(awarded, ['completions_10', 'completions_50'])
+
+        # Existing badges are skipped and nothing is inserted
+        self.assertEqual(self.service.award_badges(['completions_10']), [])
+        self.assertEqual(Badge.objects.filter(user=self.user).count(), 2)
+        self.assertLessEqual(len(context.captured_queries), 4)
+
+    def test_application_and_contact_events(self):
+        application = Application.objects.create(
+            user=self.user, company="Company", title="Position", status="applied"
+        )
+        self.assertFalse(Badge.objects.filter(user=self.user, badge_type='job_offered').exists())
+
+        application.status = 'offered'
+        application.save()
+        self.assertTrue(Badge.objects.filter(user=self.user, badge_type='job_offered').exists())
+
+        Contact.objects.create(user=self.user, name="Recruiter")
+        self.assertTrue(Badge.objects.filter(user=self.user, badge_type='first_contact').exists())
+
+    def test_friendship_event_awards_both_users(self):
+        friend = get_user_model().objects.create_user(username="friend", password="testpass123")
+        friendship = Friendship.objects.create(sender=self.user, receiver=friend)
+        self.assertFalse(Badge.objects.filter(badge_type='first_friend').exists())
+
+        friendship.status = 'accepted'
+        friendship.save()
+        self.assertEqual(Badge.objects.filter(badge_type='first_friend').count(), 2)
+
+    def test_expired_wishlist_batch_job(self):
+        other_user = get_user_model().objects.create_user(username="otheruser", password="testpass123")
+        long_expired_user = get_user_model().objects.create_user(username="olduser", password="testpass123")
+        # Wishlist items that are saved before they fall due don't earn the badge yet
+        for user, due in [
+            (self.user, self.today + timedelta(days=1)),
+            (other_user, self.today + timedelta(days=3)),
+            (long_expired_user, self.today + timedelta(days=5)),
+        ]:
+            Application.objects.create(user=user, company="Company", title="Position", status="wishlist", due=due)
+
+        tomorrow = self.today + timedelta(days=2)
+        self.assertEqual(BadgeService.award_expired_wishlist_badges(today=tomorrow), 1)
+        self.assertEqual(
+            list(Badge.objects.filter(badge_type='wishlist_expired').values_list('user', flat=True)),
+            [self.user.pk]
+        )
+
+        # Already-awarded users are skipped; a wider window catches up on missed days
+        later = self.today + timedelta(days=7)
+        self.assertEqual(BadgeService.award_expired_wishlist_badges(today=later, days=7), 2)
+        self.assertEqual(Badge.objects.filter(badge_type='wishlist_expired').count(), 3)
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from social.services.benchmarks.benchmark_service import CASES, BenchmarkService
+
+def results(**measurements):
+    return {'results': {'HabitListView': {'10': {
+        'median_ms': 10.0, 'min_ms': 9.0, 'queries': 8, 'peak_kib': 100.0, **measurements,
+    }}}}
+
+class TestBenchmarkService(TestCase):
+    def test_run_measures_every_case_and_size(self):
+        run = BenchmarkService(sizes=[1, 2], repeat=1).run()
+
+        self.assertEqual(set(run['results']), set(CASES))
+        for sizes in run['results'].values():
+            self.assertEqual(set(sizes), {'1', '2'})
+            for measurements in sizes.values():
+                self.assertGreater(measurements['median_ms'], 0)
+                self.assertGreater(measurements['queries'], 0)
+                self.assertGreater(measurements['peak_kib'], 0)
+        self.assertEqual(run['meta']['sizes'], [1, 2])
+
+    def test_seeded_data_is_rolled_back(self):
+        BenchmarkService(sizes=[2], repeat=1, cases=['HabitListView']).run()
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_only_the_seeded_users_caches_are_cleared(self):
+        caches['analytics'].set('habit_analytics:other', 'kept')
+        caches['default'].set('session-data', 'kept')
+        seeded_keys = []
+        cache_keys = BenchmarkService._cache_keys
+        with patch.object(BenchmarkService, '_cache_keys',
+                          side_effect=lambda users: seeded_keys.extend(cache_keys(users)) or seeded_keys):
+            BenchmarkService(sizes=[2], repeat=1, cases=['HabitListView']).run()
+
+        self.assertEqual(caches['analytics'].get('habit_analytics:other'), 'kept')
+        self.assertEqual(caches['default'].get('session-data'), 'kept')
+        # Nothing the seeded users cached outlives their rolled back rows
+        self.assertEqual(caches['analytics'].get_many(seeded_keys), {})
+        self.assertTrue(seeded_keys)
+
+    def test_compare_flags_regressions(self):
+        baseline = results()
+        self.assertEqual(BenchmarkService.compare(baseline, results(median_ms=11.0)), [])
+        self.assertEqual(
+            BenchmarkService.compare(baseline, results(median_ms=13.0, queries=9)),
+            [('HabitListView', '10', 'queries', 8, 9), ('HabitListView', '10', 'median_ms', 10.0, 13.0)],
+        )
+        self.assertEqual(BenchmarkService.compare({'results': {}}, results(queries=50)), [])
+
+    def test_benchmark_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            out = StringIO()
+            call_command('benchmark', sizes=[1], repeat=1, cases=['LeaderboardView'], output=output, stdout=out)
+            self.assertIn('LeaderboardView', out.getvalue())
+            with open(output) as file:
+                self.assertEqual(list(json.load(file)['results']), ['LeaderboardView'])
+
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as file:
+                json.dump({'results': {'LeaderboardView': {'1': {
+                    'median_ms': 0.001, 'min_ms': 0.001, 'queries': 0, 'peak_kib': 0.001,
+                }}}}, file)
+            with self.assertRaises(CommandError):
+                call_command('benchmark', sizes=[1], repeat=1, cases=['LeaderboardView'],
+                             compare=baseline, stdout=StringIO(), stderr=StringIO())
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from social.models import UserCounter
+from habits.models import Habit, HabitCompletion
+from applications.models import Application, Contact
+from social.services.counters.counter_service import CounterService
+
+class TestCounterService(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def test_completions_counted_per_category(self):
+        health = Habit.objects.create(user=self.user, name="Run", category="health")
+        learning = Habit.objects.create(user=self.user, name="Read", category="learning")
+        for i in range(3):
+            HabitCompletion.objects.create(habit=health, completed_at=self.today - timedelta(days=i))
+        learning.toggle_completion(self.today)
+        learning.toggle_completion(self.today)
+        learning.toggle_completion(self.today)
+
+        counter = CounterService.get(self.user)
+        self.assertEqual(counter.total_completions, 4)
+        self.assertEqual(counter.completions_in("health"), 3)
+        self.assertEqual(counter.completions_in("learning"), 1)
+
+    def test_habit_changes_recount(self):
+        habit = Habit.objects.create(user=self.user, name="Run", category="health")
+        HabitCompletion.objects.create(habit=habit, completed_at=self.today)
+
+        habit.category = "productivity"
+        habit.save()
+        counter = CounterService.get(self.user)
+        self.assertEqual(counter.health_completions, 0)
+        self.assertEqual(counter.productivity_completions, 1)
+
+        habit.delete()
+        self.assertEqual(CounterService.get(self.user).total_completions, 0)
+
+    def test_applications_counted_by_status(self):
+        application = Application.objects.create(user=self.user, company="A", title="Dev")
+        Application.objects.create(user=self.user, company="B", title="Dev", status="applied")
+
+        application.status = "offered"
+        application.save()
+        counter = CounterService.get(self.user)
+        self.assertEqual(counter.wishlist_applications, 0)
+        self.assertEqual(counter.applied_applications, 1)
+        self.assertEqual(counter.offered_applications, 1)
+        self.assertEqual(counter.total_applications, 2)
+
+        application.delete()
+        self.assertEqual(CounterService.get(self.user).total_applications, 1)
+
+    def test_contacts_counted(self):
+        contact = Contact.objects.create(user=self.user, name="Recruiter")
+        self.assertEqual(CounterService.get(self.user).contacts, 1)
+        contact.delete()
+        self.assertEqual(CounterService.get(self.user).contacts, 0)
+
+    def test_increment_is_a_single_update(self):
+        CounterService.rebuild(self.user)
+        with CaptureQueriesContext(connection) as context:
+            CounterService.add_completion(self.user.pk, "health")
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_missing_counter_is_rebuilt(self):
+        habit = Habit.objects.create(user=self.user, name="Run", category="health")
+        HabitCompletion.objects.create(habit=habit, completed_at=self.today)
+        UserCounter.objects.filter(user=self.user).delete()
+
+        HabitCompletion.objects.create(habit=habit, completed_at=self.today - timedelta(days=1))
+        self.assertEqual(CounterService.get(self.user).total_completions, 2)
+
+    def test_missing_counter_is_not_saved_on_read(self):
+        habit = Habit.objects.create(user=self.user, name="Run", category="health")
+        HabitCompletion.objects.create(habit=habit, completed_at=self.today)
+        UserCounter.objects.filter(user=self.user).delete()
+
+        with CaptureQueriesContext(connection) as context:
+            counter = CounterService.get(self.user)
+        self.assertEqual(counter.health_completions, 1)
+        self.assertFalse(UserCounter.objects.filter(user=self.user).exists())
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in context.captured_queries))
+
+    def test_rebuild_counters_command_repairs_drift(self):
+        Contact.objects.create(user=self.user, name="Recruiter")
+        UserCounter.objects.filter(user=self.user).update(contacts=9, total_completions=4)
+
+        out = StringIO()
+        call_command("rebuild_counters", stdout=out)
+
+        counter = CounterService.get(self.user)
+        self.assertEqual(counter.contacts, 1)
+        self.assertEqual(counter.total_completions, 0)
+        self.assertIn("1 user", out.getvalue())
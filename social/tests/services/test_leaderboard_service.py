@@ -0,0 +1,159 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from social.models import Badge, LeaderboardEntry
+from habits.models import Habit, HabitCompletion
+from social.services.leaderboard.leaderboard_service import LeaderboardService
+
+class TestLeaderboardService(TestCase):
+    def setUp(self):
+        self.today = timezone.localtime(timezone.now()).date()
+
+    def create_user(self, username, habits):
+        """habits is a list of (category, frequency, days_ago) tuples"""
+        user = get_user_model().objects.create_user(username=username, password="testpass123")
+        for i, (category, frequency, days_ago) in enumerate(habits):
+            habit = Habit.objects.create(
+                user=user, name=f"Habit {i}", frequency=frequency, category=category,
+                created_at=timezone.now() - timedelta(days=29)
+            )
+            for ago in days_ago:
+                HabitCompletion.objects.create(habit=habit, completed_at=self.today - timedelta(days=ago))
+        return user
+
+    def expected_row(self, user, category='all'):
+        """The per-user calculation the leaderboard used to run in a loop"""
+        habits = user.habits.all()
+        if category != 'all':
+            habits = habits.filter(category=category)
+        total_completions = sum(habit.completions.count() for habit in habits)
+        total_possible = sum(habit.get_total_possible_completions() for habit in habits)
+        badges = Badge.get_user_highest_badges(user)
+        return {
+            'total_completions': total_completions,
+            'completion_rate': total_completions / total_possible * 100,
+            'current_streak': max((habit.current_streak() for habit in habits), default=0),
+            'total_habits': habits.count(),
+            'badges': badges,
+            'badge_count': sum(1 for badge in badges.values() if badge is not None),
+        }
+
+    def test_rows_match_per_user_calculation(self):
+        alice = self.create_user("alice", [
+            ("health", "daily", [0, 1, 2, 3]),
+            ("learning", "weekly", [0, 7]),
+        ])
+        bob = self.create_user("bob", [("health", "daily", [1, 2, 5])])
+        self.create_user("carol", [])
+        Badge.objects.create(user=alice, badge_type="health_7_day")
+        Badge.objects.create(user=alice, badge_type="health_30_day")
+        Badge.objects.create(user=bob, badge_type="first_friend")
+
+        for category in ['all', 'health', 'learning']:
+            with self.subTest(category=category):
+                page = LeaderboardService(category).get_page()
+                rows = {row['user'].username: row for row in page.object_list}
+                users = [alice, bob] if category != 'learning' else [alice]
+                self.assertEqual(set(rows), {user.username for user in users})
+                for user in users:
+                    row = rows[user.username]
+                    for key, value in self.expected_row(user, category).items():
+                        self.assertAlmostEqual(row[key], value, msg=key)
+
+    def test_rows_are_ranked_by_rate_then_completions(self):
+        self.create_user("low", [("health", "daily", [0])])
+        self.create_user("high", [("health", "daily", range(10))])
+        self.create_user("higher", [("health", "daily", range(10)), ("health", "daily", range(12))])
+
+        rows = LeaderboardService().get_page().object_list
+        self.assertEqual([row['user'].username for row in rows], ["higher", "high", "low"])
+        self.assertEqual([row['rank'] for row in rows], [1, 2, 3])
+        # Ten-day streaks earn the 7 day health badge through the completion badge rules
+        self.assertEqual(rows[0]['badges']['health'], 'health_7_day')
+        self.assertEqual(rows[2]['badges']['health'], None)
+
+    def test_pagination(self):
+        for i in range(7):
+            self.create_user(f"user{i}", [("health", "daily", range(i))])
+
+        service = LeaderboardService()
+        service.paginate_by = 3
+        page = service.get_page(2)
+
+        self.assertEqual(page.paginator.num_pages, 3)
+        self.assertEqual([row['rank'] for row in page.object_list], [4, 5, 6])
+        self.assertEqual([row['user'].username for row in page.object_list], ["user3", "user2", "user1"])
+
+    def test_query_count_does_not_grow_with_users(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as context:
+                LeaderboardService().get_page()
+            return len(context.captured_queries)
+
+        for i in range(3):
+            self.create_user(f"user{i}", [("health", "daily", [0, 1]), ("learning", "weekly", [0])])
+        few = count_queries()
+
+        for i in range(3, 20):
+            self.create_user(f"user{i}", [("health", "daily", [0, 1]), ("learning", "weekly", [0])])
+        many = count_queries()
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 3)
+
+    def test_toggles_update_entries_incrementally(self):
+        user = self.create_user("toggler", [("health", "daily", [1, 2])])
+        habit = user.habits.get()
+
+        habit.toggle_completion(self.today)
+        entry = LeaderboardEntry.objects.get(user=user, category="health")
+        self.assertEqual(entry.total_completions, 3)
+        self.assertEqual(entry.current_streak, 3)
+        self.assertAlmostEqual(entry.completion_rate, 3 / entry.total_possible * 100)
+
+        habit.toggle_completion(self.today)
+        entry = LeaderboardEntry.objects.get(user=user, category="all")
+        self.assertEqual(entry.total_completions, 2)
+        self.assertEqual(entry.current_streak, 0)
+
+    def test_habit_and_badge_changes_refresh_entries(self):
+        user = self.create_user("changer", [("health", "daily", [0])])
+        habit = user.habits.get()
+
+        habit.category = "learning"
+        habit.save()
+        self.assertEqual(
+            set(LeaderboardEntry.objects.filter(user=user).values_list("category", flat=True)),
+            {"all", "learning"}
+        )
+
+        Badge.objects.create(user=user, badge_type="completions_10")
+        Badge.objects.create(user=user, badge_type="completions_50")
+        self.assertEqual(LeaderboardEntry.objects.get(user=user, category="all").badge_count, 1)
+
+        habit.delete()
+        self.assertFalse(LeaderboardEntry.objects.filter(user=user).exists())
+
+    def test_deleting_user_removes_entries(self):
+        user = self.create_user("leaver", [("health", "daily", [0, 1])])
+        user.delete()
+        self.assertFalse(LeaderboardEntry.objects.exists())
+
+    def test_rebuild_command_repairs_drift(self):
+        user = self.create_user("drifted", [("health", "daily", [0, 1])])
+        LeaderboardEntry.objects.filter(user=user).update(total_completions=99, current_streak=99)
+        LeaderboardEntry.objects.filter(user=user, category="health").delete()
+
+        out = StringIO()
+        call_command("rebuild_leaderboard", stdout=out)
+
+        for category in ["all", "health"]:
+            entry = LeaderboardEntry.objects.get(user=user, category=category)
+            self.assertEqual(entry.total_completions, 2)
+            self.assertEqual(entry.current_streak, 2)
+        self.assertIn("1 user", out.getvalue())
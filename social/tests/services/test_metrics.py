@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from social.services.monitoring import metrics
+from social.services.monitoring.metrics import REGISTRY, Counter, Histogram, exposition
+
+class TestMetrics(SimpleTestCase):
+    def setUp(self):
+        self.registered = list(REGISTRY)
+
+    def tearDown(self):
+        REGISTRY[:] = self.registered
+
+    def test_counter_renders_per_label_set(self):
+        counter = Counter('test_events', 'Events by kind', ('kind',))
+        counter.inc(kind='a')
+        counter.inc(2, kind='b "quoted"')
+
+        self.assertEqual(counter.render(), [
+            '# HELP test_events Events by kind',
+            '# TYPE test_events counter',
+            'test_events_total{kind="a"} 1',
+            'test_events_total{kind="b \\"quoted\\""} 2',
+        ])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('test_latency_seconds', 'Latency', ('view',), (0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, view='home')
+
+        self.assertEqual(histogram.render()[2:], [
+            'test_latency_seconds_bucket{view="home",le="0.1"} 1',
+            'test_latency_seconds_bucket{view="home",le="1"} 3',
+            'test_latency_seconds_bucket{view="home",le="+Inf"} 4',
+            'test_latency_seconds_sum{view="home"} 4.25',
+            'test_latency_seconds_count{view="home"} 4',
+        ])
+        self.assertEqual(histogram.count(view='home'), 4)
+
+    def test_labels_must_match(self):
+        counter = Counter('test_checked', 'Checked', ('kind',))
+        with self.assertRaises(ValueError):
+            counter.inc(other='a')
+
+    def test_exposition_includes_every_metric(self):
+        Counter('test_exposed', 'Exposed').inc()
+        text = exposition()
+        self.assertIn('test_exposed_total 1\n', text)
+        self.assertIn('# TYPE momentum_http_request_duration_seconds histogram', text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_exposition_sums_the_processes_sharing_a_directory(self):
+        counter = Counter('test_shared', 'Shared', ('kind',))
+        histogram = Histogram('test_shared_seconds', 'Shared latency', (), (1,))
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            # Another worker's file, including a metric this process has not touched
+            with open(os.path.join(directory, '1-other.json'), 'w') as file:
+                json.dump({
+                    'test_shared': [[['a'], 2], [['b'], 5]],
+                    'test_shared_seconds': [[[], [[1, 1], 3.5]]],
+                }, file)
+            counter.inc(kind='a')
+            histogram.observe(0.5)
+
+            text = exposition()
+            self.assertIn('test_shared_total{kind="a"} 3\n', text)
+            self.assertIn('test_shared_total{kind="b"} 5\n', text)
+            self.assertIn('test_shared_seconds_bucket{le="1"} 2\n', text)
+            self.assertIn('test_shared_seconds_count 3\n', text)
+            self.assertIn('test_shared_seconds_sum 4\n', text)
+            # This process's own values were written alongside
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.json')]), 2)
+        metrics._STORE = None
+
+    def test_exited_processes_are_folded_into_one_file(self):
+        counter = Counter('test_restarts', 'Restarts', ('kind',))
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            for name, value in ((f'{exited.pid}-a.json', 2), (f'{exited.pid}-b.json', 3)):
+                with open(os.path.join(directory, name), 'w') as file:
+                    json.dump({'test_restarts': [[['a'], value]]}, file)
+            counter.inc(kind='a')
+
+            for _ in range(2):
+                self.assertIn('test_restarts_total{kind="a"} 6\n', exposition())
+            self.assertEqual(
+                {name for name in os.listdir(directory) if name.endswith('.json')},
+                {'exited.json', os.path.basename(metrics._STORE._own_path())},
+            )
+        metrics._STORE = None
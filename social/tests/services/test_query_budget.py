@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.views.generic import View
+from social.middleware import QueryBudgetMiddleware
+from social.services.monitoring.query_budget import (
+    QueryBudgetExceeded, fingerprint, get_query_budget, query_budget
+)
+
+def run_queries(count):
+    def get_response(request):
+        for _ in range(count):
+            list(get_user_model().objects.filter(pk__in=[1, 2, 3]))
+        return HttpResponse()
+    return get_response
+
+@query_budget(2)
+def budgeted_view(request):
+    return HttpResponse()
+
+@query_budget(3)
+class BudgetedView(View):
+    pass
+
+class TestQueryBudget(TestCase):
+    def request(self, count, view=budgeted_view):
+        request = RequestFactory().get('/')
+        middleware = QueryBudgetMiddleware(run_queries(count))
+        middleware.process_view(request, view, (), {})
+        return request, middleware
+
+    def test_budget_is_read_from_functions_and_classes(self):
+        self.assertEqual(get_query_budget(budgeted_view), 2)
+        self.assertEqual(get_query_budget(BudgetedView.as_view()), 3)
+        self.assertIsNone(get_query_budget(View.as_view()))
+
+    def test_fingerprint_collapses_literals(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t"\n  WHERE "id" IN (%s, %s, %s) AND "n" = 5 AND "s" = \'x\''),
+            'SELECT * FROM "t" WHERE "id" IN (...) AND "n" = %s AND "s" = %s',
+        )
+        self.assertEqual(fingerprint('SELECT 1 WHERE "id" IN (%s)'), fingerprint('SELECT 2 WHERE "id" IN (%s, %s)'))
+
+    def test_stats_are_recorded(self):
+        request, middleware = self.request(2)
+        middleware(request)
+        self.assertEqual(request.query_stats.count, 2)
+        self.assertGreater(request.query_stats.seconds, 0)
+        self.assertEqual(sum(request.query_stats.fingerprints.values()), 2)
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises_over_budget(self):
+        request, middleware = self.request(3)
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'budgeted_view ran 3 queries'):
+            middleware(request)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logs_fingerprints(self):
+        request, middleware = self.request(3)
+        with self.assertLogs('social.services.monitoring.query_budget', 'WARNING') as logs:
+            middleware(request)
+        self.assertIn('over its budget of 2', logs.output[0])
+        self.assertIn('3x SELECT', logs.output[0])
+
+    def test_unbudgeted_views_are_not_checked(self):
+        request, middleware = self.request(3, View.as_view())
+        with self.assertNoLogs('social.services.monitoring.query_budget'):
+            middleware(request)
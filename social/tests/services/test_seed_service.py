@@ -0,0 +1,73 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from habits.models import Habit, HabitCompletion, HabitStreak
+from habits.services.analytics.rollup_service import RollupService
+from habits.services.habits.streak_service import StreakService
+from applications.models import Application
+from social.models import Badge, LeaderboardEntry, UserCounter
+from social.services.counters.counter_service import CounterService
+from social.services.seeding.seed_service import SeedService
+
+class TestSeedService(TestCase):
+    options = dict(users=5, habits=3, years=0.5, friends=2, applications=4, books=2, food_days=14)
+
+    def seed(self, prefix, seed=1):
+        return SeedService(prefix=prefix, seed=seed, batch_size=100, **self.options).run()
+
+    def completions(self, prefix):
+        return [
+            (username[len(prefix):], name, completed_at)
+            for username, name, completed_at in HabitCompletion.objects
+            .filter(habit__user__username__startswith=prefix)
+            .order_by('habit__user__username', 'habit_id', 'completed_at')
+            .values_list('habit__user__username', 'habit__name', 'completed_at')
+        ]
+
+    def test_seed_creates_dataset(self):
+        counts = self.seed('a')
+
+        self.assertEqual(counts['users'], 5)
+        self.assertEqual(counts['habits'], 15)
+        self.assertEqual(counts['applications'], 20)
+        self.assertEqual(counts['habit completions'], HabitCompletion.objects.count())
+        self.assertGreater(counts['habit completions'], 0)
+        self.assertEqual(Application.objects.count(), 20)
+        self.assertEqual(LeaderboardEntry.objects.filter(category='all').count(), 5)
+
+    def test_same_seed_gives_same_data(self):
+        self.seed('a', seed=7)
+        self.seed('b', seed=7)
+        self.seed('c', seed=8)
+        self.assertEqual(self.completions('a'), self.completions('b'))
+        self.assertNotEqual(self.completions('a'), self.completions('c'))
+
+    def test_derived_state_matches_rebuilds(self):
+        self.seed('a')
+        users = get_user_model().objects.filter(username__startswith='a')
+
+        streaks = sorted(HabitStreak.objects.values_list('habit_id', 'current_streak', 'longest_streak'))
+        for habit in Habit.objects.all():
+            StreakService.rebuild(habit)
+        self.assertEqual(streaks, sorted(HabitStreak.objects.values_list('habit_id', 'current_streak', 'longest_streak')))
+
+        counters = sorted(UserCounter.objects.values_list('user_id', 'total_completions', 'applied_applications'))
+        CounterService.rebuild_all(users)
+        self.assertEqual(counters, sorted(UserCounter.objects.values_list('user_id', 'total_completions', 'applied_applications')))
+
+        for user in users:
+            self.assertEqual(RollupService.total(user), CounterService.get(user).total_completions)
+
+        badge_users = set(Badge.objects.filter(badge_type='completions_10').values_list('user_id', flat=True))
+        self.assertEqual(badge_users, set(UserCounter.objects.filter(total_completions__gte=10).values_list('user_id', flat=True)))
+
+    def test_seed_load_command(self):
+        out = StringIO()
+        call_command('seed_load', users=2, habits=1, years=0.1, applications=1, books=1, food_days=7, stdout=out)
+        self.assertIn("users: 2", out.getvalue())
+        self.assertIn("Seeded", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('seed_load', users=1, stdout=StringIO())
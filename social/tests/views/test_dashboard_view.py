@@ -35,6 +35,19 @@ class TestDashboardView(TestCase):
         self.assertTrue(response.context["is_own_profile"])
         self.assertEqual(response.context["viewed_user"], self.user)
 
+    def test_dashboard_view_is_read_only(self):
+        # Badge checks run in events and scheduled jobs, not on dashboard views
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("social:dashboard", kwargs={"username": self.user.username})
+            )
+        self.assertEqual(response.status_code, 200)
+        writes = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        self.assertEqual(writes, [])
+
     def test_dashboard_view_unauthenticated(self):
         # Test that unauthenticated users are redirected to login
         self.client.logout()
@@ -172,6 +185,21 @@ class TestDashboardView(TestCase):
             # Should only need a few queries to get all the data
             self.assertLess(len(context.captured_queries), 5)
 
+    def test_repeat_dashboard_views_use_cached_analytics(self):
+        habit = Habit.objects.create(user=self.user, name="Cached Habit", category="health")
+        url = reverse("social:dashboard", kwargs={"username": self.user.username})
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertFalse(any("habits_habit" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(response.context["habit_analytics"]["total_habits"], 1)
+
+        # Completing a habit invalidates the snapshot
+        habit.toggle_completion()
+        response = self.client.get(url)
+        self.assertEqual(response.context["habit_analytics"]["this_week_completions"], 1)
+
     def tearDown(self):
         self.patcher.stop()
 
@@ -54,3 +54,19 @@ class TestLeaderboardView(TestCase):
         response = self.client.get(reverse("social:leaderboard"))
         self.assertEqual(response.status_code, 302)
         self.assertIn("/accounts/login/", response.url)
+
+    def test_leaderboard_pagination(self):
+        for i in range(30):
+            user = get_user_model().objects.create_user(
+                username=f"paged{i:02d}", password="testpass123"
+            )
+            Habit.objects.create(user=user, name="Test Habit", frequency="daily", category="health")
+
+        response = self.client.get(reverse("social:leaderboard"))
+        self.assertTrue(response.context["is_paginated"])
+        self.assertEqual(len(response.context["leaderboard_data"]), 25)
+        self.assertContains(response, "Page 1 of 2")
+
+        response = self.client.get(reverse("social:leaderboard") + "?page=2")
+        self.assertEqual(len(response.context["leaderboard_data"]), 5)
+        self.assertEqual(response.context["leaderboard_data"][0]["rank"], 26)
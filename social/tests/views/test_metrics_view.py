@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from social.models import Badge
+from social.services.badges.badge_service import BadgeService
+from social.services.monitoring.metrics import BADGES_AWARDED, REQUEST_DURATION, REQUEST_QUERIES, REQUESTS
+
+@override_settings(METRICS_TOKEN='secret')
+class TestMetricsView(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="testuser", password="testpass123")
+        self.url = reverse('social:metrics')
+
+    def test_requires_token_or_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_no_token_configured_means_staff_only(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def test_token_scrape_returns_prometheus_text(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        for name in (
+            'momentum_http_request_duration_seconds', 'momentum_http_request_queries',
+            'momentum_ai_summary_duration_seconds', 'momentum_badges_awarded',
+        ):
+            self.assertIn(f'# TYPE {name} ', body)
+
+    def test_requests_are_recorded_by_url_name(self):
+        self.client.force_login(self.user)
+        requests = REQUEST_DURATION.count(view='habits:habit_list', method='GET')
+        ok = REQUESTS.value(view='habits:habit_list', method='GET', status=200)
+
+        self.client.get(reverse('habits:habit_list'))
+        self.client.get('/no/such/page/')
+
+        self.assertEqual(REQUEST_DURATION.count(view='habits:habit_list', method='GET'), requests + 1)
+        self.assertEqual(REQUESTS.value(view='habits:habit_list', method='GET', status=200), ok + 1)
+        self.assertGreater(REQUEST_QUERIES.count(view='habits:habit_list'), 0)
+        self.assertGreater(REQUESTS.value(view='unmatched', method='GET', status=404), 0)
+
+    def test_badge_awards_are_counted(self):
+        first_friend = BADGES_AWARDED.value(badge_type='first_friend')
+        first_contact = BADGES_AWARDED.value(badge_type='first_contact')
+
+        Badge.objects.create(user=self.user, badge_type='first_friend')
+        BadgeService(self.user).award_badges(['first_contact'])
+
+        self.assertEqual(BADGES_AWARDED.value(badge_type='first_friend'), first_friend + 1)
+        self.assertEqual(BADGES_AWARDED.value(badge_type='first_contact'), first_contact + 1)
@@ -10,6 +10,7 @@ urlpatterns = [
          views.FriendRequestView.as_view(), name='send_friend_request'),
     path('handle-request/<int:friendship_id>/<str:action>/',
          views.HandleFriendRequestView.as_view(), name='handle_friend_request'),
+    path('metrics', views.metrics, name='metrics'),
     path('unfriend/<int:friendship_id>/', views.UnfriendView.as_view(), name='unfriend'),
     path('<str:username>/', views.DashboardView.as_view(), name='dashboard')
 ]
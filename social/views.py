@@ -1,17 +1,23 @@
-from datetime import timedelta
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.shortcuts import render
-from django.db.models import Q, Count, Prefetch, OuterRef, Subquery
+from django.db.models import Q
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.utils import timezone
 from django.views.generic import DetailView, View
-from habits.models import Habit, HabitCompletion, AIHabitSummary
-from social.services.badges.badge_service import BadgeService
+from habits.models import Habit, AIHabitSummary
+from habits.services.analytics.analytics_engine import AnalyticsEngine
+from habits.services.analytics.snapshot_cache import AnalyticsSnapshotCache
+from social.services.leaderboard.leaderboard_service import LeaderboardService
+from social.services.monitoring import metrics as monitoring_metrics
+from social.services.monitoring.query_budget import query_budget
 from social.models import Friendship, Badge
 from applications.models import Application
 
+@query_budget(15)
 class DashboardView(LoginRequiredMixin, DetailView):
     model = get_user_model()
     template_name = 'social/dashboard.html'
@@ -43,15 +49,12 @@ class DashboardView(LoginRequiredMixin, DetailView):
 
         # Only include analytics if viewing own profile or is friend
         if self.request.user == viewed_user or (friendship and friendship.status == 'accepted'):
-            habits = Habit.objects.filter(user=viewed_user).select_related('user').prefetch_related(
-                Prefetch(
-                    'completions',
-                    queryset=HabitCompletion.objects.order_by('-completed_at')
-                )
-            )
+            habits = Habit.objects.filter(user=viewed_user)
 
-            # Wrap analytics in habit_analytics key
-            context['habit_analytics'] = get_habit_analytics(habits)
+            # Wrap analytics in habit_analytics key; cached until the user's habits change
+            context['habit_analytics'] = AnalyticsSnapshotCache.get_or_build(
+                viewed_user, AnalyticsSnapshotCache.DASHBOARD, lambda: get_habit_analytics(habits)
+            )
             context.update({
                 'badges': Badge.objects.filter(user=viewed_user),
                 'recent_applications': Application.objects.filter(
@@ -60,14 +63,10 @@ class DashboardView(LoginRequiredMixin, DetailView):
                 'latest_summary': AIHabitSummary.objects.filter(
                     user=viewed_user
                 ).first(),
-                'application_analytics': Application.get_analytics(viewed_user)
+                'application_analytics': Application.get_analytics(viewed_user),
+                'ai_summary_streaming': settings.AI_SUMMARY_STREAMING,
             })
 
-        # If user doesn't have wishlist badge yet, check for expired items
-        if viewed_user == self.request.user:
-            badge_service = BadgeService(viewed_user)
-            badge_service.check_application_badges()  # This will check wishlist expired among others
-
         return context
 
 class FriendRequestView(LoginRequiredMixin, View):
@@ -115,12 +114,9 @@ class HandleFriendRequestView(LoginRequiredMixin, View):
 
         if action == 'accept':
             friendship.status = 'accepted'
+            # Saving an accepted friendship awards the first friend badge to both users
             friendship.save()
 
-            # Check for first friend badge
-            BadgeService(request.user).check_social_badges()
-            BadgeService(friendship.sender).check_social_badges()
-
             messages.success(request, f"You are now friends with {friendship.sender.username}! 🎉")
         elif action == 'decline':
             friendship.status = 'declined'
@@ -154,6 +150,7 @@ class UnfriendView(LoginRequiredMixin, View):
         messages.success(request, f"You are no longer friends with {other_user.username}")
         return redirect('social:dashboard', username=request.user.username)
 
+@query_budget(8)
 class FriendsListView(LoginRequiredMixin, View):
     template_name = 'social/friends_list.html'
 
@@ -162,142 +159,54 @@ class FriendsListView(LoginRequiredMixin, View):
             'friends': Friendship.objects.filter(
                 (Q(sender=request.user) | Q(receiver=request.user)),
                 status='accepted'
-            ),
+            ).select_related('sender', 'receiver'),
             'incoming_requests': Friendship.objects.filter(
                 receiver=request.user,
                 status='pending'
-            ),
+            ).select_related('sender'),
             'outgoing_requests': Friendship.objects.filter(
                 sender=request.user,
                 status='pending'
-            )
+            ).select_related('receiver')
         }
         return render(request, self.template_name, context)
 
+@query_budget(8)
 class LeaderboardView(LoginRequiredMixin, View):
     template_name = 'social/leaderboard.html'
 
     def get(self, request):
-        user = get_user_model()
-        users = user.objects.all()
         selected_category = request.GET.get('category', 'all')
-
-        # Calculate stats for each user
-        leaderboard_data = []
-        for user in users:
-            habits = user.habits.all()
-            if selected_category != 'all':
-                habits = habits.filter(category=selected_category)
-
-            if not habits:  # Skip users with no habits in this category
-                continue
-
-            total_completions = sum(habit.completions.count() for habit in habits)
-            total_possible = sum(habit.get_total_possible_completions() for habit in habits)
-
-            completion_rate = (total_completions / total_possible * 100) if total_possible > 0 else 0
-            current_streak = max((habit.current_streak() for habit in habits), default=0)
-
-            # Get user's badges
-            badges = Badge.get_user_highest_badges(user)
-            badge_count = sum(1 for badge in badges.values() if badge is not None)
-
-            leaderboard_data.append({
-                'user': user,
-                'total_completions': total_completions,
-                'completion_rate': completion_rate,
-                'current_streak': current_streak,
-                'total_habits': habits.count(),
-                'badges': badges,
-                'badge_count': badge_count
-            })
-
-        leaderboard_data.sort(key=lambda x: (-x['completion_rate'], -x['total_completions']))
+        page_obj = LeaderboardService(selected_category).get_page(request.GET.get('page'))
 
         context = {
-            'leaderboard_data': leaderboard_data,
+            'leaderboard_data': page_obj.object_list,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
             'selected_category': selected_category,
             'categories': ['all'] + [c[0] for c in Habit.CATEGORY_CHOICES]
         }
 
         return render(request, self.template_name, context)
 
-def get_habit_analytics(habits):
-    today = timezone.localtime(timezone.now()).date()
-    start_of_week = today - timedelta(days=today.weekday())
-    start_of_month = today.replace(day=1)
-
-    habits = habits.annotate(
-        completions_count=Count('completions',
-            filter=Q(completions__completed_at__lte=today)),
-        week_count=Count('completions',
-            filter=Q(
-                completions__completed_at__gte=start_of_week,
-                completions__completed_at__lte=today
-            )),
-        month_count=Count('completions',
-            filter=Q(
-                completions__completed_at__gte=start_of_month,
-                completions__completed_at__lte=today
-            )),
-        streak_days=Subquery(
-            HabitCompletion.objects.filter(
-                habit=OuterRef('pk'),
-                completed_at__lte=today
-            ).values('habit')
-            .annotate(
-                streak=Count('id')
-            ).values('streak')[:1]
-        )
-    )
-
-    habits_data = []
-    for habit in habits:
-        habits_data.append({
-            'name': habit.name,
-            'category': habit.category,
-            'frequency': habit.frequency,
-            'completions_count': habit.completions_count,
-            'possible_completions': habit.get_total_possible_completions(),
-            'week_count': habit.week_count,
-            'month_count': habit.month_count,
-            'streak_days': habit.streak_days or 0
-        })
-
-    # Calculate totals using annotated values
-    total_completions = sum(h['completions_count'] for h in habits_data)
-    total_possible = sum(h['possible_completions'] for h in habits_data)
-
-    by_category = {}
-    for habit in habits_data:
-        cat = habit['category']
-        if cat not in by_category:
-            by_category[cat] = {'completed': 0, 'possible': 0, 'count': 0, 'streak': 0}
-        by_category[cat]['completed'] += habit['completions_count']
-        by_category[cat]['possible'] += habit['possible_completions']
-        by_category[cat]['count'] += 1
-        by_category[cat]['streak'] = max(by_category[cat]['streak'], habit['streak_days'])
-
-    category_stats = []
-    for category, data in by_category.items():
-        if data['possible'] > 0:
-            category_stats.append({
-                'category': category,
-                'completed': data['completed'],
-                'total': data['possible'],
-                'habit_count': data['count'],
-                'percentage': round(data['completed'] * 100 / data['possible'], 1)
-            })
+# The analytics the dashboard renders; AnalyticsEngine plans the queries for just these
+DASHBOARD_METRICS = [
+    'total_habits', 'completion_rate', 'this_week_completions', 'this_month_completions',
+    'category_stats', 'best_streak',
+]
 
-    # Return all required analytics fields
-    return {
-        'total_habits': len(habits_data),
-        'completion_rate': round(
-            total_completions * 100 / total_possible if total_possible > 0 else 0.0, 1
-        ),
-        'this_week_completions': sum(h['week_count'] for h in habits_data),
-        'this_month_completions': sum(h['month_count'] for h in habits_data),
-        'category_stats': category_stats,
-        'best_streak': max((h['streak_days'] for h in habits_data), default=0),
-        'habits': habits
-    }
+def get_habit_analytics(habits):
+    return AnalyticsEngine().summarize(habits, DASHBOARD_METRICS)
+
+def _can_scrape_metrics(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+
+def metrics(request):
+    """Prometheus scrape endpoint: the METRICS_TOKEN bearer token or a staff login is required"""
+    if not _can_scrape_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(monitoring_metrics.exposition(), content_type=monitoring_metrics.CONTENT_TYPE)